@@ -10,6 +10,7 @@ Provides a web-based UI to browse all database tables including:
 
 from sqladmin import Admin, ModelView
 from sqladmin.authentication import AuthenticationBackend
+from sqlalchemy.orm import undefer, undefer_group
 from starlette.requests import Request
 from starlette.responses import Response
 import os
@@ -89,7 +90,8 @@ class ScrapeJobAdmin(ModelView, model=ScrapeJob):
         "proxy_used",
         "profile_data",
         "config_snapshot",
-        "html_snapshot",
+        "html_blob_key",
+        "html_size_bytes",
         "prompt_id",
         "schedule_type",
         "frequency",
@@ -100,7 +102,6 @@ class ScrapeJobAdmin(ModelView, model=ScrapeJob):
     
     # Format long text fields
     column_formatters = {
-        "html_snapshot": lambda m, a: f"[HTML: {len(m.html_snapshot or '')} chars]" if m.html_snapshot else None,
         "config_snapshot": lambda m, a: f"[JSON: {len(m.config_snapshot or '')} chars]" if m.config_snapshot else None,
         "profile_data": lambda m, a: f"[JSON: {len(m.profile_data or '')} chars]" if m.profile_data else None,
     }
@@ -113,6 +114,14 @@ class ScrapeJobAdmin(ModelView, model=ScrapeJob):
     can_export = True
     export_types = ["csv", "json"]
 
+    # The JSON payload columns are deferred on the model; pages are rendered
+    # after the session closes, so load them with the row
+    def form_details_query(self, request: Request):
+        return super().form_details_query(request).options(undefer_group("payload"))
+
+    def form_edit_query(self, request: Request):
+        return super().form_edit_query(request).options(undefer_group("payload"))
+
 
 class PromptAdmin(ModelView, model=Prompt):
     """Admin view for prompts/scrape results."""
@@ -136,6 +145,13 @@ class PromptAdmin(ModelView, model=Prompt):
     page_size = 25
     can_export = True
 
+    # response_text is deferred on the model (see ScrapeJobAdmin)
+    def form_details_query(self, request: Request):
+        return super().form_details_query(request).options(undefer(Prompt.response_text))
+
+    def form_edit_query(self, request: Request):
+        return super().form_edit_query(request).options(undefer(Prompt.response_text))
+
 
 class BrandAdmin(ModelView, model=Brand):
     """Admin view for tracked brands."""
@@ -0,0 +1,244 @@
+"""
+Set-based brand aggregations for the analytics endpoints.
+
+Every helper here answers one question for *all* brands with a single
+grouped query over Prompt ⋈ PromptBrandMention, instead of issuing one
+`select(PromptBrandMention)...first()` per prompt, per brand, per month.
+
+The semantics mirror the original per-prompt loops exactly:
+- A brand is "mentioned" in a prompt if it has at least one mention row
+  with mentioned=True; when several exist, the earliest row (lowest id)
+  supplies position and sentiment.
+- Visibility is the share of distinct queries in a period where the brand
+  was mentioned in at least one run.
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import and_
+from sqlmodel import Session, select, func
+
+from models import Prompt, PromptBrandMention
+from timewindow import TimeWindow, bucket_expr
+
+
+# Visibility must move by more than this many points to count as a trend
+TREND_THRESHOLD = 2
+
+
+@dataclass
+class BrandPeriodStats:
+    """Aggregated mention stats for one brand over one period."""
+    mentioned_queries: int = 0
+    avg_position: float = 0
+    sentiment: str = "neutral"
+
+
+@dataclass
+class BrandMention:
+    """A single (first) mention of a brand in a prompt, for top-prompt lists."""
+    query: str
+    position: int | None
+    sentiment: str | None
+    scraped_at: datetime | None
+
+
+@dataclass
+class BrandAggregates:
+    """Everything the brand endpoints need, keyed by brand id."""
+    current: dict[str, BrandPeriodStats] = field(default_factory=dict)
+    previous_mentioned: dict[str, int] = field(default_factory=dict)
+    current_total_queries: int = 0
+    previous_total_queries: int = 0
+
+
+def visibility_pct(mentioned: int, total: int) -> float:
+    """Percentage of queries mentioning a brand (0 when there are no queries)."""
+    return (mentioned / total * 100) if total > 0 else 0
+
+
+def compute_trend(current: float, previous: float) -> str:
+    """Classify a visibility change as up, down or stable."""
+    if current > previous + TREND_THRESHOLD:
+        return "up"
+    if current < previous - TREND_THRESHOLD:
+        return "down"
+    return "stable"
+
+
+def _first_mentions(brand_ids: list[str] | None = None):
+    """Subquery selecting the earliest mentioned=True row per (prompt, brand)."""
+    stmt = select(func.min(PromptBrandMention.id).label("id")).where(
+        PromptBrandMention.mentioned == True
+    )
+    if brand_ids is not None:
+        stmt = stmt.where(PromptBrandMention.brand_id.in_(brand_ids))
+    return stmt.group_by(PromptBrandMention.prompt_id, PromptBrandMention.brand_id).subquery()
+
+
+def _in_window(start: datetime, end: datetime):
+    return and_(Prompt.scraped_at >= start, Prompt.scraped_at < end)
+
+
+def _mention_select(*columns, start: datetime, end: datetime, brand_ids: list[str] | None = None):
+    """SELECT over first mentions joined to their prompt, limited to [start, end)."""
+    first = _first_mentions(brand_ids)
+    return (
+        select(*columns)
+        .select_from(PromptBrandMention)
+        .join(first, first.c.id == PromptBrandMention.id)
+        .join(Prompt, Prompt.id == PromptBrandMention.prompt_id)
+        .where(_in_window(start, end))
+    )
+
+
+def count_queries(session: Session, start: datetime, end: datetime) -> int:
+    """Number of distinct queries scraped in [start, end)."""
+    return session.exec(
+        select(func.count(func.distinct(Prompt.query))).where(_in_window(start, end))
+    ).one()
+
+
+def count_queries_by_bucket(session: Session, window: TimeWindow) -> dict[str, int]:
+    """Distinct queries per period of the window, grouped in SQL by period key."""
+    bucket = bucket_expr(session, window.granularity)
+    rows = session.exec(
+        select(bucket, func.count(func.distinct(Prompt.query)))
+        .where(_in_window(window.start, window.end))
+        .group_by(bucket)
+    ).all()
+    totals = {key: 0 for key in window.keys}
+    totals.update({key: count for key, count in rows if key in totals})
+    return totals
+
+
+def brand_mentioned_queries_by_bucket(
+    session: Session, window: TimeWindow, brand_ids: list[str] | None = None
+) -> dict[str, dict[str, int]]:
+    """Distinct mentioned queries per brand per period: {brand_id: {period_key: count}}."""
+    bucket = bucket_expr(session, window.granularity)
+    rows = session.exec(
+        _mention_select(
+            PromptBrandMention.brand_id,
+            bucket,
+            func.count(func.distinct(Prompt.query)),
+            start=window.start, end=window.end, brand_ids=brand_ids,
+        ).group_by(PromptBrandMention.brand_id, bucket)
+    ).all()
+    result: dict[str, dict[str, int]] = {}
+    for brand_id, key, count in rows:
+        result.setdefault(brand_id, {})[key] = count
+    return result
+
+
+def brand_mentioned_queries(
+    session: Session, start: datetime, end: datetime, brand_ids: list[str] | None = None
+) -> dict[str, int]:
+    """Distinct queries in [start, end) where each brand was mentioned."""
+    rows = session.exec(
+        _mention_select(
+            PromptBrandMention.brand_id,
+            func.count(func.distinct(Prompt.query)),
+            start=start, end=end, brand_ids=brand_ids,
+        ).group_by(PromptBrandMention.brand_id)
+    ).all()
+    return dict(rows)
+
+
+def brand_period_stats(
+    session: Session, start: datetime, end: datetime, brand_ids: list[str] | None = None
+) -> dict[str, BrandPeriodStats]:
+    """Mentioned-query count, average position and dominant sentiment per brand."""
+    stats = {
+        brand_id: BrandPeriodStats(mentioned_queries=mentioned)
+        for brand_id, mentioned in brand_mentioned_queries(session, start, end, brand_ids).items()
+    }
+
+    position_rows = session.exec(
+        _mention_select(
+            PromptBrandMention.brand_id,
+            func.avg(PromptBrandMention.position),
+            start=start, end=end, brand_ids=brand_ids,
+        )
+        .where(PromptBrandMention.position != None, PromptBrandMention.position != 0)
+        .group_by(PromptBrandMention.brand_id)
+    ).all()
+    for brand_id, avg_position in position_rows:
+        stats.setdefault(brand_id, BrandPeriodStats()).avg_position = float(avg_position or 0)
+
+    # Most common sentiment; ties go to the sentiment seen first (lowest prompt id),
+    # matching Counter.most_common() over prompts in id order.
+    sentiment_rows = session.exec(
+        _mention_select(
+            PromptBrandMention.brand_id,
+            PromptBrandMention.sentiment,
+            func.count(),
+            func.min(Prompt.id),
+            start=start, end=end, brand_ids=brand_ids,
+        )
+        .where(PromptBrandMention.sentiment != None, PromptBrandMention.sentiment != "")
+        .group_by(PromptBrandMention.brand_id, PromptBrandMention.sentiment)
+    ).all()
+    best: dict[str, tuple[int, int]] = {}
+    for brand_id, sentiment, count, first_prompt_id in sentiment_rows:
+        rank = (-count, first_prompt_id)
+        if brand_id not in best or rank < best[brand_id]:
+            best[brand_id] = rank
+            stats.setdefault(brand_id, BrandPeriodStats()).sentiment = sentiment
+
+    return stats
+
+
+def brand_mentions_in_window(
+    session: Session, start: datetime, end: datetime, brand_ids: list[str] | None = None
+) -> dict[str, list[BrandMention]]:
+    """First mentions per brand in [start, end), in prompt id order."""
+    rows = session.exec(
+        _mention_select(
+            PromptBrandMention.brand_id,
+            Prompt.query,
+            PromptBrandMention.position,
+            PromptBrandMention.sentiment,
+            Prompt.scraped_at,
+            start=start, end=end, brand_ids=brand_ids,
+        ).order_by(Prompt.id)
+    ).all()
+    result: dict[str, list[BrandMention]] = {}
+    for brand_id, query, position, sentiment, scraped_at in rows:
+        result.setdefault(brand_id, []).append(BrandMention(query, position, sentiment, scraped_at))
+    return result
+
+
+def top_mentions(mentions: list[BrandMention], limit: int = 10) -> list[BrandMention]:
+    """One mention per query (best position wins, first seen on ties), best first."""
+    unique: dict[str, BrandMention] = {}
+    for m in mentions:
+        current = unique.get(m.query)
+        if current is None or (m.position and (not current.position or m.position < current.position)):
+            unique[m.query] = m
+    return sorted(unique.values(), key=lambda m: m.position if m.position else 999)[:limit]
+
+
+def brand_mention_totals(session: Session, brand_ids: list[str] | None = None) -> dict[str, int]:
+    """All-time count of mentioned=True rows per brand."""
+    stmt = select(PromptBrandMention.brand_id, func.count(PromptBrandMention.id)).where(
+        PromptBrandMention.mentioned == True
+    )
+    if brand_ids is not None:
+        stmt = stmt.where(PromptBrandMention.brand_id.in_(brand_ids))
+    return dict(session.exec(stmt.group_by(PromptBrandMention.brand_id)).all())
+
+
+def brand_aggregates(
+    session: Session, window: TimeWindow, brand_ids: list[str] | None = None
+) -> BrandAggregates:
+    """Current-period stats plus previous-period visibility inputs for trend."""
+    cur_start, cur_end = window.current.start, window.current.end
+    prev_start, prev_end = window.previous.start, window.previous.end
+    return BrandAggregates(
+        current=brand_period_stats(session, cur_start, cur_end, brand_ids),
+        previous_mentioned=brand_mentioned_queries(session, prev_start, prev_end, brand_ids),
+        current_total_queries=count_queries(session, cur_start, cur_end),
+        previous_total_queries=count_queries(session, prev_start, prev_end),
+    )
@@ -0,0 +1,210 @@
+"""
+Content-addressed blob store for large scrape artifacts (HTML snapshots).
+
+Blobs are compressed (zstd when the zstandard package is installed, gzip
+otherwise) and stored under the SHA-256 of their uncompressed content, so
+identical snapshots are stored once. The database keeps only the returned
+key and size (ScrapeJob.html_blob_key / html_size_bytes).
+
+Keys look like "ab/abcdef...0123.zst": the extension records the codec, so
+blobs written with either codec stay readable after BLOB_COMPRESSION
+changes.
+
+Backends (BLOB_STORE):
+- local (default): files under BLOB_STORE_PATH (default backend/blobs)
+- s3: an S3-compatible bucket (BLOB_S3_BUCKET, BLOB_S3_ENDPOINT_URL for
+  MinIO/R2/etc., BLOB_S3_PREFIX); needs the optional boto3 package and the
+  usual AWS_* credential variables
+"""
+
+import gzip
+import hashlib
+import os
+import tempfile
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import zstandard
+except ImportError:  # gzip only
+    zstandard = None
+
+
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_STORE_PATH = Path(os.getenv("BLOB_STORE_PATH", Path(__file__).parent / "blobs"))
+BLOB_S3_BUCKET = os.getenv("BLOB_S3_BUCKET")
+BLOB_S3_ENDPOINT_URL = os.getenv("BLOB_S3_ENDPOINT_URL")
+BLOB_S3_PREFIX = os.getenv("BLOB_S3_PREFIX", "blobs/")
+BLOB_COMPRESSION = os.getenv("BLOB_COMPRESSION", "zstd" if zstandard else "gzip")
+
+# Bytes read from storage per streamed chunk
+READ_CHUNK_SIZE = 64 * 1024
+
+CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+
+
+@dataclass
+class BlobRef:
+    key: str
+    size: int  # Uncompressed bytes
+    stored_size: int  # Compressed bytes (0 when the blob already existed)
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("BLOB_COMPRESSION=zstd requires the zstandard package")
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def decompress_stream(chunks: Iterator[bytes], key: str) -> Iterator[bytes]:
+    """Decompress a stream of stored chunks according to the key's extension."""
+    if key.endswith(".zst"):
+        if zstandard is None:
+            raise RuntimeError(f"Blob {key} is zstd-compressed but zstandard is not installed")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        for chunk in chunks:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+        return
+
+    decompressor = zlib.decompressobj(wbits=31)  # gzip container
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    tail = decompressor.flush()
+    if tail:
+        yield tail
+
+
+class BlobStore:
+    """Put/get compressed, content-addressed blobs. Subclasses implement raw object access."""
+
+    def __init__(self, codec: str = BLOB_COMPRESSION):
+        if codec not in CODEC_EXTENSIONS:
+            raise ValueError(f"Unknown BLOB_COMPRESSION {codec!r}")
+        self.codec = codec
+
+    def put(self, data: bytes) -> BlobRef:
+        """Store data (if not already stored) and return its key."""
+        digest = hashlib.sha256(data).hexdigest()
+        # Reuse an existing copy written with any codec
+        for codec in [self.codec] + [c for c in CODEC_EXTENSIONS if c != self.codec]:
+            key = f"{digest[:2]}/{digest}.{CODEC_EXTENSIONS[codec]}"
+            if self._exists(key):
+                return BlobRef(key, len(data), 0)
+
+        key = f"{digest[:2]}/{digest}.{CODEC_EXTENSIONS[self.codec]}"
+        stored = compress(data, self.codec)
+        self._write(key, stored)
+        return BlobRef(key, len(data), len(stored))
+
+    def exists(self, key: str) -> bool:
+        return self._exists(key)
+
+    def stream(self, key: str) -> Iterator[bytes]:
+        """Decompressed content of a blob, in chunks."""
+        return decompress_stream(self._read_chunks(key), key)
+
+    def get(self, key: str) -> bytes:
+        return b"".join(self.stream(key))
+
+    def _exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def _write(self, key: str, data: bytes) -> None:
+        raise NotImplementedError
+
+    def _read_chunks(self, key: str) -> Iterator[bytes]:
+        raise NotImplementedError
+
+
+class LocalBlobStore(BlobStore):
+    """Blobs as files under a directory."""
+
+    def __init__(self, root: Path = BLOB_STORE_PATH, codec: str = BLOB_COMPRESSION):
+        super().__init__(codec)
+        self.root = Path(root)
+
+    def _exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self.root / key
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename, so readers never see a partial blob
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def _read_chunks(self, key: str) -> Iterator[bytes]:
+        with open(self.root / key, "rb") as f:
+            while chunk := f.read(READ_CHUNK_SIZE):
+                yield chunk
+
+
+class S3BlobStore(BlobStore):
+    """Blobs as objects in an S3-compatible bucket."""
+
+    def __init__(self, bucket: str, endpoint_url: str | None = None, prefix: str = "", codec: str = BLOB_COMPRESSION):
+        super().__init__(codec)
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError("BLOB_STORE=s3 requires the boto3 package")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.prefix + key)
+            return True
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def _write(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.prefix + key, Body=data)
+
+    def _read_chunks(self, key: str) -> Iterator[bytes]:
+        body = self.client.get_object(Bucket=self.bucket, Key=self.prefix + key)["Body"]
+        try:
+            yield from body.iter_chunks(READ_CHUNK_SIZE)
+        finally:
+            body.close()
+
+
+def make_blob_store() -> BlobStore:
+    """Blob store configured by the BLOB_* environment variables."""
+    if BLOB_STORE == "s3":
+        if not BLOB_S3_BUCKET:
+            raise RuntimeError("BLOB_STORE=s3 requires BLOB_S3_BUCKET")
+        return S3BlobStore(BLOB_S3_BUCKET, BLOB_S3_ENDPOINT_URL, BLOB_S3_PREFIX)
+    if BLOB_STORE != "local":
+        raise RuntimeError(f"Unknown BLOB_STORE {BLOB_STORE!r} (use 'local' or 's3')")
+    return LocalBlobStore()
+
+
+_store: BlobStore | None = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide blob store, created on first use."""
+    global _store
+    if _store is None:
+        _store = make_blob_store()
+    return _store
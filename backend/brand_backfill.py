@@ -0,0 +1,184 @@
+"""
+Background mention backfill for newly created brands.
+
+POST /api/brands only records the brand and a BrandBackfill row, then hands
+the backfill to run_brand_backfill in the background. The worker walks the
+prompts that existed when the brand was created in Prompt.id order,
+BRAND_BACKFILL_CHUNK_SIZE at a time (newer prompts get their mentions at
+ingest, from the same matcher). Per chunk it reads just (id, response_text),
+runs the shared brand matcher over each text and bulk-inserts the chunk's PromptBrandMention rows in the same transaction
+that advances the job's progress counters. Progress is read back from
+/api/brands/backfills/{id}.
+
+When all chunks are done the brand's visibility rollup is rebuilt and the
+analytics response cache is invalidated.
+
+A backfill is leased to the worker that created it, and the worker renews the
+lease with every chunk it commits (same lease length as scrape jobs, see
+job_claims.py). Chunks are only committed under a live lease, so a chunk is
+never inserted twice. If the worker restarts mid-run its lease lapses, and
+claim_orphaned_backfills(), called at startup and periodically, hands the
+backfill to another worker, which resumes after last_prompt_id.
+"""
+
+import os
+from datetime import datetime
+
+from sqlalchemy import or_, update
+from sqlmodel import Session, func, select
+
+from brand_matcher import BrandMatcher, get_brand_matcher
+from database import engine
+from job_claims import lease_expiry
+from models import Brand, BrandBackfill, Prompt, PromptBrandMention
+from response_cache import bump_data_version
+from rollups import rebuild_visibility_rollup
+
+# Prompts matched and inserted per transaction
+BRAND_BACKFILL_CHUNK_SIZE = int(os.getenv("BRAND_BACKFILL_CHUNK_SIZE", "500"))
+
+# Characters of response text kept around the first mention
+CONTEXT_CHARS = 50
+
+
+def create_brand_backfill(session: Session, brand_id: str, owner: str) -> BrandBackfill:
+    """Record a pending backfill for brand_id, covering every prompt scraped so far, leased to owner. Caller commits."""
+    total, max_prompt_id = session.exec(
+        select(func.count(Prompt.id), func.max(Prompt.id)).where(Prompt.response_text != None)
+    ).one()
+    backfill = BrandBackfill(
+        brand_id=brand_id,
+        total_prompts=total,
+        max_prompt_id=max_prompt_id or 0,
+        lease_owner=owner,
+        lease_expires_at=lease_expiry(),
+    )
+    session.add(backfill)
+    return backfill
+
+
+def build_mention_rows(brand_id: str, prompts: list[tuple[int, str]], matcher: BrandMatcher) -> list[dict]:
+    """PromptBrandMention rows for brand_id, one per prompt."""
+    rows = []
+    for prompt_id, text in prompts:
+        first = matcher.first_occurrences(text)
+        occurrence = first.get(brand_id)
+
+        position = None
+        context = None
+        if occurrence:
+            # Position = 1 + number of other brands first mentioned earlier
+            position = sum(1 for o in first.values() if o.start < occurrence.start) + 1
+            context = text[max(0, occurrence.start - CONTEXT_CHARS):occurrence.end + CONTEXT_CHARS]
+
+        rows.append({
+            "prompt_id": prompt_id,
+            "brand_id": brand_id,
+            "mentioned": occurrence is not None,
+            "position": position,
+            "sentiment": "neutral",  # Default sentiment
+            "context": context,
+        })
+    return rows
+
+
+def claim_orphaned_backfills(owner: str) -> list[int]:
+    """Lease unfinished backfills whose worker is gone (lease lapsed or never taken) to owner."""
+    now = datetime.utcnow()
+    expires = lease_expiry()
+    unfinished = BrandBackfill.status.in_(("pending", "running"))
+    unleased = or_(BrandBackfill.lease_expires_at == None, BrandBackfill.lease_expires_at < now)
+    with Session(engine) as session:
+        session.exec(
+            update(BrandBackfill)
+            .where(unfinished, unleased)
+            .values(lease_owner=owner, lease_expires_at=expires)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+        return session.exec(
+            select(BrandBackfill.id)
+            .where(BrandBackfill.lease_owner == owner, BrandBackfill.lease_expires_at == expires)
+            .order_by(BrandBackfill.id)
+        ).all()
+
+
+def _renew_lease(session: Session, backfill_id: int, owner: str) -> bool:
+    """Extend owner's lease in the current transaction; False if another worker has taken the backfill over."""
+    result = session.exec(
+        update(BrandBackfill)
+        .where(BrandBackfill.id == backfill_id, BrandBackfill.lease_owner == owner)
+        .values(lease_expires_at=lease_expiry())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+def run_brand_backfill(backfill_id: int, owner: str) -> None:
+    """Process a backfill leased to owner to completion. Runs in a worker thread, with its own session."""
+    with Session(engine) as session:
+        backfill = session.get(BrandBackfill, backfill_id)
+        if backfill is None or backfill.status not in ("pending", "running") or backfill.lease_owner != owner:
+            return
+        if not _renew_lease(session, backfill_id, owner):
+            return
+        backfill.status = "running"
+        backfill.started_at = backfill.started_at or datetime.utcnow()
+        session.add(backfill)
+        session.commit()
+
+        try:
+            while True:
+                # The brand can be deleted while we run; stop instead of inserting orphans
+                if session.get(Brand, backfill.brand_id) is None:
+                    raise RuntimeError(f"Brand '{backfill.brand_id}' was deleted")
+
+                # Built once per brand set and cached, so this is a lookup after the first chunk
+                matcher = get_brand_matcher(session)
+                chunk = session.exec(
+                    select(Prompt.id, Prompt.response_text)
+                    .where(
+                        Prompt.response_text != None,
+                        Prompt.id > backfill.last_prompt_id,
+                        Prompt.id <= backfill.max_prompt_id,
+                    )
+                    .order_by(Prompt.id)
+                    .limit(BRAND_BACKFILL_CHUNK_SIZE)
+                ).all()
+                if not chunk:
+                    break
+
+                # Held until the commit, so a worker claiming the backfill meanwhile sees a live lease
+                if not _renew_lease(session, backfill_id, owner):
+                    session.rollback()
+                    print(f"[backfill:{backfill_id}] taken over by another worker, stopping")
+                    return
+
+                rows = build_mention_rows(backfill.brand_id, chunk, matcher)
+                session.bulk_insert_mappings(PromptBrandMention, rows)
+
+                backfill.processed_prompts += len(rows)
+                backfill.mentioned_prompts += sum(1 for row in rows if row["mentioned"])
+                backfill.last_prompt_id = chunk[-1][0]
+                session.add(backfill)
+                session.commit()
+
+            rebuild_visibility_rollup(session, brand_ids=[backfill.brand_id])
+            backfill.status = "completed"
+            backfill.completed_at = datetime.utcnow()
+            backfill.lease_owner = None
+            backfill.lease_expires_at = None
+            session.add(backfill)
+            session.commit()
+        except Exception as e:
+            session.rollback()
+            print(f"[backfill:{backfill_id}] FAILED brand={backfill.brand_id}: {e}")
+            backfill.status = "failed"
+            backfill.error = str(e)
+            backfill.completed_at = datetime.utcnow()
+            backfill.lease_owner = None
+            backfill.lease_expires_at = None
+            session.add(backfill)
+            session.commit()
+        finally:
+            bump_data_version()
@@ -0,0 +1,171 @@
+"""
+Brand mention detection.
+
+One matcher shared by ingest (analyze_brand_mentions), brand creation and
+scripts/sync_brand_mentions.py. The search terms of every brand (its name
+plus Brand.variations) are compiled once into an Aho-Corasick automaton,
+so a response is scanned in a single pass whose cost depends on the text
+length, not on the number of brands or variations.
+
+Matching is case- and accent-insensitive (Unicode casefold, combining
+marks stripped) and respects word boundaries: "Wix" does not match inside
+"Wixel", while terms that start or end with punctuation ("wix.com") only
+need a boundary on their word-character ends. Offsets are reported in the
+original text.
+
+Matchers are cached by brand set (ids, names, variations), so they are
+rebuilt only after brands change.
+"""
+
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Iterable
+
+from sqlmodel import Session, select
+
+from models import Brand
+
+
+@dataclass(frozen=True)
+class BrandOccurrence:
+    """One occurrence of a brand term in a text, as [start, end) offsets into the original text."""
+    brand_id: str
+    start: int
+    end: int
+
+
+def normalize(text: str) -> tuple[str, list[int] | None]:
+    """
+    Casefold `text` and strip accents.
+
+    Returns the normalized text and, for each of its characters, the offset
+    of the original character it came from (None when they are identical,
+    which is always the case for ASCII text).
+    """
+    if text.isascii():
+        return text.lower(), None
+
+    chars: list[str] = []
+    offsets: list[int] = []
+    for i, char in enumerate(text):
+        for folded in unicodedata.normalize("NFKD", char.casefold()):
+            if not unicodedata.combining(folded):
+                chars.append(folded)
+                offsets.append(i)
+    return "".join(chars), offsets
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == "_"
+
+
+def brand_terms(name: str, variations: str | None) -> list[str]:
+    """Search terms of a brand: its name plus each comma-separated variation."""
+    terms = [name] + (variations.split(",") if variations else [])
+    return [term.strip() for term in terms if term and term.strip()]
+
+
+class BrandMatcher:
+    """Aho-Corasick automaton over the search terms of a set of brands."""
+
+    def __init__(self, brands: Iterable[tuple[str, list[str]]]):
+        # Trie: per node, outgoing edges; node 0 is the root
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Terms ending at a node (including via fail links): (brand_id, term length, needs left/right boundary)
+        self._outputs: list[list[tuple[str, int, bool, bool]]] = [[]]
+        self.brand_ids: list[str] = []
+
+        for brand_id, terms in brands:
+            self.brand_ids.append(brand_id)
+            for term in dict.fromkeys(normalize(t)[0] for t in terms):
+                if term:
+                    self._add(brand_id, term)
+        self._link()
+
+    def _add(self, brand_id: str, term: str) -> None:
+        node = 0
+        for char in term:
+            nxt = self._goto[node].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = nxt
+        self._outputs[node].append((brand_id, len(term), _is_word_char(term[0]), _is_word_char(term[-1])))
+
+    def _link(self) -> None:
+        """Compute fail links breadth-first and merge outputs along them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+                queue.append(child)
+
+    def find_all(self, text: str | None) -> list[BrandOccurrence]:
+        """Every occurrence of every brand term, ordered by start offset (longest first on ties)."""
+        if not text:
+            return []
+        normalized, offsets = normalize(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        length = len(normalized)
+
+        found = []
+        node = 0
+        for i, char in enumerate(normalized):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for brand_id, size, left_boundary, right_boundary in outputs[node]:
+                start, end = i - size + 1, i + 1
+                if left_boundary and start > 0 and _is_word_char(normalized[start - 1]):
+                    continue
+                if right_boundary and end < length and _is_word_char(normalized[end]):
+                    continue
+                found.append((start, -end, brand_id))
+
+        found.sort()
+        if offsets is None:
+            return [BrandOccurrence(brand_id, start, -neg_end) for start, neg_end, brand_id in found]
+        return [
+            BrandOccurrence(brand_id, offsets[start], offsets[-neg_end - 1] + 1)
+            for start, neg_end, brand_id in found
+        ]
+
+    def first_occurrences(self, text: str | None) -> dict[str, BrandOccurrence]:
+        """First occurrence of each mentioned brand, in order of appearance."""
+        first: dict[str, BrandOccurrence] = {}
+        for occurrence in self.find_all(text):
+            first.setdefault(occurrence.brand_id, occurrence)
+        return first
+
+
+_cache_lock = threading.Lock()
+_cached: tuple[tuple, BrandMatcher] | None = None
+
+
+def matcher_for_brands(brands: Iterable[Brand]) -> BrandMatcher:
+    """Matcher for the given brands, reused while the brand set is unchanged."""
+    global _cached
+    key = tuple(sorted((b.id, b.name, b.variations or "") for b in brands))
+    with _cache_lock:
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+    matcher = BrandMatcher((brand_id, brand_terms(name, variations)) for brand_id, name, variations in key)
+    with _cache_lock:
+        _cached = (key, matcher)
+    return matcher
+
+
+def get_brand_matcher(session: Session) -> BrandMatcher:
+    """Matcher for all brands currently in the database."""
+    return matcher_for_brands(session.exec(select(Brand)).all())
@@ -0,0 +1,144 @@
+"""
+Atomic DailyStats counters.
+
+Writers never read-modify-write a DailyStats row in Python. Each change is a
+single upsert:
+
+    INSERT INTO dailystats (...) VALUES (...)
+    ON CONFLICT (date) DO UPDATE SET col = dailystats.col + :delta, ...
+
+so concurrent job completions (other requests, other workers) add to the
+same row without lost updates and without a SELECT ... FOR UPDATE.
+Averages are derived from stored sums and counts (duration_total_seconds /
+duration_samples) rather than maintained as running averages.
+
+Call sites keep the upsert as the last statement before their commit, so
+the row lock PostgreSQL takes for the update is held only briefly.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import case, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from models import DailyStats, ScrapeJob
+
+
+# ScrapeJob.layer2_mode -> DailyStats cost column
+LAYER2_COST_COLUMNS = {
+    "direct": "cost_vpn_direct",
+    "residential": "cost_residential",
+    "unlocker": "cost_unlocker",
+    "browser": "cost_browser",
+}
+
+SCRAPER_JOB_COLUMNS = {
+    "google_ai": "jobs_google_ai",
+    "chatgpt": "jobs_chatgpt",
+    "perplexity": "jobs_perplexity",
+}
+
+
+def _insert(session: Session):
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(DailyStats)
+    return sqlite.insert(DailyStats)
+
+
+def increment_daily_stats(session: Session, date_str: str, **deltas: float) -> None:
+    """Atomically add deltas to a day's counters, creating the row if needed.
+
+    Also refreshes quota_remaining, avg_duration_seconds and updated_at in the
+    same statement.
+    Does not commit.
+    """
+    table = DailyStats.__table__
+    now = datetime.utcnow()
+
+    # New row: model defaults plus the deltas
+    defaults = DailyStats(date=date_str, created_at=now, updated_at=now)
+    values = {column.name: getattr(defaults, column.name) for column in table.columns if column.name != "id"}
+    for name, delta in deltas.items():
+        values[name] += delta
+    values["quota_remaining"] = max(0, values["daily_quota"] - values["prompts_completed"] - values["prompts_scheduled"])
+    if values["duration_samples"]:
+        values["avg_duration_seconds"] = values["duration_total_seconds"] / values["duration_samples"]
+
+    stmt = _insert(session).values(**values)
+    if not deltas:
+        session.execute(stmt.on_conflict_do_nothing(index_elements=["date"]))
+        return
+
+    # Existing row: every expression reads the row's current values
+    def updated(name: str):
+        return table.c[name] + deltas[name] if name in deltas else table.c[name]
+
+    remaining = updated("daily_quota") - updated("prompts_completed") - updated("prompts_scheduled")
+    set_ = {name: updated(name) for name in deltas}
+    set_["quota_remaining"] = case((remaining > 0, remaining), else_=0)
+    if "duration_samples" in deltas:
+        # Kept for readers of the column; derived from the sum and count
+        set_["avg_duration_seconds"] = updated("duration_total_seconds") / updated("duration_samples")
+    set_["updated_at"] = now
+    session.execute(stmt.on_conflict_do_update(index_elements=["date"], set_=set_))
+
+
+def job_completion_deltas(job: ScrapeJob) -> dict[str, float]:
+    """DailyStats counter increments for a finished (completed or failed) job."""
+    if job.status == "failed":
+        return {"prompts_failed": 1}
+    if job.status != "completed":
+        return {}
+
+    deltas: dict[str, float] = {"prompts_completed": 1}
+    if job.scraper_type in SCRAPER_JOB_COLUMNS:
+        deltas[SCRAPER_JOB_COLUMNS[job.scraper_type]] = 1
+    if job.layer2_mode:
+        cost = job.estimated_cost_usd or 0
+        if job.layer2_mode in LAYER2_COST_COLUMNS:
+            deltas[LAYER2_COST_COLUMNS[job.layer2_mode]] = cost
+        deltas["total_cost_usd"] = cost
+    if job.duration_seconds:
+        deltas["duration_total_seconds"] = job.duration_seconds
+        deltas["duration_samples"] = 1
+    if job.response_size_kb:
+        deltas["total_data_kb"] = job.response_size_kb
+    return deltas
+
+
+def record_job_completion(session: Session, job: ScrapeJob) -> None:
+    """Count a finished job in the DailyStats row of the day it completed. Does not commit."""
+    deltas = job_completion_deltas(job)
+    if deltas:
+        completed_at = job.completed_at or datetime.utcnow()
+        increment_daily_stats(session, completed_at.strftime("%Y-%m-%d"), **deltas)
+
+
+def get_or_create_daily_stats(session: Session, date_str: str | None = None) -> DailyStats:
+    """Get a day's DailyStats row, creating it if needed (safe against concurrent creators)."""
+    if not date_str:
+        date_str = datetime.utcnow().strftime("%Y-%m-%d")
+    increment_daily_stats(session, date_str)
+    session.commit()
+    return session.exec(select(DailyStats).where(DailyStats.date == date_str)).one()
+
+
+def set_daily_quota(session: Session, date_str: str, quota: int) -> None:
+    """Set a day's quota; quota_remaining is recomputed from the row's current counters. Does not commit."""
+    increment_daily_stats(session, date_str)
+    # Clamped at 0 like increment_daily_stats, for a quota lowered below the day's usage
+    remaining = quota - DailyStats.prompts_completed - DailyStats.prompts_scheduled
+    session.execute(
+        update(DailyStats)
+        .where(DailyStats.date == date_str)
+        .values(
+            daily_quota=quota,
+            quota_remaining=case((remaining > 0, remaining), else_=0),
+            updated_at=datetime.utcnow(),
+        )
+    )
+
+
+def average_duration(stats: DailyStats) -> float:
+    return stats.duration_total_seconds / stats.duration_samples if stats.duration_samples else 0.0
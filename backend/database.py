@@ -1,7 +1,69 @@
 import os
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import SQLModel, Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from pathlib import Path
 
+import migrations
+from pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
+# Connection pool (both backends). Size the pool for concurrent requests plus
+# scheduler/background jobs; checkouts wait up to DB_POOL_TIMEOUT seconds once
+# pool_size + max_overflow connections are in use. The sync engine (threadpool
+# routes, scripts) and the async engine (async routes, scheduler, scrape jobs)
+# each have a pool of this size.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; below server/proxy idle timeouts
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# SQLite pragmas, applied to every new connection. WAL lets readers run
+# alongside the single writer; busy_timeout makes writers queue instead of
+# failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")  # safe with WAL; FULL to fsync every commit
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def make_engine(database_url: str) -> Engine:
+    """Create the engine for DATABASE_URL with pool and SQLite settings from the environment."""
+    if database_url.startswith("sqlite"):
+        engine = create_engine(
+            database_url,
+            # Connections are shared across the threadpool, request tasks and the scheduler
+            connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        event.listen(engine, "connect", _set_sqlite_pragmas)
+        return engine
+
+    return create_engine(
+        database_url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
 # Support both SQLite (local dev) and PostgreSQL (production)
 DATABASE_URL = os.getenv("DATABASE_URL")
 
@@ -11,17 +73,72 @@ if DATABASE_URL:
         DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql+psycopg://", 1)
     elif DATABASE_URL.startswith("postgresql://"):
         DATABASE_URL = DATABASE_URL.replace("postgresql://", "postgresql+psycopg://", 1)
-    # PostgreSQL doesn't need check_same_thread
-    engine = create_engine(DATABASE_URL)
 else:
     # Fallback to SQLite for local development
     DATABASE_PATH = Path(__file__).parent / "aiseo.db"
     DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+engine = make_engine(DATABASE_URL)
+
+
+def async_database_url(database_url: str) -> str:
+    """The same database through an asyncio driver: aiosqlite, or psycopg3's async mode."""
+    if database_url.startswith("sqlite:"):
+        return database_url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    # postgresql+psycopg serves both engines: create_async_engine uses psycopg.AsyncConnection
+    return database_url
+
+
+def make_async_engine(database_url: str) -> AsyncEngine:
+    """Create the async engine for DATABASE_URL, with the same pool and SQLite settings."""
+    if database_url.startswith("sqlite"):
+        async_engine = create_async_engine(
+            async_database_url(database_url),
+            connect_args={"timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+        return async_engine
+
+    return create_async_engine(
+        async_database_url(database_url),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+    )
+
+
+# Used by async routes and background tasks, so queries don't block the event loop
+async_engine = make_async_engine(DATABASE_URL)
+
+
+def _engine_pool_stats(sync_engine: Engine) -> dict:
+    pool = sync_engine.pool
+    if not isinstance(pool, InstrumentedQueuePool):
+        return {"pool": type(pool).__name__}
+    return {"pool": type(pool).__name__, "backend": sync_engine.dialect.name, **pool.stats()}
+
+
+def pool_stats() -> dict:
+    """Checkout wait times and utilisation of the engines' connection pools."""
+    return {**_engine_pool_stats(engine), "async": _engine_pool_stats(async_engine.sync_engine)}
 
 
 def create_db_and_tables():
-    """Create all tables in the database"""
+    """Create all tables in the database and apply schema migrations"""
+    create_tables()
+    # Columns, indexes etc. on existing tables, see migrations/
+    migrations.upgrade(engine)
+
+
+def create_tables():
+    """Create missing tables; migrations expect the tables to exist"""
     SQLModel.metadata.create_all(engine)
 
 
@@ -29,3 +146,12 @@ def get_session():
     """Dependency for FastAPI routes"""
     with Session(engine) as session:
         yield session
+
+
+def async_session() -> AsyncSession:
+    """Session on the async engine, for async routes and background tasks.
+
+    Objects stay loaded after commit: with an async session, an expired
+    attribute cannot be lazily refreshed on access.
+    """
+    return AsyncSession(async_engine, expire_on_commit=False)
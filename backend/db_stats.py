@@ -0,0 +1,200 @@
+"""
+Aggregate job statistics for /api/stats/database and /api/daily-stats.
+
+All job figures come from one grouped query over ScrapeJob: counts and
+sums per (status, country, scraper_type), with conditional aggregates for
+the today/week windows; daily stats group by day of creation as well. The
+Python side only folds those few rows into the breakdowns, so new
+countries and scraper types show up without code changes. Table totals
+are a second query of scalar subqueries.
+
+With approximate=True, PostgreSQL table totals are read from the planner
+statistics (pg_class.reltuples, refreshed by autovacuum/ANALYZE) instead of
+counting every row. Other backends, and tables never analyzed, are counted
+exactly; the response says which it got.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, bindparam, case, text
+from sqlmodel import Session, select, func
+
+from models import Brand, Prompt, PromptTemplate, ScrapeJob, Source
+from timewindow import bucket_expr
+
+
+# Always reported, even when no job has that status yet
+JOB_STATUSES = ["completed", "failed", "running", "pending", "scheduled"]
+
+TOTAL_TABLES = {
+    "prompts": Prompt,
+    "sources": Source,
+    "templates": PromptTemplate,
+    "brands": Brand,
+}
+
+
+def _sum_where(value, *criteria):
+    return func.coalesce(func.sum(case((and_(*criteria), value), else_=0)), 0)
+
+
+def _exact_totals(session: Session, keys: list[str]) -> dict[str, int]:
+    if not keys:
+        return {}
+    row = session.exec(
+        select(*(select(func.count()).select_from(TOTAL_TABLES[key]).scalar_subquery() for key in keys))
+    ).one()
+    return dict(zip(keys, row))
+
+
+def _estimated_totals(session: Session) -> dict[str, int]:
+    """Planner row estimates for the TOTAL_TABLES that have been analyzed (PostgreSQL)."""
+    tables = {model.__tablename__: key for key, model in TOTAL_TABLES.items()}
+    rows = session.execute(
+        text(
+            "SELECT c.relname, c.reltuples FROM pg_class c "
+            "JOIN pg_namespace n ON n.oid = c.relnamespace "
+            "WHERE n.nspname = current_schema() AND c.relname IN :names"
+        ).bindparams(bindparam("names", expanding=True)),
+        {"names": list(tables)},
+    ).all()
+    # reltuples is -1 until the table is first vacuumed/analyzed
+    return {tables[name]: int(reltuples) for name, reltuples in rows if reltuples >= 0}
+
+
+def table_totals(session: Session, approximate: bool = False) -> tuple[dict[str, int], bool]:
+    """Row counts of TOTAL_TABLES, and whether any of them is an estimate."""
+    estimated = {}
+    if approximate and session.get_bind().dialect.name == "postgresql":
+        estimated = _estimated_totals(session)
+    exact = _exact_totals(session, [key for key in TOTAL_TABLES if key not in estimated])
+    return {key: estimated.get(key, exact.get(key)) for key in TOTAL_TABLES}, bool(estimated)
+
+
+def _ranked(counts: dict[str, int]) -> dict[str, int]:
+    return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+
+def job_stats(session: Session, today_start: datetime, week_start: datetime) -> dict:
+    """Job counts, windows, cost and duration from one GROUP BY over ScrapeJob."""
+    completed = ScrapeJob.status == "completed"
+    rows = session.exec(
+        select(
+            ScrapeJob.status,
+            ScrapeJob.country,
+            ScrapeJob.scraper_type,
+            func.count(),
+            _sum_where(1, ScrapeJob.created_at >= today_start),
+            _sum_where(1, ScrapeJob.created_at >= week_start),
+            func.sum(ScrapeJob.estimated_cost_usd),
+            _sum_where(ScrapeJob.estimated_cost_usd, ScrapeJob.created_at >= today_start, ScrapeJob.estimated_cost_usd != None),
+            _sum_where(ScrapeJob.duration_seconds, completed, ScrapeJob.duration_seconds != None),
+            _sum_where(1, completed, ScrapeJob.duration_seconds != None),
+        ).group_by(ScrapeJob.status, ScrapeJob.country, ScrapeJob.scraper_type)
+    ).all()
+
+    by_status = {status: 0 for status in JOB_STATUSES}
+    by_country: dict[str, int] = {}
+    by_scraper: dict[str, int] = {}
+    today = {"total": 0, "completed": 0, "failed": 0, "cost_usd": 0.0}
+    week = {"total": 0, "completed": 0}
+    total_cost = 0.0
+    duration_sum, duration_count = 0.0, 0
+
+    for status, country, scraper, jobs, today_jobs, week_jobs, cost, today_cost, durations, timed in rows:
+        by_status[status] = by_status.get(status, 0) + jobs
+        by_country[country] = by_country.get(country, 0) + jobs
+        by_scraper[scraper] = by_scraper.get(scraper, 0) + jobs
+        today["total"] += today_jobs
+        week["total"] += week_jobs
+        if status in ("completed", "failed"):
+            today[status] += today_jobs
+        if status == "completed":
+            week["completed"] += week_jobs
+        total_cost += cost or 0
+        today["cost_usd"] += today_cost
+        duration_sum += durations
+        duration_count += timed
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "by_country": _ranked(by_country),
+        "by_scraper": _ranked(by_scraper),
+        "today": today,
+        "week": week,
+        "total_cost_usd": total_cost,
+        "avg_duration_seconds": duration_sum / duration_count if duration_count else 0,
+    }
+
+
+def daily_job_counts(session: Session, start: datetime, end: datetime) -> dict[str, dict]:
+    """Job counts per day (YYYY-MM-DD) of creation in [start, end), by status, scraper and country."""
+    day = bucket_expr(session, "day", ScrapeJob.created_at)
+    rows = session.exec(
+        select(day, ScrapeJob.status, ScrapeJob.scraper_type, ScrapeJob.country, func.count())
+        .where(ScrapeJob.created_at >= start, ScrapeJob.created_at < end)
+        .group_by(day, ScrapeJob.status, ScrapeJob.scraper_type, ScrapeJob.country)
+    ).all()
+
+    days: dict[str, dict] = {}
+    for day_key, status, scraper, country, jobs in rows:
+        counts = days.setdefault(day_key, {"total": 0, "by_status": {}, "by_scraper": {}, "by_country": {}})
+        counts["total"] += jobs
+        counts["by_status"][status] = counts["by_status"].get(status, 0) + jobs
+        counts["by_scraper"][scraper] = counts["by_scraper"].get(scraper, 0) + jobs
+        counts["by_country"][country] = counts["by_country"].get(country, 0) + jobs
+    for counts in days.values():
+        counts["by_country"] = _ranked(counts["by_country"])
+    return days
+
+
+def database_stats(session: Session, approximate: bool = False) -> dict:
+    """The /api/stats/database response."""
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = today_start - timedelta(days=7)
+
+    jobs = job_stats(session, today_start, week_start)
+    totals, estimated = table_totals(session, approximate)
+    recent_failed = session.exec(
+        select(ScrapeJob.id, ScrapeJob.query, ScrapeJob.error, ScrapeJob.created_at)
+        .where(ScrapeJob.status == "failed")
+        .order_by(ScrapeJob.created_at.desc())
+        .limit(5)
+    ).all()
+
+    today, week = jobs["today"], jobs["week"]
+    return {
+        "totals": {"jobs": jobs["total"], **totals},
+        "approximate": estimated,
+        "jobs_by_status": jobs["by_status"],
+        "today": {
+            "total": today["total"],
+            "completed": today["completed"],
+            "failed": today["failed"],
+            "success_rate": round(today["completed"] / today["total"] * 100, 1) if today["total"] > 0 else 100,
+            "cost_usd": round(today["cost_usd"], 4),
+        },
+        "week": {
+            "total": week["total"],
+            "completed": week["completed"],
+            "success_rate": round(week["completed"] / week["total"] * 100, 1) if week["total"] > 0 else 100,
+        },
+        "performance": {
+            "avg_duration_seconds": round(jobs["avg_duration_seconds"], 2),
+            "total_cost_usd": round(jobs["total_cost_usd"], 4),
+        },
+        "jobs_by_country": jobs["by_country"],
+        "jobs_by_scraper": jobs["by_scraper"],
+        "recent_failures": [
+            {
+                "id": j.id,
+                "query": j.query[:50] if j.query else "",
+                "error": j.error[:100] if j.error else "Unknown",
+                "created_at": j.created_at.isoformat() if j.created_at else None,
+            }
+            for j in recent_failed
+        ],
+        "generated_at": now.isoformat(),
+    }
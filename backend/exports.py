@@ -0,0 +1,144 @@
+"""
+Serializers for the streaming bulk export (/api/export).
+
+Each writer consumes an iterator of record batches (lists of dicts shaped
+like RunResponse plus queryId/query) and yields encoded byte chunks as it
+goes, so only one batch is ever held in memory.
+
+Formats:
+- ndjson: one JSON object per run, brands and sources nested
+- csv: one row per run, brands and sources JSON-encoded in their columns
+- parquet: one row group per batch, brands and sources as list<struct>
+  (requires the optional pyarrow package)
+"""
+
+import csv
+import io
+import json
+from typing import Iterable, Iterator, Literal
+
+
+ExportFormat = Literal["ndjson", "csv", "parquet"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Scalar columns, in output order; brands and sources follow
+RUN_COLUMNS = ["queryId", "query", "id", "runNumber", "scrapedAt", "visibility", "avgPosition", "totalMentions", "responseText"]
+NESTED_COLUMNS = ["brands", "sources"]
+
+
+def ndjson_chunks(batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in batch).encode()
+
+
+def csv_chunks(batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RUN_COLUMNS + NESTED_COLUMNS)
+    writer.writeheader()
+    for batch in batches:
+        for record in batch:
+            writer.writerow({
+                **{column: record[column] for column in RUN_COLUMNS},
+                **{column: json.dumps(record[column], ensure_ascii=False) for column in NESTED_COLUMNS},
+            })
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file object that hands written bytes back to the caller."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    brand = pa.struct([
+        ("brandId", pa.string()),
+        ("brandName", pa.string()),
+        ("position", pa.int32()),
+        ("mentioned", pa.bool_()),
+        ("sentiment", pa.string()),
+    ])
+    source = pa.struct([
+        ("domain", pa.string()),
+        ("url", pa.string()),
+        ("title", pa.string()),
+        ("description", pa.string()),
+        ("publishedDate", pa.string()),
+        ("citationOrder", pa.int32()),
+    ])
+    return pa.schema([
+        ("queryId", pa.string()),
+        ("query", pa.string()),
+        ("id", pa.int64()),
+        ("runNumber", pa.int32()),
+        ("scrapedAt", pa.string()),
+        ("visibility", pa.float64()),
+        ("avgPosition", pa.float64()),
+        ("totalMentions", pa.int32()),
+        ("responseText", pa.string()),
+        ("brands", pa.list_(brand)),
+        ("sources", pa.list_(source)),
+    ])
+
+
+def parquet_chunks(batches: Iterable[list[dict]]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for batch in batches:
+            if batch:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+WRITERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+    "parquet": parquet_chunks,
+}
@@ -0,0 +1,122 @@
+"""
+Leases on ScrapeJob rows, so several backend workers share the work safely.
+
+Every backend worker (gunicorn -w N, or several hosts) runs a scheduler, and
+all of them wake when a job falls due. claim_due_jobs() hands each due job to
+exactly one of them by setting lease_owner / lease_expires_at on it and
+committing straight away. Due rows under a live lease are not claimed again.
+
+- PostgreSQL: the candidate rows are picked with SELECT ... FOR UPDATE SKIP
+  LOCKED, so concurrent claimers split the due jobs between them instead of
+  waiting on each other's row locks.
+- SQLite (no row locks): a single UPDATE picks and leases the rows; SQLite
+  runs writes one at a time, so two workers cannot lease the same row.
+
+The claimer then dispatches each job in its own transaction, which commits
+the new run, the advanced next_run_at and release() together. A job whose
+dispatch fails is held with hold() and retried once the hold lapses, without
+holding up the others. If the worker dies, its leases lapse after
+SCHEDULER_LEASE_SECONDS and another worker claims the jobs.
+
+Runs waiting in a worker's in-memory scrape pool queue (status "pending")
+are leased the same way: to the worker that created them, renewed with
+renew_leases() while they wait, and ended when the run starts. Pending jobs
+whose lease lapsed, because their worker died or restarted, are taken over
+with claim_orphaned_runs() and queued again. Pending jobs without a lease
+predate leasing and are never taken over (migration 0005 fails them).
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, update
+from sqlalchemy.orm import undefer
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models import ScrapeJob
+
+
+# How long a claim lasts before another worker may take the job over; also
+# how long a job whose dispatch failed waits before it is tried again
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "60"))
+
+
+def _due(now: datetime):
+    return (
+        ScrapeJob.is_active == True,
+        ScrapeJob.frequency != None,
+        ScrapeJob.next_run_at <= now,
+    )
+
+
+async def _claim(session: AsyncSession, owner: str, criteria: tuple, order_by, limit: int) -> list[ScrapeJob]:
+    """Lease up to limit unleased jobs matching criteria to owner (committed)."""
+    now = datetime.utcnow()
+    expires = now + timedelta(seconds=SCHEDULER_LEASE_SECONDS)
+    unleased = or_(ScrapeJob.lease_expires_at == None, ScrapeJob.lease_expires_at < now)
+    candidates = select(ScrapeJob.id).where(*criteria, unleased).order_by(order_by).limit(limit)
+    if session.get_bind().dialect.name == "postgresql":
+        claimed = ScrapeJob.id.in_((await session.exec(candidates.with_for_update(skip_locked=True))).all())
+    else:
+        claimed = ScrapeJob.id.in_(candidates.scalar_subquery())
+    await session.exec(
+        update(ScrapeJob)
+        .where(claimed, *criteria, unleased)
+        .values(lease_owner=owner, lease_expires_at=expires)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return (await session.exec(
+        select(ScrapeJob).where(ScrapeJob.lease_owner == owner, ScrapeJob.lease_expires_at == expires)
+        .order_by(order_by)
+        .options(undefer(ScrapeJob.config_snapshot))  # Cloned into each run / the run's config
+    )).all()
+
+
+async def claim_due_jobs(session: AsyncSession, owner: str, limit: int) -> list[ScrapeJob]:
+    """Lease up to limit due recurring jobs to owner (committed), earliest first."""
+    return await _claim(session, owner, _due(datetime.utcnow()), ScrapeJob.next_run_at, limit)
+
+
+async def claim_orphaned_runs(session: AsyncSession, owner: str, limit: int) -> list[ScrapeJob]:
+    """Lease up to limit pending jobs whose worker is gone (lease lapsed), oldest first."""
+    orphaned = (ScrapeJob.status == "pending", ScrapeJob.lease_expires_at != None)
+    return await _claim(session, owner, orphaned, ScrapeJob.created_at, limit)
+
+
+def lease_expiry() -> datetime:
+    """Expiry for a lease taken now, e.g. on a run created and queued by this worker."""
+    return datetime.utcnow() + timedelta(seconds=SCHEDULER_LEASE_SECONDS)
+
+
+async def renew_leases(session: AsyncSession, owner: str, job_ids: list[int]) -> None:
+    """Extend owner's leases on its queued (pending) jobs."""
+    if not job_ids:
+        return
+    await session.exec(
+        update(ScrapeJob)
+        .where(ScrapeJob.id.in_(job_ids), ScrapeJob.lease_owner == owner, ScrapeJob.status == "pending")
+        .values(lease_expires_at=lease_expiry())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+def release(job: ScrapeJob) -> None:
+    """Clear a job's claim; takes effect with the dispatch commit."""
+    job.lease_owner = None
+    job.lease_expires_at = None
+
+
+async def hold(session: AsyncSession, job_id: int, owner: str) -> datetime:
+    """Extend owner's claim on a job whose dispatch failed; returns when it may be retried."""
+    until = lease_expiry()
+    await session.exec(
+        update(ScrapeJob)
+        .where(ScrapeJob.id == job_id, ScrapeJob.lease_owner == owner)
+        .values(lease_expires_at=until)
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+    return until
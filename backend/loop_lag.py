@@ -0,0 +1,74 @@
+"""
+Event-loop lag monitor.
+
+A background task sleeps for LOOP_LAG_INTERVAL seconds at a time and records
+how late it wakes up. The overshoot is time the event loop spent inside code
+that did not yield: a blocking database call, file I/O or CPU work in an async
+route or task. While it happens, every other request and the scheduler wait.
+
+/api/event-loop/lag serves the numbers, so the effect of a change can be
+compared before and after. Counters are per worker process.
+"""
+
+import asyncio
+import os
+from collections import deque
+
+
+# Seconds between probes; lag below this resolution is still measured
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+
+# Recent lag samples kept for percentiles
+LAG_SAMPLES = 1000
+
+# A wake-up this late counts as a stall
+STALL_THRESHOLD = 0.1
+
+
+class LoopLagMonitor:
+    """Measures scheduling delay of the running event loop."""
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._lags: deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.samples = 0
+        self.stalls = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    def record(self, lag: float) -> None:
+        self._lags.append(lag)
+        self.samples += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+        if lag >= STALL_THRESHOLD:
+            self.stalls += 1
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, loop.time() - expected))
+
+    def stats(self) -> dict:
+        # Read on the loop thread (async route), so no lock is needed
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))] * 1000, 2) if lags else 0
+
+        return {
+            "interval_ms": round(self.interval * 1000, 1),
+            "samples": self.samples,
+            "stalls": self.stalls,
+            "stall_threshold_ms": round(STALL_THRESHOLD * 1000, 1),
+            "avg_lag_ms": round(self.total_lag / self.samples * 1000, 2) if self.samples else 0,
+            "p50_lag_ms": percentile(0.50),
+            "p95_lag_ms": percentile(0.95),
+            "p99_lag_ms": percentile(0.99),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+loop_lag_monitor = LoopLagMonitor()
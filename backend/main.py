@@ -1,23 +1,59 @@
 import os
-from typing import List
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, status
+from typing import Callable, List
+from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks, Query, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, StreamingResponse
 from sqlmodel import Session, select, func
-from datetime import datetime, timedelta
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlalchemy import and_, case, delete, exists, or_, true, update
+from sqlalchemy.orm import undefer, undefer_group
+from datetime import date, datetime, timedelta
 from collections import Counter
+from functools import partial
 from itertools import groupby
-import requests
 import json
+import httpx
 from pydantic import BaseModel, Field
 
-from database import create_db_and_tables, get_session, engine
+from database import async_session, create_db_and_tables, get_session, engine, pool_stats
 
-# Scraper API URL - configurable for production vs local
-SCRAPER_API_URL = os.getenv("SCRAPER_API_URL", "http://aiseo-scraper:5000")
-from models import Brand, Prompt, PromptBrandMention, Source, PromptSource, ScrapeJob, DailyStats, PromptTemplate
+from models import Brand, BrandBackfill, BrandVisibilityRollup, SearchQuery, Prompt, PromptBrandMention, Source, PromptSource, ScrapeJob, DailyStats, PromptTemplate
 from admin import setup_admin
+from aggregations import (
+    BrandPeriodStats,
+    brand_aggregates,
+    brand_mention_totals,
+    brand_mentioned_queries,
+    brand_mentions_in_window,
+    brand_period_stats,
+    compute_trend,
+    count_queries,
+    top_mentions,
+    visibility_pct,
+)
+from rollups import (
+    backfill_visibility_rollup_if_empty,
+    refresh_visibility_rollup,
+    visibility_series,
+)
+from timewindow import TimeWindow, get_time_window, in_period, resolve_window
+from response_cache import bump_data_version, monitoring_cache, response_cache
+from loop_lag import loop_lag_monitor
+from job_claims import SCHEDULER_LEASE_SECONDS, claim_orphaned_runs, lease_expiry, renew_leases
+from scheduler import job_scheduler
+from scrape_pool import resolve_layer2_mode, scrape_pool
+from snapshot_migration import run_snapshot_migration
+import scraper_client
+from db_stats import daily_job_counts, database_stats
+from daily_stats import average_duration, get_or_create_daily_stats, increment_daily_stats, record_job_completion, set_daily_quota
+from queries import backfill_query_ids, format_query_id, parse_query_id
+from source_categories import classify_domain, classify_source, reclassify_sources
+from brand_matcher import get_brand_matcher
+from brand_backfill import claim_orphaned_backfills, create_brand_backfill, run_brand_backfill
+from blob_store import BlobRef, get_blob_store
+from pagination import DEFAULT_PAGE_SIZE, NEXT_CURSOR_HEADER, after_cursor, decode_cursor, paginate
+from exports import MEDIA_TYPES, WRITERS, ExportFormat, parquet_available
 from schemas import (
     BrandResponse,
     PromptResponse,
@@ -42,6 +78,7 @@ from schemas import (
     BrandListResponse,
     BrandPromptDetail,
     BrandMonthlyVisibility,
+    BrandBackfillResponse,
 )
 
 app = FastAPI(
@@ -138,6 +175,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "X-Cache"],
 )
 
 # Session middleware required for SQLAdmin authentication
@@ -151,6 +189,62 @@ app.add_middleware(
 # Access the UI at http://localhost:8000/admin
 setup_admin(app, engine)
 
+# Read-only analytics endpoints served from the response cache (see response_cache.py)
+CACHED_PATHS = {
+    "/api/brands",
+    "/api/prompts",
+    "/api/sources",
+    "/api/metrics",
+    "/api/visibility",
+    "/api/sources/analytics",
+    "/api/suggestions",
+}
+
+# Monitoring endpoints polled by the admin dashboard, cached for a few seconds
+MONITORING_CACHED_PATHS = {
+    "/api/stats/database",
+}
+
+
+@app.middleware("http")
+async def cache_analytics_responses(request, call_next):
+    """Serve cached analytics GETs; cache successful responses on a miss."""
+    if request.method != "GET":
+        return await call_next(request)
+    if request.url.path in CACHED_PATHS:
+        cache = response_cache
+    elif request.url.path in MONITORING_CACHED_PATHS:
+        cache = monitoring_cache
+    else:
+        return await call_next(request)
+
+    key = cache.make_key(request.url.path, request.query_params.multi_items())
+    cached = cache.get(key)
+    if cached:
+        return Response(
+            content=cached.body,
+            status_code=cached.status_code,
+            media_type=cached.media_type,
+            headers={**cached.headers, "X-Cache": "HIT"},
+        )
+
+    response = await call_next(request)
+    if response.status_code != 200:
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    media_type = response.headers.get("content-type")
+    # Endpoint-set headers (e.g. X-Next-Cursor) are replayed on hits
+    headers = {name: value for name, value in response.headers.items() if name.lower().startswith("x-")}
+    cache.set(key, body, response.status_code, media_type, headers)
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        media_type=media_type,
+        headers={**headers, "X-Cache": "MISS"},
+    )
+
+
 # Custom ReDoc with Postman button
 @app.get("/redoc", include_in_schema=False)
 async def redoc_html():
@@ -243,6 +337,11 @@ async def postman_collection():
 def on_startup():
     create_db_and_tables()
     seed_brands()
+    with Session(engine) as session:
+        backfill_query_ids(session)
+        reclassify_sources(session, only_missing=True)
+        session.commit()
+        backfill_visibility_rollup_if_empty(session)
 
 
 def seed_brands():
@@ -283,27 +382,61 @@ def seed_brands():
             session.rollback()
 
 
-def get_run_data(session: Session, prompt: Prompt, brands: list[Brand]) -> RunResponse:
+def get_runs_data(session: Session, prompts: list[Prompt], brands: list[Brand]) -> list[RunResponse]:
     """
-    Build run response data for a single prompt/scrape run.
+    Build run responses for a batch of prompts/scrape runs.
     
-    Aggregates data from:
-    - Brand mentions (position, sentiment, mentioned status)
-    - Sources (citations with order)
-    - Visibility calculation (based on primary brand position)
+    Mentions and sources for all prompts are loaded with two IN-list queries
+    (sources are joined to their links), so the number of queries does not
+    grow with the number of runs or citations.
     
     Args:
         session: Database session
-        prompt: Prompt/run to process
+        prompts: Prompts/runs to process
         brands: List of all brands to check for mentions
     
     Returns:
-        RunResponse: Complete run data with brands, sources, and metrics
+        list[RunResponse]: Run data in the same order as `prompts`
     """
-    mentions = session.exec(
-        select(PromptBrandMention).where(PromptBrandMention.prompt_id == prompt.id)
-    ).all()
+    prompt_ids = [p.id for p in prompts]
+
+    mentions_by_prompt: dict[int, list[PromptBrandMention]] = {}
+    for mention in session.exec(
+        select(PromptBrandMention)
+        .where(PromptBrandMention.prompt_id.in_(prompt_ids))
+        .order_by(PromptBrandMention.id)
+    ).all():
+        mentions_by_prompt.setdefault(mention.prompt_id, []).append(mention)
+
+    sources_by_prompt: dict[int, list[tuple[PromptSource, Source]]] = {}
+    for link, source in session.exec(
+        select(PromptSource, Source)
+        .join(Source, Source.id == PromptSource.source_id)
+        .where(PromptSource.prompt_id.in_(prompt_ids))
+        .order_by(PromptSource.id)
+    ).all():
+        sources_by_prompt.setdefault(link.prompt_id, []).append((link, source))
+
+    return [
+        build_run_data(prompt, mentions_by_prompt.get(prompt.id, []), sources_by_prompt.get(prompt.id, []), brands)
+        for prompt in prompts
+    ]
+
 
+def build_run_data(
+    prompt: Prompt,
+    mentions: list[PromptBrandMention],
+    sources: list[tuple[PromptSource, Source]],
+    brands: list[Brand],
+) -> RunResponse:
+    """
+    Assemble a RunResponse from preloaded rows.
+    
+    Aggregates data from:
+    - Brand mentions (position, sentiment, mentioned status)
+    - Sources (citations with order)
+    - Visibility calculation (based on primary brand position)
+    """
     brand_responses = []
     for brand in brands:
         mention = next((m for m in mentions if m.brand_id == brand.id), None)
@@ -317,24 +450,17 @@ def get_run_data(session: Session, prompt: Prompt, brands: list[Brand]) -> RunRe
             )
         )
 
-    # Get sources
-    prompt_sources = session.exec(
-        select(PromptSource).where(PromptSource.prompt_id == prompt.id)
-    ).all()
-    source_responses = []
-    for ps in prompt_sources:
-        source = session.get(Source, ps.source_id)
-        if source:
-            source_responses.append(
-                SourceInPromptResponse(
-                    domain=source.domain,
-                    url=source.url,
-                    title=source.title,
-                    description=source.description,
-                    publishedDate=source.published_date,
-                    citationOrder=ps.citation_order,
-                )
-            )
+    source_responses = [
+        SourceInPromptResponse(
+            domain=source.domain,
+            url=source.url,
+            title=source.title,
+            description=source.description,
+            publishedDate=source.published_date,
+            citationOrder=ps.citation_order,
+        )
+        for ps, source in sources
+    ]
     source_responses.sort(key=lambda x: x.citationOrder)
 
     mentioned_brands = [b for b in brand_responses if b.mentioned]
@@ -371,12 +497,15 @@ def get_run_data(session: Session, prompt: Prompt, brands: list[Brand]) -> RunRe
     tags=["brands"],
     summary="List all brands",
     description="""
-    Get all brands with computed visibility metrics for January 2026.
+    Get all brands with computed visibility metrics for the current period.
+    
+    The current period is the last period of the window given by `from`, `to`
+    and `granularity` (default: the month of the most recent scrape).
     
     Metrics include:
     - **Visibility**: Percentage of prompts mentioning the brand
     - **Average Position**: Average position when mentioned
-    - **Trend**: Month-over-month trend (up/down/stable)
+    - **Trend**: Period-over-period trend (up/down/stable)
     - **Sentiment**: Most common sentiment
     
     Brands are sorted with primary brand first, then by visibility descending.
@@ -404,74 +533,24 @@ def get_run_data(session: Session, prompt: Prompt, brands: list[Brand]) -> RunRe
         }
     }
 )
-def get_brands(session: Session = Depends(get_session)):
+def get_brands(
+    window: TimeWindow = Depends(get_time_window),
+    session: Session = Depends(get_session),
+):
     """
     Get all brands with computed metrics.
     
-    Calculates visibility based on January 2026 prompts only.
-    Trend is calculated by comparing January vs December 2025 visibility.
+    Calculates visibility based on prompts in the current period only.
+    Trend is calculated by comparing it with the previous period.
     """
     brands = session.exec(select(Brand)).all()
-
-    # Get prompts by month
-    all_prompts = session.exec(select(Prompt)).all()
-    jan_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2026-01"]
-    dec_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2025-12"]
-
-    jan_queries = set(p.query for p in jan_prompts)
-    dec_queries = set(p.query for p in dec_prompts)
-    total_jan_queries = len(jan_queries)
-    total_dec_queries = len(dec_queries)
+    agg = brand_aggregates(session, window)
 
     result = []
     for brand in brands:
-        # Get January mentions
-        jan_mentioned_queries = set()
-        jan_positions = []
-        jan_sentiments = []
-
-        for prompt in jan_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == brand.id,
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                jan_mentioned_queries.add(prompt.query)
-                if mention.position:
-                    jan_positions.append(mention.position)
-                if mention.sentiment:
-                    jan_sentiments.append(mention.sentiment)
-
-        jan_visibility = (len(jan_mentioned_queries) / total_jan_queries * 100) if total_jan_queries > 0 else 0
-        avg_position = sum(jan_positions) / len(jan_positions) if jan_positions else 0
-        most_common_sentiment = (
-            Counter(jan_sentiments).most_common(1)[0][0] if jan_sentiments else "neutral"
-        )
-
-        # Get December mentions for trend calculation
-        dec_mentioned_queries = set()
-        for prompt in dec_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == brand.id,
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                dec_mentioned_queries.add(prompt.query)
-
-        dec_visibility = (len(dec_mentioned_queries) / total_dec_queries * 100) if total_dec_queries > 0 else 0
-
-        # Determine trend by comparing Jan vs Dec visibility
-        trend = "stable"
-        if jan_visibility > dec_visibility + 2:  # +2% threshold to avoid noise
-            trend = "up"
-        elif jan_visibility < dec_visibility - 2:
-            trend = "down"
+        stats = agg.current.get(brand.id, BrandPeriodStats())
+        current_visibility = visibility_pct(stats.mentioned_queries, agg.current_total_queries)
+        previous_visibility = visibility_pct(agg.previous_mentioned.get(brand.id, 0), agg.previous_total_queries)
 
         result.append(
             BrandResponse(
@@ -479,10 +558,10 @@ def get_brands(session: Session = Depends(get_session)):
                 name=brand.name,
                 type=brand.type,
                 color=brand.color,
-                visibility=round(jan_visibility, 1),
-                avgPosition=round(avg_position, 1),
-                trend=trend,
-                sentiment=most_common_sentiment,
+                visibility=round(current_visibility, 1),
+                avgPosition=round(stats.avg_position, 1),
+                trend=compute_trend(current_visibility, previous_visibility),
+                sentiment=stats.sentiment,
             )
         )
 
@@ -499,8 +578,8 @@ def get_brands(session: Session = Depends(get_session)):
     Get comprehensive brand analytics with monthly breakdown.
     
     Includes:
-    - Current month metrics (January 2026)
-    - Monthly visibility trends (Sep 2025 - Jan 2026)
+    - Current period metrics (last period of the window)
+    - Visibility per period across the window (default: last five months)
     - Top prompts where brand is mentioned
     - Total mentions across all time
     - Brand variations and search terms
@@ -512,7 +591,10 @@ def get_brands(session: Session = Depends(get_session)):
         }
     }
 )
-def get_brands_details(session: Session = Depends(get_session)):
+def get_brands_details(
+    window: TimeWindow = Depends(get_time_window),
+    session: Session = Depends(get_session),
+):
     """
     Get detailed brand analytics for brand management page.
     
@@ -520,30 +602,29 @@ def get_brands_details(session: Session = Depends(get_session)):
     top prompts, and total mention counts.
     """
     brands = session.exec(select(Brand)).all()
-    all_prompts = session.exec(select(Prompt)).all()
-
-    # Group prompts by month
-    months_order = ["Sep 2025", "Oct 2025", "Nov 2025", "Dec 2025", "Jan 2026"]
-    month_map = {
-        "2025-09": "Sep 2025",
-        "2025-10": "Oct 2025",
-        "2025-11": "Nov 2025",
-        "2025-12": "Dec 2025",
-        "2026-01": "Jan 2026",
-    }
+    result = build_brand_details(session, brands, window)
+
+    # Sort: primary brand first, then by visibility descending
+    result.sort(key=lambda x: (x.type != "primary", -x.visibility))
+    return BrandListResponse(brands=result)
 
-    prompts_by_month = {m: [] for m in months_order}
-    for prompt in all_prompts:
-        if prompt.scraped_at:
-            month_key = prompt.scraped_at.strftime("%Y-%m")
-            if month_key in month_map:
-                prompts_by_month[month_map[month_key]].append(prompt)
 
-    # January prompts for current stats
-    jan_prompts = prompts_by_month.get("Jan 2026", [])
-    dec_prompts = prompts_by_month.get("Dec 2025", [])
-    jan_queries = set(p.query for p in jan_prompts)
-    dec_queries = set(p.query for p in dec_prompts)
+def build_brand_details(
+    session: Session, brands: list[Brand], window: TimeWindow | None = None
+) -> list[BrandDetailResponse]:
+    """
+    Build BrandDetailResponse objects for a set of brands.
+    
+    All metrics come from a fixed number of grouped queries (see aggregations.py),
+    regardless of how many brands, prompts or months are involved.
+    Defaults to the window ending with the most recent scrape.
+    """
+    window = window or resolve_window(session)
+    brand_ids = [b.id for b in brands]
+    agg = brand_aggregates(session, window, brand_ids)
+    mentions = brand_mentions_in_window(session, window.current.start, window.current.end, brand_ids)
+    period_totals, period_mentioned = visibility_series(session, window, brand_ids)
+    mention_totals = brand_mention_totals(session, brand_ids)
 
     result = []
     for brand in brands:
@@ -551,96 +632,28 @@ def get_brands_details(session: Session = Depends(get_session)):
         variations = brand.variations.split(",") if brand.variations else [brand.name]
         variations = [v.strip() for v in variations if v.strip()]
 
-        # Get January mentions for current stats
-        jan_mentioned_queries = set()
-        jan_positions = []
-        jan_sentiments = []
-        top_prompts = []
-
-        for prompt in jan_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == brand.id,
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                jan_mentioned_queries.add(prompt.query)
-                if mention.position:
-                    jan_positions.append(mention.position)
-                if mention.sentiment:
-                    jan_sentiments.append(mention.sentiment)
-                top_prompts.append(BrandPromptDetail(
-                    query=prompt.query,
-                    position=mention.position,
-                    sentiment=mention.sentiment,
-                    scrapedAt=prompt.scraped_at.isoformat() if prompt.scraped_at else ""
-                ))
-
-        # Deduplicate top_prompts by query, keep best position
-        unique_prompts = {}
-        for tp in top_prompts:
-            if tp.query not in unique_prompts or (tp.position and (not unique_prompts[tp.query].position or tp.position < unique_prompts[tp.query].position)):
-                unique_prompts[tp.query] = tp
-        top_prompts = sorted(unique_prompts.values(), key=lambda x: x.position if x.position else 999)[:10]
-
-        jan_visibility = (len(jan_mentioned_queries) / len(jan_queries) * 100) if jan_queries else 0
-        avg_position = sum(jan_positions) / len(jan_positions) if jan_positions else 0
-        most_common_sentiment = Counter(jan_sentiments).most_common(1)[0][0] if jan_sentiments else "neutral"
-
-        # Calculate December visibility for trend
-        dec_mentioned_queries = set()
-        for prompt in dec_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == brand.id,
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                dec_mentioned_queries.add(prompt.query)
-
-        dec_visibility = (len(dec_mentioned_queries) / len(dec_queries) * 100) if dec_queries else 0
-
-        trend = "stable"
-        if jan_visibility > dec_visibility + 2:
-            trend = "up"
-        elif jan_visibility < dec_visibility - 2:
-            trend = "down"
-
-        # Calculate visibility by month
-        visibility_by_month = []
-        for month_name in months_order:
-            month_prompts = prompts_by_month.get(month_name, [])
-            month_queries = set(p.query for p in month_prompts)
-
-            mentioned_queries = set()
-            for prompt in month_prompts:
-                mention = session.exec(
-                    select(PromptBrandMention).where(
-                        PromptBrandMention.prompt_id == prompt.id,
-                        PromptBrandMention.brand_id == brand.id,
-                        PromptBrandMention.mentioned == True,
-                    )
-                ).first()
-                if mention:
-                    mentioned_queries.add(prompt.query)
-
-            month_visibility = (len(mentioned_queries) / len(month_queries) * 100) if month_queries else 0
-            visibility_by_month.append(BrandMonthlyVisibility(
-                month=month_name,
-                visibility=round(month_visibility, 1)
-            ))
+        stats = agg.current.get(brand.id, BrandPeriodStats())
+        current_visibility = visibility_pct(stats.mentioned_queries, agg.current_total_queries)
+        previous_visibility = visibility_pct(agg.previous_mentioned.get(brand.id, 0), agg.previous_total_queries)
 
-        # Count total mentions across all time
-        total_mentions = session.exec(
-            select(func.count(PromptBrandMention.id)).where(
-                PromptBrandMention.brand_id == brand.id,
-                PromptBrandMention.mentioned == True,
+        top_prompts = [
+            BrandPromptDetail(
+                query=m.query,
+                position=m.position,
+                sentiment=m.sentiment,
+                scrapedAt=m.scraped_at.isoformat() if m.scraped_at else ""
             )
-        ).one()
+            for m in top_mentions(mentions.get(brand.id, []))
+        ]
+
+        brand_periods = period_mentioned.get(brand.id, {})
+        visibility_by_month = [
+            BrandMonthlyVisibility(
+                month=period.label,
+                visibility=round(visibility_pct(brand_periods.get(period.key, 0), period_totals[period.key]), 1)
+            )
+            for period in window.periods
+        ]
 
         result.append(BrandDetailResponse(
             id=brand.id,
@@ -648,19 +661,17 @@ def get_brands_details(session: Session = Depends(get_session)):
             type=brand.type,
             color=brand.color,
             variations=variations,
-            visibility=round(jan_visibility, 1),
-            avgPosition=round(avg_position, 1),
-            trend=trend,
-            sentiment=most_common_sentiment,
-            totalMentions=total_mentions,
-            totalPrompts=len(jan_mentioned_queries),
+            visibility=round(current_visibility, 1),
+            avgPosition=round(stats.avg_position, 1),
+            trend=compute_trend(current_visibility, previous_visibility),
+            sentiment=stats.sentiment,
+            totalMentions=mention_totals.get(brand.id, 0),
+            totalPrompts=stats.mentioned_queries,
             topPrompts=top_prompts,
             visibilityByMonth=visibility_by_month
         ))
 
-    # Sort: primary brand first, then by visibility descending
-    result.sort(key=lambda x: (x.type != "primary", -x.visibility))
-    return BrandListResponse(brands=result)
+    return result
 
 
 @app.post(
@@ -668,13 +679,16 @@ def get_brands_details(session: Session = Depends(get_session)):
     tags=["brands"],
     summary="Create a new brand",
     description="""
-    Create a new brand and automatically sync mentions from all existing prompts.
+    Create a new brand and start syncing its mentions from all existing prompts.
     
     The system will:
     1. Create the brand record
-    2. Scan all existing prompts for brand mentions
-    3. Create mention records with position and sentiment
-    4. Return the created brand with analytics
+    2. Start a background backfill that scans existing prompts for the brand
+       in chunks and creates mention records with position and sentiment
+    3. Return the backfill immediately; poll `GET /api/brands/backfills/{backfill_id}`
+       for progress. Brand analytics are complete once its status is `completed`.
+    
+    Prompts scraped after the brand is created get their mentions at ingest.
     
     **Brand ID Format:**
     - Lowercase, no spaces
@@ -685,11 +699,11 @@ def get_brands_details(session: Session = Depends(get_session)):
     - `primary`: Your main brand (only one allowed)
     - `competitor`: Competitor brands
     """,
-    response_model=BrandDetailResponse,
-    status_code=status.HTTP_201_CREATED,
+    response_model=BrandBackfillResponse,
+    status_code=status.HTTP_202_ACCEPTED,
     responses={
-        201: {
-            "description": "Brand created successfully",
+        202: {
+            "description": "Brand created, mention backfill started",
         },
         400: {
             "description": "Brand ID already exists",
@@ -701,15 +715,14 @@ def get_brands_details(session: Session = Depends(get_session)):
         }
     }
 )
-def create_brand(brand_data: BrandCreate, session: Session = Depends(get_session)):
+def create_brand(brand_data: BrandCreate, background_tasks: BackgroundTasks, session: Session = Depends(get_session)):
     """
-    Create a new brand and sync mentions from existing prompts.
+    Create a new brand and queue the sync of its mentions from existing prompts.
     
-    Automatically detects brand mentions in all existing prompt responses
-    and creates mention records with position and sentiment analysis.
+    The brand and its backfill job are committed together; the backfill
+    itself (see brand_backfill.py) runs after the response is sent, and is
+    resumed by another worker if this one restarts before it finishes.
     """
-    import re
-
     # Check if brand already exists
     existing = session.get(Brand, brand_data.id)
     if existing:
@@ -725,201 +738,65 @@ def create_brand(brand_data: BrandCreate, session: Session = Depends(get_session
         variations=variations_str
     )
     session.add(new_brand)
+    backfill = create_brand_backfill(session, new_brand.id, job_scheduler.worker_id)
     session.commit()
-    session.refresh(new_brand)
-
-    # Sync mentions for all existing prompts
-    all_prompts = session.exec(select(Prompt)).all()
-    search_terms = brand_data.variations if brand_data.variations else [brand_data.name]
-
-    for prompt in all_prompts:
-        if not prompt.response_text:
-            continue
-
-        response_lower = prompt.response_text.lower()
-
-        # Check if any variation is mentioned
-        mentioned = False
-        position = None
-        context = None
-
-        for term in search_terms:
-            if term.lower() in response_lower:
-                mentioned = True
-                # Find position (simple: count newlines before first mention)
-                idx = response_lower.find(term.lower())
-                # Estimate position by checking for numbered lists or paragraph position
-                before_text = response_lower[:idx]
-                # Count how many other brands appear before
-                brands = session.exec(select(Brand)).all()
-                other_brands_before = 0
-                for b in brands:
-                    b_variations = b.variations.split(",") if b.variations else [b.name]
-                    for bv in b_variations:
-                        bv_idx = response_lower.find(bv.lower())
-                        if 0 <= bv_idx < idx:
-                            other_brands_before += 1
-                            break
-                position = other_brands_before + 1
-
-                # Extract context (50 chars before and after)
-                start = max(0, idx - 50)
-                end = min(len(prompt.response_text), idx + len(term) + 50)
-                context = prompt.response_text[start:end]
-                break
-
-        # Create mention record
-        mention = PromptBrandMention(
-            prompt_id=prompt.id,
-            brand_id=new_brand.id,
-            mentioned=mentioned,
-            position=position if mentioned else None,
-            sentiment="neutral",  # Default sentiment
-            context=context
-        )
-        session.add(mention)
-
-    session.commit()
+    session.refresh(backfill)
+    bump_data_version()
 
-    # Return the brand details
-    return get_brand_detail(new_brand.id, session)
+    background_tasks.add_task(run_brand_backfill, backfill.id, job_scheduler.worker_id)
 
+    return build_backfill_response(backfill)
 
-def get_brand_detail(brand_id: str, session: Session) -> BrandDetailResponse:
-    """Helper to get brand detail response"""
-    brand = session.get(Brand, brand_id)
-    if not brand:
-        raise HTTPException(status_code=404, detail="Brand not found")
 
-    all_prompts = session.exec(select(Prompt)).all()
-
-    # January prompts
-    jan_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2026-01"]
-    dec_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2025-12"]
-    jan_queries = set(p.query for p in jan_prompts)
-    dec_queries = set(p.query for p in dec_prompts)
-
-    variations = brand.variations.split(",") if brand.variations else [brand.name]
-    variations = [v.strip() for v in variations if v.strip()]
-
-    # Get January mentions
-    jan_mentioned_queries = set()
-    jan_positions = []
-    jan_sentiments = []
-    top_prompts = []
-
-    for prompt in jan_prompts:
-        mention = session.exec(
-            select(PromptBrandMention).where(
-                PromptBrandMention.prompt_id == prompt.id,
-                PromptBrandMention.brand_id == brand.id,
-                PromptBrandMention.mentioned == True,
-            )
-        ).first()
-        if mention:
-            jan_mentioned_queries.add(prompt.query)
-            if mention.position:
-                jan_positions.append(mention.position)
-            if mention.sentiment:
-                jan_sentiments.append(mention.sentiment)
-            top_prompts.append(BrandPromptDetail(
-                query=prompt.query,
-                position=mention.position,
-                sentiment=mention.sentiment,
-                scrapedAt=prompt.scraped_at.isoformat() if prompt.scraped_at else ""
-            ))
-
-    unique_prompts = {}
-    for tp in top_prompts:
-        if tp.query not in unique_prompts or (tp.position and (not unique_prompts[tp.query].position or tp.position < unique_prompts[tp.query].position)):
-            unique_prompts[tp.query] = tp
-    top_prompts = sorted(unique_prompts.values(), key=lambda x: x.position if x.position else 999)[:10]
-
-    jan_visibility = (len(jan_mentioned_queries) / len(jan_queries) * 100) if jan_queries else 0
-    avg_position = sum(jan_positions) / len(jan_positions) if jan_positions else 0
-    most_common_sentiment = Counter(jan_sentiments).most_common(1)[0][0] if jan_sentiments else "neutral"
-
-    dec_mentioned_queries = set()
-    for prompt in dec_prompts:
-        mention = session.exec(
-            select(PromptBrandMention).where(
-                PromptBrandMention.prompt_id == prompt.id,
-                PromptBrandMention.brand_id == brand.id,
-                PromptBrandMention.mentioned == True,
-            )
-        ).first()
-        if mention:
-            dec_mentioned_queries.add(prompt.query)
-
-    dec_visibility = (len(dec_mentioned_queries) / len(dec_queries) * 100) if dec_queries else 0
-
-    trend = "stable"
-    if jan_visibility > dec_visibility + 2:
-        trend = "up"
-    elif jan_visibility < dec_visibility - 2:
-        trend = "down"
-
-    # Visibility by month
-    months_order = ["Sep 2025", "Oct 2025", "Nov 2025", "Dec 2025", "Jan 2026"]
-    month_map = {
-        "2025-09": "Sep 2025",
-        "2025-10": "Oct 2025",
-        "2025-11": "Nov 2025",
-        "2025-12": "Dec 2025",
-        "2026-01": "Jan 2026",
+@app.get(
+    "/api/brands/backfills/{backfill_id}",
+    tags=["brands"],
+    summary="Get brand backfill progress",
+    description="""
+    Progress of the mention backfill started by `POST /api/brands`.
+    
+    `status` is `pending`, `running`, `completed` or `failed` (with `error` set).
+    `progress` is the percentage of existing prompts scanned so far.
+    """,
+    response_model=BrandBackfillResponse,
+    responses={
+        404: {
+            "description": "Backfill not found",
+            "content": {
+                "application/json": {
+                    "example": {"detail": "Backfill not found"}
+                }
+            }
+        }
     }
-
-    prompts_by_month = {m: [] for m in months_order}
-    for prompt in all_prompts:
-        if prompt.scraped_at:
-            month_key = prompt.scraped_at.strftime("%Y-%m")
-            if month_key in month_map:
-                prompts_by_month[month_map[month_key]].append(prompt)
-
-    visibility_by_month = []
-    for month_name in months_order:
-        month_prompts = prompts_by_month.get(month_name, [])
-        month_queries = set(p.query for p in month_prompts)
-
-        mentioned_queries = set()
-        for prompt in month_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == brand.id,
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                mentioned_queries.add(prompt.query)
-
-        month_visibility = (len(mentioned_queries) / len(month_queries) * 100) if month_queries else 0
-        visibility_by_month.append(BrandMonthlyVisibility(
-            month=month_name,
-            visibility=round(month_visibility, 1)
-        ))
-
-    total_mentions = session.exec(
-        select(func.count(PromptBrandMention.id)).where(
-            PromptBrandMention.brand_id == brand.id,
-            PromptBrandMention.mentioned == True,
-        )
-    ).one()
-
-    return BrandDetailResponse(
-        id=brand.id,
-        name=brand.name,
-        type=brand.type,
-        color=brand.color,
-        variations=variations,
-        visibility=round(jan_visibility, 1),
-        avgPosition=round(avg_position, 1),
-        trend=trend,
-        sentiment=most_common_sentiment,
-        totalMentions=total_mentions,
-        totalPrompts=len(jan_mentioned_queries),
-        topPrompts=top_prompts,
-        visibilityByMonth=visibility_by_month
+)
+def get_brand_backfill(backfill_id: int, session: Session = Depends(get_session)):
+    """Report how far a brand's mention backfill has got."""
+    backfill = session.get(BrandBackfill, backfill_id)
+    if not backfill:
+        raise HTTPException(status_code=404, detail="Backfill not found")
+    return build_backfill_response(backfill)
+
+
+def build_backfill_response(backfill: BrandBackfill) -> BrandBackfillResponse:
+    """Helper to convert a BrandBackfill row to its API response"""
+    if backfill.total_prompts:
+        progress = round(backfill.processed_prompts / backfill.total_prompts * 100, 1)
+    else:
+        progress = 100.0 if backfill.status == "completed" else 0.0
+
+    return BrandBackfillResponse(
+        id=backfill.id,
+        brandId=backfill.brand_id,
+        status=backfill.status,
+        totalPrompts=backfill.total_prompts,
+        processedPrompts=backfill.processed_prompts,
+        mentionedPrompts=backfill.mentioned_prompts,
+        progress=progress,
+        error=backfill.error,
+        createdAt=backfill.created_at.isoformat(),
+        startedAt=backfill.started_at.isoformat() if backfill.started_at else None,
+        completedAt=backfill.completed_at.isoformat() if backfill.completed_at else None,
     )
 
 
@@ -988,9 +865,12 @@ def delete_brand(brand_id: str, session: Session = Depends(get_session)):
     for mention in mentions:
         session.delete(mention)
 
+    session.exec(delete(BrandVisibilityRollup).where(BrandVisibilityRollup.brand_id == brand_id))
+
     # Delete the brand
     session.delete(brand)
     session.commit()
+    bump_data_version()
 
     return {"success": True, "message": f"Brand '{brand_id}' deleted successfully"}
 
@@ -1017,6 +897,7 @@ def set_brand_primary(brand_id: str, session: Session = Depends(get_session)):
     brand.type = "primary"
     session.add(brand)
     session.commit()
+    bump_data_version()
     
     return {"success": True, "message": f"Brand '{brand.name}' is now the primary brand"}
 
@@ -1035,6 +916,12 @@ def set_brand_primary(brand_id: str, session: Session = Depends(get_session)):
     - Aggregated brand mentions (mentioned if mentioned in ANY run)
     
     Results are grouped by query, with metrics averaged across all runs.
+    Each query has a stable `id` (`query-N`) for use with the detail endpoint.
+    
+    **Pagination:** queries are ordered by text. Without `limit` or `cursor`
+    every query is returned. Otherwise at most `limit` (default 100) are
+    returned; when more exist the `X-Next-Cursor` response header holds a
+    cursor to pass as `cursor` for the next page.
     """,
     response_model=list[PromptResponse],
     responses={
@@ -1043,25 +930,61 @@ def set_brand_primary(brand_id: str, session: Session = Depends(get_session)):
         }
     }
 )
-def get_prompts(session: Session = Depends(get_session)):
+def get_prompts(
+    response: Response,
+    cursor: str | None = Query(default=None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int | None = Query(default=None, ge=1, le=500, description="Maximum number of queries to return (default: all, or 100 with a cursor)"),
+    session: Session = Depends(get_session),
+):
     """
-    Get all unique queries with aggregated stats across runs.
+    Get unique queries with aggregated stats across runs, one page at a time.
     
     Groups prompts by query and calculates average metrics
     across all runs for each query.
     """
-    all_prompts = session.exec(select(Prompt).order_by(Prompt.query, Prompt.run_number)).all()
+    # One page of queries, keyset-paginated on the unique SearchQuery.text index
+    page_stmt = (
+        select(SearchQuery.id, SearchQuery.text)
+        .where(exists().where(Prompt.query_id == SearchQuery.id))
+        .order_by(SearchQuery.text)
+    )
+    if limit is None and cursor is None:
+        # Unpaginated callers (the dashboard) get every query
+        page = session.exec(page_stmt).all()
+    else:
+        limit = limit or DEFAULT_PAGE_SIZE
+        page_stmt = page_stmt.limit(limit + 1)
+        if cursor:
+            page_stmt = page_stmt.where(after_cursor([SearchQuery.text], decode_cursor(cursor, str)))
+        page, next_cursor = paginate(session.exec(page_stmt).all(), limit, key=lambda row: (row[1],))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+
+    query_ids = [query_id for query_id, _ in page]
+    page_prompts = session.exec(
+        select(Prompt.id, Prompt.query_id, Prompt.run_number)
+        .where(Prompt.query_id.in_(query_ids))
+        .order_by(Prompt.run_number, Prompt.id)
+    ).all()
     brands = session.exec(select(Brand)).all()
 
-    # Group prompts by query
-    grouped = {}
-    for prompt in all_prompts:
-        if prompt.query not in grouped:
-            grouped[prompt.query] = []
-        grouped[prompt.query].append(prompt)
+    # Mentions for every prompt on the page in one query
+    mentions_by_prompt: dict[int, list[PromptBrandMention]] = {}
+    for mention in session.exec(
+        select(PromptBrandMention)
+        .where(PromptBrandMention.prompt_id.in_([p.id for p in page_prompts]))
+        .order_by(PromptBrandMention.id)
+    ).all():
+        mentions_by_prompt.setdefault(mention.prompt_id, []).append(mention)
+
+    # Group prompts by query, in page order
+    grouped = {(query_id, query): [] for query_id, query in page}
+    query_keys = {query_id: (query_id, query) for query_id, query in page}
+    for prompt in page_prompts:
+        grouped[query_keys[prompt.query_id]].append(prompt)
 
     result = []
-    for idx, (query, prompts_list) in enumerate(grouped.items(), 1):
+    for (query_id, query), prompts_list in grouped.items():
         # Use the latest run for brand data display
         latest_prompt = max(prompts_list, key=lambda p: p.run_number if hasattr(p, 'run_number') else 1)
 
@@ -1071,9 +994,7 @@ def get_prompts(session: Session = Depends(get_session)):
         all_mentions_count = []
 
         for prompt in prompts_list:
-            mentions = session.exec(
-                select(PromptBrandMention).where(PromptBrandMention.prompt_id == prompt.id)
-            ).all()
+            mentions = mentions_by_prompt.get(prompt.id, [])
 
             brand_responses = []
             for brand in brands:
@@ -1108,14 +1029,9 @@ def get_prompts(session: Session = Depends(get_session)):
         # Aggregate mentioned brands across ALL runs (not just latest)
         all_mentioned_brand_ids = set()
         for prompt in prompts_list:
-            mentions = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.mentioned == True
-                )
-            ).all()
-            for m in mentions:
-                all_mentioned_brand_ids.add(m.brand_id)
+            for m in mentions_by_prompt.get(prompt.id, []):
+                if m.mentioned:
+                    all_mentioned_brand_ids.add(m.brand_id)
 
         # Build aggregated brand responses (brand is "mentioned" if mentioned in ANY run)
         aggregated_brand_responses = []
@@ -1137,7 +1053,7 @@ def get_prompts(session: Session = Depends(get_session)):
 
         result.append(
             PromptResponse(
-                id=f"query-{idx}",
+                id=format_query_id(query_id),
                 query=query,
                 visibility=round(avg_visibility, 1),
                 avgPosition=round(avg_pos, 1),
@@ -1158,9 +1074,9 @@ def get_prompts(session: Session = Depends(get_session)):
     Get detailed information for a specific prompt query with all runs.
     
     **Query ID Format:**
-    - Use format: `query-1`, `query-2`, etc.
-    - Number corresponds to order from list prompts endpoint
-    - Example: First query = `query-1`, second = `query-2`
+    - Use the `id` returned by the list prompts endpoint, e.g. `query-12`
+    - IDs are stable: they do not change as new queries are added
+    - A bare number (`12`) is accepted as well
     
     Returns:
     - Query text
@@ -1195,37 +1111,28 @@ def get_prompt_detail(query_id: str, session: Session = Depends(get_session)):
     """
     Get detailed prompt info with all runs.
     
-    Extracts query index from query_id (e.g., "query-1" -> 1)
+    Resolves the stable query id (e.g., "query-1" -> SearchQuery 1)
     and returns all runs for that query with full details.
     """
-    # Extract index from query_id (e.g., "query-1" -> 1)
-    try:
-        idx = int(query_id.replace("query-", "").replace("prompt-", ""))
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Invalid query ID format")
-
-    all_prompts = session.exec(select(Prompt).order_by(Prompt.query, Prompt.run_number)).all()
-    brands = session.exec(select(Brand)).all()
-
-    # Group prompts by query
-    grouped = {}
-    for prompt in all_prompts:
-        if prompt.query not in grouped:
-            grouped[prompt.query] = []
-        grouped[prompt.query].append(prompt)
-
-    # Get the query by index
-    queries = list(grouped.keys())
-    if idx < 1 or idx > len(queries):
+    search_query = session.get(SearchQuery, parse_query_id(query_id))
+    if not search_query:
         raise HTTPException(status_code=404, detail="Query not found")
 
-    query = queries[idx - 1]
-    prompts_list = grouped[query]
+    query = search_query.text
+    prompts_list = session.exec(
+        select(Prompt)
+        .where(Prompt.query_id == search_query.id)
+        .order_by(Prompt.run_number, Prompt.id)
+        .options(undefer(Prompt.response_text))
+    ).all()
+    brands = session.exec(select(Brand)).all()
 
-    # Build runs
-    runs = []
-    for prompt in sorted(prompts_list, key=lambda p: p.run_number if hasattr(p, 'run_number') else 1):
-        runs.append(get_run_data(session, prompt, brands))
+    # Build runs (all mentions and sources loaded in one batch)
+    runs = get_runs_data(
+        session,
+        sorted(prompts_list, key=lambda p: p.run_number if hasattr(p, 'run_number') else 1),
+        brands,
+    )
 
     # Use latest run for aggregate display
     latest_run = runs[-1] if runs else None
@@ -1236,7 +1143,7 @@ def get_prompt_detail(query_id: str, session: Session = Depends(get_session)):
     avg_mentions = sum(r.totalMentions for r in runs) / len(runs) if runs else 0
 
     return PromptDetailResponse(
-        id=query_id,
+        id=format_query_id(search_query.id),
         query=query,
         visibility=round(avg_visibility, 1),
         avgPosition=round(avg_position, 1),
@@ -1247,18 +1154,103 @@ def get_prompt_detail(query_id: str, session: Session = Depends(get_session)):
     )
 
 
+# Prompts loaded per server-side cursor fetch (and per output batch) by /api/export
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "500"))
+
+
+@app.get(
+    "/api/export",
+    tags=["prompts"],
+    summary="Bulk export runs",
+    description="""
+    Stream every run with its brand mentions and sources, for warehouse loads.
+    
+    **Formats** (`format`):
+    - `ndjson` (default): one JSON object per run, shaped like a run in `/api/prompts/{query_id}`
+      plus `queryId` and `query`
+    - `csv`: one row per run; `brands` and `sources` are JSON-encoded
+    - `parquet`: `brands` and `sources` as nested lists (needs `pyarrow` installed on the server)
+    
+    Pass `from` and/or `to` (inclusive, YYYY-MM-DD) to export only runs scraped
+    in that range. Runs are ordered by id.
+    
+    Rows are read through a server-side cursor in chunks of `EXPORT_CHUNK_SIZE`
+    runs and written out as each chunk is assembled, so memory use does not
+    depend on the size of the export.
+    """,
+    responses={
+        200: {
+            "description": "Export file, streamed",
+            "content": {media_type: {} for media_type in MEDIA_TYPES.values()},
+        },
+        400: {"description": "'from' is after 'to'"},
+        501: {"description": "Parquet requested but pyarrow is not installed"},
+    },
+)
+def export_runs(
+    export_format: ExportFormat = Query(default="ndjson", alias="format", description="ndjson, csv or parquet"),
+    start: date | None = Query(default=None, alias="from", description="First day to export (inclusive, YYYY-MM-DD)"),
+    end: date | None = Query(default=None, alias="to", description="Last day to export (inclusive, YYYY-MM-DD)"),
+):
+    """Stream all runs (optionally within a date range) as NDJSON, CSV or Parquet."""
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires the optional pyarrow package")
+
+    criteria = []
+    if start:
+        criteria.append(Prompt.scraped_at >= datetime(start.year, start.month, start.day))
+    if end:
+        criteria.append(Prompt.scraped_at < datetime(end.year, end.month, end.day) + timedelta(days=1))
+
+    def run_batches():
+        # Own session: the request-scoped one is closed before the body is streamed
+        with Session(engine) as session:
+            brands = session.exec(select(Brand)).all()
+            result = session.exec(
+                select(Prompt)
+                .where(*criteria)
+                .order_by(Prompt.id)
+                .options(undefer(Prompt.response_text))
+                .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+            )
+            # The identity map holds rows weakly, so each chunk is freed once written
+            for prompts in result.partitions():
+                runs = get_runs_data(session, prompts, brands)
+                yield [
+                    {"queryId": format_query_id(prompt.query_id), "query": prompt.query, **run.model_dump()}
+                    for prompt, run in zip(prompts, runs)
+                ]
+
+    filename = "aiseo-export"
+    if start or end:
+        filename += f"-{start or 'start'}-to-{end or 'latest'}"
+    return StreamingResponse(
+        WRITERS[export_format](run_batches()),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'},
+    )
+
+
 @app.get(
     "/api/sources",
     tags=["sources"],
     summary="List all sources",
     description="""
-    Get all citation sources with usage metrics.
+    Get all citation source domains with usage metrics.
     
     Metrics include:
-    - **Usage**: Percentage of unique queries citing this source
+    - **Usage**: Percentage of unique queries citing this domain
     - **Average Citations**: Average citation position across all prompts
     
-    Results are sorted by usage percentage descending.
+    Pass `from` and/or `to` to restrict both to prompts scraped in that range
+    (default: all time).
+    
+    Results are sorted by usage percentage descending. Without `limit` or
+    `cursor` every domain is returned. Otherwise at most `limit` (default
+    100) are returned per page; when more exist the `X-Next-Cursor` response
+    header holds a cursor to pass as `cursor` for the next page.
     """,
     response_model=list[SourceResponse],
     responses={
@@ -1267,51 +1259,67 @@ def get_prompt_detail(query_id: str, session: Session = Depends(get_session)):
         }
     }
 )
-def get_sources(session: Session = Depends(get_session)):
+def get_sources(
+    response: Response,
+    cursor: str | None = Query(default=None, description="Cursor from the previous page's X-Next-Cursor header"),
+    limit: int | None = Query(default=None, ge=1, le=1000, description="Maximum number of domains to return (default: all, or 100 with a cursor)"),
+    window: TimeWindow = Depends(get_time_window),
+    session: Session = Depends(get_session),
+):
     """
-    Get all sources with usage metrics.
+    Get all source domains with usage metrics.
     
     Calculates usage based on unique queries (not individual runs)
-    citing each source.
+    citing each domain, in a single grouped query over
+    Source ⟕ (PromptSource ⋈ Prompt).
     """
-    # Count unique queries (not runs)
-    all_prompts = session.exec(select(Prompt)).all()
-    unique_queries = set(p.query for p in all_prompts)
-    total_queries = len(unique_queries)
+    in_range = window.range_criteria()
 
-    sources = session.exec(select(Source)).all()
-
-    result = []
-    for source in sources:
-        prompt_links = session.exec(
-            select(PromptSource).where(PromptSource.source_id == source.id)
-        ).all()
+    # Count unique queries (not runs)
+    total_queries = session.exec(
+        select(func.count(func.distinct(Prompt.query))).where(*in_range)
+    ).one()
 
-        # Count unique queries citing this source
-        citing_queries = set()
-        for pl in prompt_links:
-            prompt = session.get(Prompt, pl.prompt_id)
-            if prompt:
-                citing_queries.add(prompt.query)
-
-        usage = (len(citing_queries) / total_queries * 100) if total_queries > 0 else 0
-        avg_citations = (
-            sum(pl.citation_order for pl in prompt_links) / len(prompt_links)
-            if prompt_links
-            else 0
-        )
+    # Citations in range; outer-joined so domains without any still get listed
+    citations = (
+        select(PromptSource.source_id, PromptSource.citation_order, Prompt.query)
+        .join(Prompt, Prompt.id == PromptSource.prompt_id)
+        .where(*in_range)
+        .subquery()
+    )
+    citing_queries = func.count(func.distinct(citations.c.query))
+    stmt = (
+        select(Source.domain, citing_queries, func.avg(citations.c.citation_order))
+        .select_from(Source)
+        .outerjoin(citations, citations.c.source_id == Source.id)
+        .group_by(Source.domain)
+        .order_by(citing_queries.desc(), Source.domain)
+    )
+    if limit is None and cursor is None:
+        # Unpaginated callers (the dashboard) get every domain
+        rows = session.exec(stmt).all()
+    else:
+        limit = limit or DEFAULT_PAGE_SIZE
+        stmt = stmt.limit(limit + 1)
+        if cursor:
+            # Keyset on (usage desc, domain asc); usage is an aggregate, so this is a HAVING
+            after_citing, after_domain = decode_cursor(cursor, int, str)
+            stmt = stmt.having(or_(
+                citing_queries < after_citing,
+                and_(citing_queries == after_citing, Source.domain > after_domain),
+            ))
+        rows, next_cursor = paginate(session.exec(stmt).all(), limit, key=lambda row: (row[1], row[0]))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
 
-        result.append(
-            SourceResponse(
-                domain=source.domain,
-                usage=round(usage, 1),
-                avgCitations=round(avg_citations, 1),
-            )
+    return [
+        SourceResponse(
+            domain=domain,
+            usage=round((citing / total_queries * 100) if total_queries > 0 else 0, 1),
+            avgCitations=round(float(avg_citations or 0), 1),
         )
-
-    # Sort by usage descending
-    result.sort(key=lambda x: x.usage, reverse=True)
-    return result
+        for domain, citing, avg_citations in rows
+    ]
 
 
 @app.get(
@@ -1319,15 +1327,18 @@ def get_sources(session: Session = Depends(get_session)):
     tags=["analytics"],
     summary="Get dashboard metrics",
     description="""
-    Get dashboard KPIs with month-over-month changes.
+    Get dashboard KPIs with period-over-period changes.
     
     Metrics include:
-    - **Visibility**: Primary brand visibility percentage (Jan 2026)
+    - **Visibility**: Visibility percentage of the primary brand (type `primary`, current period)
     - **Total Prompts**: Total unique queries tracked
-    - **Total Sources**: Total source citations (Jan 2026)
-    - **Average Position**: Average position when mentioned (Jan 2026)
+    - **Total Sources**: Total source citations (current period)
+    - **Average Position**: Average position when mentioned (current period)
     
-    All metrics include change values comparing January vs December 2025.
+    The current period is the last period of the window given by `from`, `to`
+    and `granularity` (default: the month of the most recent scrape). Changes
+    compare it with the period before. Totals cover the requested range, or
+    all time when neither `from` nor `to` is given.
     """,
     response_model=DashboardMetricsResponse,
     responses={
@@ -1336,99 +1347,67 @@ def get_sources(session: Session = Depends(get_session)):
         }
     }
 )
-def get_metrics(session: Session = Depends(get_session)):
+def get_metrics(
+    window: TimeWindow = Depends(get_time_window),
+    session: Session = Depends(get_session),
+):
     """
-    Get dashboard KPIs with month-over-month changes.
+    Get dashboard KPIs with period-over-period changes.
     
-    Calculates metrics for January 2026 and compares with December 2025
-    to show trends and changes.
+    Calculates metrics for the current period and compares them with the
+    previous period to show trends and changes.
     """
-    all_prompts = session.exec(select(Prompt)).all()
-    unique_queries = set(p.query for p in all_prompts)
-    total_queries = len(unique_queries)
-
-    # Separate January and December prompts
-    jan_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2026-01"]
-    dec_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2025-12"]
-
-    jan_queries = set(p.query for p in jan_prompts)
-    dec_queries = set(p.query for p in dec_prompts)
-
-    # Calculate sources: count total source citations across all runs
-    # Sources this month (January 2026)
-    jan_source_count = 0
-    for prompt in jan_prompts:
-        prompt_sources = session.exec(
-            select(PromptSource).where(PromptSource.prompt_id == prompt.id)
-        ).all()
-        jan_source_count += len(prompt_sources)
+    in_range = window.range_criteria()
 
-    # Sources last month (December 2025) for change calculation
-    dec_source_count = 0
-    for prompt in dec_prompts:
-        prompt_sources = session.exec(
-            select(PromptSource).where(PromptSource.prompt_id == prompt.id)
-        ).all()
-        dec_source_count += len(prompt_sources)
+    total_queries = session.exec(
+        select(func.count(func.distinct(Prompt.query))).where(*in_range)
+    ).one()
 
-    # Total sources across all months
-    total_source_count = 0
-    for prompt in all_prompts:
-        prompt_sources = session.exec(
-            select(PromptSource).where(PromptSource.prompt_id == prompt.id)
-        ).all()
-        total_source_count += len(prompt_sources)
-
-    sources_change = jan_source_count - dec_source_count
-
-    # Calculate Wix visibility for January
-    jan_wix_queries = set()
-    jan_wix_positions = []
-    for prompt in jan_prompts:
-        mention = session.exec(
-            select(PromptBrandMention).where(
-                PromptBrandMention.prompt_id == prompt.id,
-                PromptBrandMention.brand_id == "wix",
-                PromptBrandMention.mentioned == True,
-            )
-        ).first()
-        if mention:
-            jan_wix_queries.add(prompt.query)
-            if mention.position:
-                jan_wix_positions.append(mention.position)
-
-    jan_visibility = (len(jan_wix_queries) / len(jan_queries) * 100) if jan_queries else 0
-    jan_avg_position = sum(jan_wix_positions) / len(jan_wix_positions) if jan_wix_positions else 0
-
-    # Calculate Wix visibility for December
-    dec_wix_queries = set()
-    dec_wix_positions = []
-    for prompt in dec_prompts:
-        mention = session.exec(
-            select(PromptBrandMention).where(
-                PromptBrandMention.prompt_id == prompt.id,
-                PromptBrandMention.brand_id == "wix",
-                PromptBrandMention.mentioned == True,
-            )
-        ).first()
-        if mention:
-            dec_wix_queries.add(prompt.query)
-            if mention.position:
-                dec_wix_positions.append(mention.position)
+    # Source citations this period, last period and across the requested range, in one pass
+    def citations_where(*criteria):
+        return func.coalesce(func.sum(case((and_(true(), *criteria), 1), else_=0)), 0)
+
+    citations = (
+        select(
+            citations_where(in_period(window.current)),
+            citations_where(in_period(window.previous)),
+            citations_where(*in_range),
+        )
+        .select_from(PromptSource)
+        .join(Prompt, Prompt.id == PromptSource.prompt_id)
+    )
+    if in_range:
+        citations = citations.where(
+            or_(and_(*in_range), and_(Prompt.scraped_at >= window.previous.start, Prompt.scraped_at < window.current.end))
+        )
+    current_source_count, previous_source_count, total_source_count = session.exec(citations).one()
+
+    sources_change = current_source_count - previous_source_count
+
+    # Visibility and position of the primary brand, current vs previous period
+    primary_brand = session.exec(select(Brand).where(Brand.type == "primary")).first()
+    primary_ids = [primary_brand.id] if primary_brand else []
 
-    dec_visibility = (len(dec_wix_queries) / len(dec_queries) * 100) if dec_queries else 0
-    dec_avg_position = sum(dec_wix_positions) / len(dec_wix_positions) if dec_wix_positions else 0
+    def primary_stats(period) -> tuple[float, float]:
+        stats = brand_period_stats(session, period.start, period.end, primary_ids)
+        primary = stats.get(primary_brand.id) if primary_brand else None
+        if not primary:
+            return 0, 0
+        return visibility_pct(primary.mentioned_queries, count_queries(session, period.start, period.end)), primary.avg_position
 
-    # Calculate changes (Jan vs Dec)
-    visibility_change = jan_visibility - dec_visibility
-    # Position: lower is better, so flip sign (Dec - Jan = positive when improved)
-    position_change = dec_avg_position - jan_avg_position  # Positive means improvement
+    current_visibility, current_avg_position = primary_stats(window.current)
+    previous_visibility, previous_avg_position = primary_stats(window.previous)
+
+    # Calculate changes (current vs previous period)
+    visibility_change = current_visibility - previous_visibility
+    # Position: lower is better, so flip sign (previous - current = positive when improved)
+    position_change = previous_avg_position - current_avg_position  # Positive means improvement
 
     return DashboardMetricsResponse(
-        visibility=MetricResponse(value=round(jan_visibility, 1), change=round(visibility_change, 1)),
+        visibility=MetricResponse(value=round(current_visibility, 1), change=round(visibility_change, 1)),
         totalPrompts=MetricResponse(value=total_queries, change=0),
-        totalSources=MetricResponse(value=jan_source_count, change=sources_change, total=total_source_count),
-        avgPosition=MetricResponse(value=round(jan_avg_position, 1), change=round(position_change, 2)),
+        totalSources=MetricResponse(value=current_source_count, change=sources_change, total=total_source_count),
+        avgPosition=MetricResponse(value=round(current_avg_position, 1), change=round(position_change, 2)),
     )
 
 
@@ -1437,14 +1416,11 @@ def get_metrics(session: Session = Depends(get_session)):
     tags=["analytics"],
     summary="Get visibility data",
     description="""
-    Get monthly visibility data for charts.
+    Get visibility data for charts.
     
-    Returns visibility percentages for each brand by month:
-    - September 2025
-    - October 2025
-    - November 2025
-    - December 2025
-    - January 2026
+    Returns visibility percentages for each brand per period of the window
+    given by `from`, `to` and `granularity` (day, week or month). By default
+    this is the last five months up to the most recent scrape.
     
     Visibility is calculated as percentage of unique queries mentioning each brand.
     """,
@@ -1455,74 +1431,44 @@ def get_metrics(session: Session = Depends(get_session)):
         }
     }
 )
-def get_visibility_data(session: Session = Depends(get_session)):
+def get_visibility_data(
+    window: TimeWindow = Depends(get_time_window),
+    session: Session = Depends(get_session),
+):
     """
-    Get monthly visibility data for charts.
+    Get visibility data for charts.
     
-    Calculates brand visibility percentages for each month
-    from September 2025 to January 2026.
+    Calculates brand visibility percentages for each period of the window,
+    read from the visibility rollup for whole months and from grouped
+    queries over raw mentions otherwise.
     """
-    brands = session.exec(select(Brand)).all()
-    all_prompts = session.exec(select(Prompt)).all()
-
-    # Group prompts by month
-    months = {
-        "Sep 2025": [],
-        "Oct 2025": [],
-        "Nov 2025": [],
-        "Dec 2025": [],
-        "Jan 2026": [],
-    }
-
-    for prompt in all_prompts:
-        if prompt.scraped_at:
-            month_str = prompt.scraped_at.strftime("%Y-%m")
-            if month_str == "2025-09":
-                months["Sep 2025"].append(prompt)
-            elif month_str == "2025-10":
-                months["Oct 2025"].append(prompt)
-            elif month_str == "2025-11":
-                months["Nov 2025"].append(prompt)
-            elif month_str == "2025-12":
-                months["Dec 2025"].append(prompt)
-            elif month_str == "2026-01":
-                months["Jan 2026"].append(prompt)
-
-    result = []
-    for month_name in ["Sep 2025", "Oct 2025", "Nov 2025", "Dec 2025", "Jan 2026"]:
-        month_prompts = months[month_name]
-        unique_queries = set(p.query for p in month_prompts)
-        total_queries = len(unique_queries)
-
-        brand_visibility = {}
-        for brand in brands:
-            # Get mentions for prompts in this month
-            mentioned_queries = set()
-            for prompt in month_prompts:
-                mention = session.exec(
-                    select(PromptBrandMention).where(
-                        PromptBrandMention.prompt_id == prompt.id,
-                        PromptBrandMention.brand_id == brand.id,
-                        PromptBrandMention.mentioned == True,
-                    )
-                ).first()
-                if mention:
-                    mentioned_queries.add(prompt.query)
-
-            brand_visibility[brand.id] = (
-                (len(mentioned_queries) / total_queries * 100) if total_queries > 0 else 0
-            )
+    totals, mentioned = visibility_series(session, window)
+
+    def brand_visibility(brand_id: str, period: str) -> float:
+        pct = visibility_pct(mentioned.get(brand_id, {}).get(period, 0), totals[period])
+        return round(pct, 1)
+
+    return [
+        DailyVisibilityResponse(
+            date=period.label,
+            shopify=brand_visibility("shopify", period.key),
+            woocommerce=brand_visibility("woocommerce", period.key),
+            bigcommerce=brand_visibility("bigcommerce", period.key),
+            wix=brand_visibility("wix", period.key),
+            squarespace=brand_visibility("squarespace", period.key),
+        )
+        for period in window.periods
+    ]
 
-        result.append(DailyVisibilityResponse(
-            date=month_name,
-            shopify=round(brand_visibility.get("shopify", 0), 1),
-            woocommerce=round(brand_visibility.get("woocommerce", 0), 1),
-            bigcommerce=round(brand_visibility.get("bigcommerce", 0), 1),
-            wix=round(brand_visibility.get("wix", 0), 1),
-            squarespace=round(brand_visibility.get("squarespace", 0), 1),
-        ))
 
-    return result
+def source_category_counts(session: Session) -> Counter:
+    """Number of sources per category (Source.category, grouped in SQL)."""
+    counts = Counter()
+    for category, count in session.exec(
+        select(Source.category, func.count(Source.id)).group_by(Source.category)
+    ).all():
+        counts[category or "other"] += count
+    return counts
 
 
 @app.get(
@@ -1554,53 +1500,23 @@ def get_sources_analytics(session: Session = Depends(get_session)):
     Provides comprehensive breakdown including domain analysis,
     source type classification, and top sources.
     """
-    sources = session.exec(select(Source)).all()
-    all_prompts = session.exec(select(Prompt)).all()
-
-    # Classify domains by type
-    def classify_domain(domain: str) -> str:
-        domain_lower = domain.lower()
-        # Brand/official sites
-        if any(brand in domain_lower for brand in ['shopify', 'wix', 'woocommerce', 'bigcommerce', 'squarespace', 'wordpress']):
-            return 'brand'
-        # Community/forums
-        if any(community in domain_lower for community in ['reddit', 'quora', 'stackexchange', 'stackoverflow', 'discourse']):
-            return 'community'
-        # News/media
-        if any(news in domain_lower for news in ['forbes', 'techcrunch', 'entrepreneur', 'inc.com', 'businessinsider', 'cnet', 'zdnet', 'pcmag', 'theverge']):
-            return 'news'
-        # Blogs (common blog patterns)
-        if any(blog in domain_lower for blog in ['blog', 'medium.com', 'dev.to', 'hashnode', 'substack']):
-            return 'blog'
-        # Review sites
-        if any(review in domain_lower for review in ['g2.com', 'capterra', 'trustpilot', 'trustradius', 'getapp']):
-            return 'review'
-        # Default: check for common blog patterns in URL structure
-        return 'other'
-
-    # Build domain citation counts
-    domain_citations = Counter()
-    source_citations = {}  # source_id -> list of prompt queries
-
-    for source in sources:
-        prompt_links = session.exec(
-            select(PromptSource).where(PromptSource.source_id == source.id)
-        ).all()
-
-        # Count total citations (across all runs)
-        domain_citations[source.domain] += len(prompt_links)
+    # Citations per source (across all runs) in one grouped query over Source ⟕ PromptSource
+    citation_count = func.count(PromptSource.id)
+    sources_with_citations = session.exec(
+        select(Source, citation_count)
+        .outerjoin(PromptSource, PromptSource.source_id == Source.id)
+        .group_by(Source.id)
+        .order_by(citation_count.desc(), Source.id)
+    ).all()
 
-        # Get unique prompts citing this source
-        prompt_queries = []
-        for pl in prompt_links:
-            prompt = session.get(Prompt, pl.prompt_id)
-            if prompt and prompt.query not in prompt_queries:
-                prompt_queries.append(prompt.query)
-        source_citations[source.id] = prompt_queries
+    # Domains in order of first source, so equal counts rank as before
+    domain_citations = Counter()
+    for source, citations in sorted(sources_with_citations, key=lambda row: row[0].id):
+        domain_citations[source.domain] += citations
 
     total_citations = sum(domain_citations.values())
-    total_sources = len(sources)
-    total_domains = len(set(s.domain for s in sources))
+    total_sources = len(sources_with_citations)
+    total_domains = len(domain_citations)
 
     # Build domain breakdown (top 20)
     domain_breakdown = []
@@ -1612,14 +1528,8 @@ def get_sources_analytics(session: Session = Depends(get_session)):
             type=classify_domain(domain)
         ))
 
-    # Build source types breakdown
-    type_counts = Counter()
-    for source in sources:
-        source_type = classify_domain(source.domain)
-        # Refine classification: if URL contains /blog/ it's likely a blog post
-        if source.url and '/blog/' in source.url.lower():
-            source_type = 'blog'
-        type_counts[source_type] += 1
+    # Build source types breakdown from the category stored at ingest
+    type_counts = source_category_counts(session)
 
     source_types = []
     for stype, count in type_counts.most_common():
@@ -1629,25 +1539,29 @@ def get_sources_analytics(session: Session = Depends(get_session)):
             percentage=round(count / total_sources * 100, 1) if total_sources > 0 else 0
         ))
 
-    # Build top sources list (top 50 by citation count)
-    sources_with_citations = []
-    for source in sources:
-        prompt_links = session.exec(
-            select(PromptSource).where(PromptSource.source_id == source.id)
-        ).all()
-        sources_with_citations.append((source, len(prompt_links)))
-
-    sources_with_citations.sort(key=lambda x: x[1], reverse=True)
+    # Build top sources list (top 50 by citation count), with the first 5
+    # distinct queries citing each, fetched for all 50 in one query
+    top = sources_with_citations[:50]
+    first_citation = func.min(PromptSource.id)
+    source_queries: dict[int, list[str]] = {}
+    for source_id, query in session.exec(
+        select(PromptSource.source_id, Prompt.query)
+        .join(Prompt, Prompt.id == PromptSource.prompt_id)
+        .where(PromptSource.source_id.in_([source.id for source, _ in top]))
+        .group_by(PromptSource.source_id, Prompt.query)
+        .order_by(PromptSource.source_id, first_citation)
+    ).all():
+        source_queries.setdefault(source_id, []).append(query)
 
     top_sources = []
-    for source, citation_count in sources_with_citations[:50]:
+    for source, citation_count in top:
         top_sources.append(TopSource(
             id=source.id,
             domain=source.domain,
             url=source.url,
             title=source.title,
             citations=citation_count,
-            prompts=source_citations.get(source.id, [])[:5]  # Limit to 5 prompts
+            prompts=source_queries.get(source.id, [])[:5]  # Limit to 5 prompts
         ))
 
     return SourcesAnalyticsResponse(
@@ -1693,31 +1607,11 @@ def get_suggestions(session: Session = Depends(get_session)):
     Analyzes source types and citation patterns to generate
     actionable SEO recommendations with examples.
     """
-    sources = session.exec(select(Source)).all()
-    all_prompts = session.exec(select(Prompt)).all()
-
-    # Calculate source type percentages
-    total_sources = len(sources)
-
-    def classify_domain(domain: str, url: str = "") -> str:
-        domain_lower = domain.lower()
-        url_lower = url.lower() if url else ""
-
-        if '/blog/' in url_lower:
-            return 'blog'
-        if any(brand in domain_lower for brand in ['shopify', 'wix', 'woocommerce', 'bigcommerce', 'squarespace']):
-            return 'brand'
-        if any(community in domain_lower for community in ['reddit', 'quora']):
-            return 'community'
-        if any(news in domain_lower for news in ['forbes', 'techcrunch', 'entrepreneur', 'inc.com', 'businessinsider']):
-            return 'news'
-        if any(review in domain_lower for review in ['g2.com', 'capterra', 'trustpilot']):
-            return 'review'
-        return 'other'
-
-    type_counts = Counter()
-    for source in sources:
-        type_counts[classify_domain(source.domain, source.url)] += 1
+    all_queries = session.exec(select(Prompt.query).order_by(Prompt.id)).all()
+
+    # Calculate source type percentages from the category stored at ingest
+    type_counts = source_category_counts(session)
+    total_sources = sum(type_counts.values())
 
     blog_pct = round(type_counts.get('blog', 0) / total_sources * 100) if total_sources > 0 else 0
     community_pct = round(type_counts.get('community', 0) / total_sources * 100) if total_sources > 0 else 0
@@ -1725,35 +1619,31 @@ def get_suggestions(session: Session = Depends(get_session)):
     review_pct = round(type_counts.get('review', 0) / total_sources * 100) if total_sources > 0 else 0
 
     # Get sample sources for examples
-    blog_sources = [s for s in sources if classify_domain(s.domain, s.url) == 'blog'][:3]
-    community_sources = [s for s in sources if classify_domain(s.domain, s.url) == 'community'][:3]
-    news_sources = [s for s in sources if classify_domain(s.domain, s.url) == 'news'][:3]
+    def sample_sources(category: str) -> list[Source]:
+        return session.exec(
+            select(Source).where(Source.category == category).order_by(Source.id).limit(3)
+        ).all()
+
+    blog_sources = sample_sources('blog')
+    community_sources = sample_sources('community')
+    news_sources = sample_sources('news')
 
     # Get comparison prompts
-    comparison_prompts = [p.query for p in all_prompts if any(word in p.query.lower() for word in ['vs', 'versus', 'compare', 'best', 'top'])]
+    comparison_prompts = [query for query in all_queries if any(word in query.lower() for word in ['vs', 'versus', 'compare', 'best', 'top'])]
     unique_comparison = list(set(comparison_prompts))[:5]
-    comparison_pct = round(len(set(comparison_prompts)) / len(set(p.query for p in all_prompts)) * 100) if all_prompts else 0
-
-    # Calculate Wix visibility score for overall AI SEO score
-    jan_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2026-01"]
-    jan_queries = set(p.query for p in jan_prompts)
-
-    wix_mentioned = 0
-    for query in jan_queries:
-        query_prompts = [p for p in jan_prompts if p.query == query]
-        for prompt in query_prompts:
-            mention = session.exec(
-                select(PromptBrandMention).where(
-                    PromptBrandMention.prompt_id == prompt.id,
-                    PromptBrandMention.brand_id == "wix",
-                    PromptBrandMention.mentioned == True,
-                )
-            ).first()
-            if mention:
-                wix_mentioned += 1
-                break
+    comparison_pct = round(len(set(comparison_prompts)) / len(set(all_queries)) * 100) if all_queries else 0
+
+    # Primary brand visibility score for overall AI SEO score (period of the latest scrape)
+    current_period = resolve_window(session).current
+    primary_brand = session.exec(select(Brand).where(Brand.type == "primary")).first()
+    primary_mentioned = 0
+    if primary_brand:
+        primary_mentioned = brand_mentioned_queries(
+            session, current_period.start, current_period.end, [primary_brand.id]
+        ).get(primary_brand.id, 0)
+    current_query_count = count_queries(session, current_period.start, current_period.end)
 
-    visibility_score = round(wix_mentioned / len(jan_queries) * 100) if jan_queries else 0
+    visibility_score = round(visibility_pct(primary_mentioned, current_query_count))
 
     # Overall AI SEO score (weighted average)
     ai_seo_score = min(100, round(visibility_score * 0.9 + 10))  # Base 10 + visibility contribution
@@ -1861,45 +1751,116 @@ def health_check():
     return {"status": "healthy", "timestamp": datetime.utcnow().isoformat()}
 
 
+@app.get(
+    "/api/cache/stats",
+    tags=["system"],
+    summary="Response cache statistics",
+    description="""
+    Hit/miss counters for the analytics response cache.
+    
+    Cached endpoints: /api/brands, /api/prompts, /api/sources, /api/metrics,
+    /api/visibility, /api/sources/analytics, /api/suggestions. Entries are
+    invalidated when a scrape completes or brands are created, deleted or
+    re-prioritised (`data_version` increments). `monitoring` has the same
+    counters for /api/stats/database, cached for `MONITORING_CACHE_TTL`
+    seconds. Counters are per worker process.
+    """,
+)
+def get_cache_stats():
+    """Return response cache sizes, hit/miss counters and current data version."""
+    return {**response_cache.stats(), "monitoring": monitoring_cache.stats()}
+
+
+@app.get(
+    "/api/db/pool",
+    tags=["system"],
+    summary="Database connection pool statistics",
+    description="""
+    Connection pool utilisation and checkout wait times.
+    
+    - `checked_out` / `utilisation`: connections in use now, and as a % of
+      `pool_size + max_overflow`
+    - `*_wait_ms`: time callers waited for a connection (recent checkouts for
+      percentiles); sustained waits mean the pool is too small
+    - `timeouts`: checkouts that gave up after `DB_POOL_TIMEOUT`
+    
+    Top-level fields describe the sync engine (threadpool routes); `async`
+    has the same fields for the async engine (async routes, scheduler and
+    scrape jobs). Pool size and timeouts are set with the `DB_POOL_*`
+    environment variables. Counters are per worker process.
+    """,
+)
+def get_db_pool_stats():
+    """Return connection pool utilisation and checkout wait metrics."""
+    return pool_stats()
+
+
+@app.get(
+    "/api/event-loop/lag",
+    tags=["system"],
+    summary="Event loop lag",
+    description="""
+    How late the event loop runs scheduled work, sampled every
+    `LOOP_LAG_INTERVAL` seconds.
+    
+    - `*_lag_ms`: delay of recent samples; near zero when async code yields
+    - `stalls`: samples delayed by at least `stall_threshold_ms`, i.e. moments
+      when blocking code held up every in-flight request
+    
+    Counters are per worker process.
+    """,
+)
+async def get_event_loop_lag():
+    """Return event loop lag percentiles."""
+    return loop_lag_monitor.stats()
+
+
+@app.get(
+    "/api/scrape-pool",
+    tags=["system"],
+    summary="Scrape worker pool",
+    description="""
+    Concurrency limits, queue and in-flight scrapes of the scrape worker pool.
+    
+    - `queued`, `queued_by_country`, `oldest_queued_seconds`: jobs waiting
+      for a free slot
+    - `in_flight*`: scrapes running now, in total, per country and per
+      layer 2 mode
+    - `*_wait_seconds`: time recent jobs spent queued before starting
+    
+    Counters are per worker process.
+    """,
+)
+async def get_scrape_pool_stats():
+    """Return scrape pool limits, queue depth and wait times."""
+    return scrape_pool.stats()
+
+
 # Background Scheduler
 import asyncio
 from typing import List
 
-async def scheduler_loop():
-    """Background loop to process scheduled jobs."""
-    while True:
-        try:
-            with Session(engine) as session:
-                # Find pending scheduled jobs that are due
-                now = datetime.utcnow()
-                # 1. Recur: Jobs that are periodic and due for next run
-                # (For simplicity, we query jobs with frequency set and next_run_at <= now)
-                due_jobs = session.exec(
-                    select(ScrapeJob).where(
-                        ScrapeJob.is_active == True,
-                        ScrapeJob.frequency != None,
-                        ScrapeJob.next_run_at <= now
-                    )
-                ).all()
-                
-                for job in due_jobs:
-                    # Create a new run instance for this job
-                    await trigger_scheduled_job(job, session)
-                    
-                    # Update next run time
-                    update_next_run(job)
-                    session.add(job)
-                    session.commit()
-                    
-        except Exception as e:
-            print(f"Scheduler error: {e}")
-            
-        await asyncio.sleep(60) # Check every minute
+async def dispatch_scheduled_job(job: ScrapeJob, session: AsyncSession) -> Callable[[], None]:
+    """Create a run of a claimed due job and move it to its next run time.
+
+    Nothing is committed here: the scheduler commits the claim, the new run
+    and the next_run_at together, then calls the returned function to start
+    the run.
+    """
+    start = await trigger_scheduled_job(job, session)
+
+    # Update next run time; runs missed while the server was down are skipped, not replayed back-to-back
+    update_next_run(job, after=datetime.utcnow())
+    session.add(job)
+    return start
 
-def update_next_run(job: ScrapeJob):
+def update_next_run(job: ScrapeJob, after: datetime | None = None):
     """
     Calculate next run time based on frequency.
     
+    With `after`, whole intervals are skipped until the next run is later
+    than it (one step, however many runs were missed).
+    
     Supported frequencies:
     - hourly: Every hour
     - 2_per_day: Every 12 hours
@@ -1926,12 +1887,18 @@ def update_next_run(job: ScrapeJob):
     }
     
     delta = frequency_map.get(freq, timedelta(days=1))
-    job.next_run_at += delta
+    steps = 1
+    if after is not None:
+        steps = max(1, (after - job.next_run_at) // delta + 1)
+    job.next_run_at += delta * steps
     
     print(f"[Scheduler] Job {job.id} next run: {job.next_run_at} (frequency: {freq})")
 
-async def trigger_scheduled_job(parent_job: ScrapeJob, session: Session):
-    """Create and trigger a new job instance from a parent scheduled job."""
+async def trigger_scheduled_job(parent_job: ScrapeJob, session: AsyncSession) -> Callable[[], None]:
+    """Create a new job instance from a parent scheduled job (flushed, not committed).
+
+    Returns the function that queues it on the scrape pool; call it after committing.
+    """
     print(f"Triggering scheduled job: {parent_job.id} - {parent_job.query}")
     
     # Clone config
@@ -1942,98 +1909,165 @@ async def trigger_scheduled_job(parent_job: ScrapeJob, session: Session):
         query=parent_job.query,
         country=parent_job.country,
         scraper_type=parent_job.scraper_type,
-        status="running",
+        status="pending",
         config_snapshot=parent_job.config_snapshot,
         parent_job_id=parent_job.id,
-        schedule_type="recurring_instance"
+        schedule_type="recurring_instance",
+        # Queued here; another worker takes it over if this one dies first
+        lease_owner=job_scheduler.worker_id,
+        lease_expires_at=lease_expiry(),
     )
     session.add(new_job)
-    session.commit()
-    session.refresh(new_job)
+    await session.flush()
     
-    # Execute (Reuse existing logic or call internal function)
-    # We'll use a background task to avoid blocking the scheduler loop
-    # Ideally, we should refactor create_scrape_job logic to be reusable
-    asyncio.create_task(run_scrape_logic(new_job.id, config))
+    # Queue on the scrape pool; it starts the run when the country/layer limits allow
+    return partial(
+        scrape_pool.submit,
+        new_job.id,
+        partial(run_scrape_logic, new_job.id, config),
+        country=parent_job.country,
+        layer2=parent_job.layer2_mode or resolve_layer2_mode({"scraper_type": parent_job.scraper_type, **config}),
+        priority=config.get("priority"),
+    )
 
 def analyze_brand_mentions(session: Session, prompt: Prompt):
     """Analyze response text for brand mentions and create PromptBrandMention records."""
-    text = (prompt.response_text or "").lower()
-    brands = session.exec(select(Brand)).all()
-    
-    for brand in brands:
-        is_mentioned = False
-        
-        # Check name
-        if brand.name.lower() in text:
-            is_mentioned = True
-            
-        # Check variations
-        if not is_mentioned and brand.variations:
-            # Handle variations if it's a comma-separated string or list (schema vs model diff)
-            # Model says str | None (comma-separated), Schema says list[str]
-            # We treat model as truth source here
-            vars_list = []
-            if isinstance(brand.variations, str):
-                vars_list = [v.strip().lower() for v in brand.variations.split(",") if v.strip()]
-            elif isinstance(brand.variations, list):
-                vars_list = [v.strip().lower() for v in brand.variations if v.strip()]
-                
-            for v in vars_list:
-                if v in text:
-                    is_mentioned = True
-                    break
-        
-        if is_mentioned:
-            # Estimate position: find first occurrence index
-            # This is a very rough estimation. Lower index = better visibility.
-            # In a real SERP scraper, we'd have list item ranks.
-            # Here we map text index to a 1-10 scale somewhat arbitrarily if not structured.
-            
-            # Simple heuristic: 
-            # 0-500 chars -> pos 1
-            # 500-1000 chars -> pos 2, etc.
-            first_idx = text.find(brand.name.lower())
-            if first_idx == -1 and brand.variations:
-                 # Find min index of variations
-                 indices = []
-                 vars_list = []
-                 if isinstance(brand.variations, str):
-                    vars_list = [v.strip().lower() for v in brand.variations.split(",") if v.strip()]
-                 for v in vars_list:
-                     idx = text.find(v)
-                     if idx != -1:
-                         indices.append(idx)
-                 if indices:
-                     first_idx = min(indices)
-            
-            position = 1
-            if first_idx > -1:
-                # Rough position estimation
-                position = min(10, (first_idx // 300) + 1)
-            
-            mention = PromptBrandMention(
+    matcher = get_brand_matcher(session)
+
+    # Only positive mentions are stored; get_runs_data treats missing rows as not mentioned
+    for brand_id, occurrence in matcher.first_occurrences(prompt.response_text).items():
+        # Rough position estimate from the first occurrence: lower offset = better visibility.
+        # In a real SERP scraper, we'd have list item ranks.
+        # 0-300 chars -> pos 1, 300-600 chars -> pos 2, ... capped at 10
+        position = min(10, (occurrence.start // 300) + 1)
+
+        mention = PromptBrandMention(
+            prompt_id=prompt.id,
+            brand_id=brand_id,
+            mentioned=True,
+            position=position,
+            sentiment="neutral" # Default
+        )
+        session.add(mention)
+
+    session.flush()
+    refresh_visibility_rollup(session, prompt)
+    session.commit()
+
+def save_scrape_result(
+    session: Session,
+    job_id: int,
+    result: dict,
+    html_blob: BlobRef | None,
+    end_time: datetime,
+    duration: float,
+) -> int | None:
+    """Record a scraper response on its job; on success store the prompt, sources and mentions.
+
+    Returns the new prompt id, or None if the scrape failed or the job no longer exists.
+    """
+    scrape_job = session.get(ScrapeJob, job_id)
+    if scrape_job:
+        # Always save HTML if available, regardless of status
+        if html_blob:
+             scrape_job.html_blob_key = html_blob.key
+             scrape_job.html_size_bytes = html_blob.size
+             scrape_job.response_size_kb = len(result.get("html_content", "")) / 1024
+
+        # Update metadata
+        scrape_job.proxy_used = result.get("metadata", {}).get("proxy_used")
+        scrape_job.profile_data = json.dumps(result.get("metadata", {}))
+        scrape_job.completed_at = end_time
+        scrape_job.duration_seconds = duration
+
+        # Extract proxy layer info from metadata
+        proxy_layer = result.get("metadata", {}).get("proxy_layer", {})
+        if proxy_layer:
+            scrape_job.layer2_mode = proxy_layer.get("layer2_mode")
+            origin = proxy_layer.get("origin", {})
+            if origin:
+                scrape_job.origin_ip = origin.get("ip")
+                scrape_job.origin_country = origin.get("country")
+                scrape_job.origin_verified = origin.get("verified", False)
+
+        # Estimate cost based on layer2_mode
+        cost_map = {"direct": 0, "residential": 0.004, "unlocker": 0.008, "browser": 0.025}
+        scrape_job.estimated_cost_usd = cost_map.get(scrape_job.layer2_mode, 0)
+
+        if result.get("status") == "failed":
+            scrape_job.status = "failed"
+            scrape_job.error = result.get("error", "Unknown scraper error")
+            session.add(scrape_job)
+            record_job_completion(session, scrape_job)
+            session.commit()
+            return None
+
+        # Success path
+        scrape_job.status = "completed"
+
+        # Create Prompt
+        prompt = Prompt(
+            query=scrape_job.query,
+            response_text=result.get("response_text"),
+            scraped_at=datetime.utcnow()
+        )
+        session.add(prompt)
+        session.commit()
+        session.refresh(prompt)
+
+        scrape_job.prompt_id = prompt.id
+        session.add(scrape_job)
+
+        # Save Sources
+        for src_data in result.get("data", []):
+            source = session.exec(select(Source).where(Source.url == src_data["url"])).first()
+            if not source:
+                source = Source(
+                    domain=src_data.get("publisher", "unknown"),
+                    url=src_data["url"],
+                    title=src_data.get("title"),
+                    description=src_data.get("description"),
+                    published_date=src_data.get("date"),
+                    category=classify_source(src_data.get("publisher", "unknown"), src_data["url"]),
+                )
+                session.add(source)
+                session.commit()
+                session.refresh(source)
+
+            link = PromptSource(
                 prompt_id=prompt.id,
-                brand_id=brand.id,
-                mentioned=True,
-                position=position,
-                sentiment="neutral" # Default
+                source_id=source.id,
+                citation_order=result.get("data", []).index(src_data) + 1
             )
-            session.add(mention)
-        else:
-            # Create a record for "not mentioned" if needed for queries, 
-            # or just skip. The frontend queries `mentioned=True`.
-            # But get_run_data queries all mentions for this prompt.
-            # We should probably create a record with mentioned=False so it exists?
-            # get_run_data handles missing mentions (returns False/0).
-            # So we only need to add positive mentions.
-            pass
-            
-    session.commit()
+            session.add(link)
+
+        # Analyze Brand Mentions (also refreshes the visibility rollup)
+        analyze_brand_mentions(session, prompt)
+
+        # Daily counters last, so the stats row is locked only until this commit
+        record_job_completion(session, scrape_job)
+        session.commit()
+        bump_data_version()
+
+        return prompt.id
 
 async def run_scrape_logic(job_id: int, config: dict):
     """Internal logic to execute a scrape job (extracted from API endpoint)."""
+    start_time = None
     try:
+        # Queued jobs are pending (and leased) until the scrape pool starts them
+        async with async_session() as session:
+            started = await session.exec(
+                update(ScrapeJob)
+                .where(ScrapeJob.id == job_id, ScrapeJob.status == "pending")
+                .values(status="running", lease_owner=None, lease_expires_at=None)
+            )
+            await session.commit()
+        if started.rowcount == 0:
+            # Cancelled, or taken over and started by another worker while this one stalled
+            print(f"[job:{job_id}] no longer pending, not started")
+            return
+
         # Construct request payload with profile support
         profile = config.get("profile", "desktop_1080p")
         
@@ -2077,14 +2111,9 @@ async def run_scrape_logic(job_id: int, config: dict):
         # Log job start
         print(f"[job:{job_id}] START query=\"{payload['query']}\" country={payload['country']} scraper={payload['scraper_type']} layer={payload['proxy_layer']} profile={payload['profile']}")
         
-        # Call scraper service
-        # Increased timeout for Bright Data SDK or browser wait
+        # Call scraper service (shared async client, SCRAPE_TIMEOUT for Bright Data SDK or browser wait)
         start_time = datetime.utcnow()
-        response = requests.post(
-            f"{SCRAPER_API_URL}/scrape",
-            json=payload,
-            timeout=600 
-        )
+        response = await scraper_client.scrape(payload)
         end_time = datetime.utcnow()
         duration = (end_time - start_time).total_seconds()
         
@@ -2092,106 +2121,122 @@ async def run_scrape_logic(job_id: int, config: dict):
             raise Exception(f"Scraper error: {response.text}")
             
         result = response.json()
+
+        # Store the page HTML outside the database (compressed, deduplicated)
+        html_blob = None
+        if result.get("html_content"):
+            html_blob = await asyncio.to_thread(
+                get_blob_store().put, result["html_content"][:1000000].encode("utf-8")
+            )
         
-        with Session(engine) as session:
-            scrape_job = session.get(ScrapeJob, job_id)
-            if scrape_job:
-                # Always save HTML if available, regardless of status
-                if result.get("html_content"):
-                     scrape_job.html_snapshot = result.get("html_content")[:1000000]
-                     scrape_job.response_size_kb = len(result.get("html_content", "")) / 1024
-                
-                # Update metadata
-                scrape_job.proxy_used = result.get("metadata", {}).get("proxy_used")
-                scrape_job.profile_data = json.dumps(result.get("metadata", {}))
-                scrape_job.completed_at = end_time
-                scrape_job.duration_seconds = duration
-                
-                # Extract proxy layer info from metadata
-                proxy_layer = result.get("metadata", {}).get("proxy_layer", {})
-                if proxy_layer:
-                    scrape_job.layer2_mode = proxy_layer.get("layer2_mode")
-                    origin = proxy_layer.get("origin", {})
-                    if origin:
-                        scrape_job.origin_ip = origin.get("ip")
-                        scrape_job.origin_country = origin.get("country")
-                        scrape_job.origin_verified = origin.get("verified", False)
-                
-                # Estimate cost based on layer2_mode
-                cost_map = {"direct": 0, "residential": 0.004, "unlocker": 0.008, "browser": 0.025}
-                scrape_job.estimated_cost_usd = cost_map.get(scrape_job.layer2_mode, 0)
-
-                if result.get("status") == "failed":
-                    scrape_job.status = "failed"
-                    scrape_job.error = result.get("error", "Unknown scraper error")
-                    session.add(scrape_job)
-                    session.commit()
-                    return None
-                
-                # Success path
-                scrape_job.status = "completed"
-                
-                # Create Prompt
-                prompt = Prompt(
-                    query=scrape_job.query,
-                    response_text=result.get("response_text"),
-                    scraped_at=datetime.utcnow()
-                )
-                session.add(prompt)
-                session.commit()
-                session.refresh(prompt)
-                
-                scrape_job.prompt_id = prompt.id
-                session.add(scrape_job)
-                
-                # Save Sources
-                for src_data in result.get("data", []):
-                    source = session.exec(select(Source).where(Source.url == src_data["url"])).first()
-                    if not source:
-                        source = Source(
-                            domain=src_data.get("publisher", "unknown"),
-                            url=src_data["url"],
-                            title=src_data.get("title"),
-                            description=src_data.get("description"),
-                            published_date=src_data.get("date")
-                        )
-                        session.add(source)
-                        session.commit()
-                        session.refresh(source)
-                    
-                    link = PromptSource(
-                        prompt_id=prompt.id,
-                        source_id=source.id,
-                        citation_order=result.get("data", []).index(src_data) + 1
-                    )
-                    session.add(link)
-                
-                # Analyze Brand Mentions
-                analyze_brand_mentions(session, prompt)
-                
-                session.commit()
-                
-                return prompt.id
+        async with async_session() as session:
+            # Sync ORM code (mention analysis, rollups) run on the async connection
+            return await session.run_sync(save_scrape_result, job_id, result, html_blob, end_time, duration)
                 
+    except asyncio.CancelledError:
+        print(f"[job:{job_id}] CANCELLED")
+        await fail_scrape_job(job_id, "Cancelled", start_time)
+        raise
     except Exception as e:
         print(f"Scheduled job {job_id} failed: {e}")
-        with Session(engine) as session:
-            scrape_job = session.get(ScrapeJob, job_id)
-            if scrape_job:
-                scrape_job.status = "failed"
-                scrape_job.error = str(e)[:500]  # Truncate long errors
-                scrape_job.completed_at = datetime.utcnow()
-                # Calculate duration if start_time was set
-                if 'start_time' in dir():
-                    scrape_job.duration_seconds = (datetime.utcnow() - start_time).total_seconds()
-                session.add(scrape_job)
-                session.commit()
+        # Some exceptions (e.g. httpx timeouts) have no message
+        await fail_scrape_job(job_id, str(e) or type(e).__name__, start_time)
         return None
 
+async def fail_scrape_job(job_id: int, error: str, start_time: datetime | None = None):
+    """Mark a scrape job failed and count it in the daily stats."""
+    async with async_session() as session:
+        scrape_job = await session.get(ScrapeJob, job_id)
+        if scrape_job:
+            scrape_job.status = "failed"
+            scrape_job.error = error[:500]  # Truncate long errors
+            scrape_job.completed_at = datetime.utcnow()
+            # Calculate duration if the scrape had started
+            if start_time:
+                scrape_job.duration_seconds = (datetime.utcnow() - start_time).total_seconds()
+            session.add(scrape_job)
+            await session.run_sync(record_job_completion, scrape_job)
+            await session.commit()
+
+# Pending jobs taken over per claim by recover_pending_jobs
+RECOVERY_BATCH_SIZE = 100
+
+
+def requeue_pending_job(job: ScrapeJob) -> None:
+    """Queue a pending job taken over from a worker that is gone, as it was first queued."""
+    config = json.loads(job.config_snapshot) if job.config_snapshot else {}
+    print(f"Re-queueing pending job {job.id} - {job.query}")
+    scrape_pool.submit(
+        job.id,
+        partial(run_scrape_logic, job.id, config),
+        country=job.country,
+        layer2=resolve_layer2_mode({"scraper_type": job.scraper_type, **config}),
+        priority=1 if job.schedule_type == "once" else config.get("priority"),
+    )
+
+
+async def recover_pending_jobs():
+    """Renew the leases of jobs queued here and take over pending jobs whose worker is gone."""
+    async with async_session() as session:
+        await renew_leases(session, job_scheduler.worker_id, scrape_pool.queued_job_ids())
+        while True:
+            jobs = await claim_orphaned_runs(session, job_scheduler.worker_id, RECOVERY_BATCH_SIZE)
+            for job in jobs:
+                try:
+                    requeue_pending_job(job)
+                except ValueError as e:  # Malformed config_snapshot
+                    await fail_scrape_job(job.id, f"Invalid config snapshot: {e}")
+            if len(jobs) < RECOVERY_BATCH_SIZE:
+                break
+
+
+# Resumed backfills still running; the loop only keeps weak references to tasks
+backfill_tasks: set[asyncio.Task] = set()
+
+
+def _backfill_done(task: asyncio.Task) -> None:
+    backfill_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Brand backfill error: {task.exception()}")
+
+
+async def recover_brand_backfills():
+    """Resume brand backfills left unfinished by a worker that is gone, each in its own thread."""
+    for backfill_id in await asyncio.to_thread(claim_orphaned_backfills, job_scheduler.worker_id):
+        print(f"Resuming brand backfill {backfill_id}")
+        task = asyncio.create_task(asyncio.to_thread(run_brand_backfill, backfill_id, job_scheduler.worker_id))
+        backfill_tasks.add(task)
+        task.add_done_callback(_backfill_done)
+
+
+async def pending_job_recovery_loop():
+    """recover_pending_jobs() and recover_brand_backfills() at startup and then three times per lease period."""
+    while True:
+        try:
+            await recover_pending_jobs()
+        except Exception as e:
+            print(f"Pending job recovery error: {e}")
+        try:
+            await recover_brand_backfills()
+        except Exception as e:
+            print(f"Brand backfill recovery error: {e}")
+        await asyncio.sleep(SCHEDULER_LEASE_SECONDS / 3)
+
+
 @app.on_event("startup")
 async def on_startup_scheduler():
-    """Start the scheduler loop."""
-    asyncio.create_task(scheduler_loop())
+    """Start the scheduler, pending job and brand backfill recovery, the event loop lag monitor and the legacy HTML snapshot move."""
+    asyncio.create_task(job_scheduler.run(dispatch_scheduled_job))
+    asyncio.create_task(pending_job_recovery_loop())
+    asyncio.create_task(loop_lag_monitor.run())
+    # Off the startup path: on a big table the copy takes a while (see snapshot_migration.py)
+    asyncio.create_task(asyncio.to_thread(run_snapshot_migration, engine))
+
+
+@app.on_event("shutdown")
+async def on_shutdown_scraper_client():
+    """Close the scraper service connections."""
+    await scraper_client.close_client()
 
 
 # VPN & Scraper Integration
@@ -2230,7 +2275,7 @@ async def on_startup_scheduler():
         }
     }
 )
-def get_vpn_servers():
+async def get_vpn_servers():
     """
     Fetch available ProtonVPN servers from Gluetun upstream.
     
@@ -2240,15 +2285,16 @@ def get_vpn_servers():
     try:
         # Try to get active proxies from scraper service first
         active_proxies = []
-        try:
-            resp = requests.get(f"{SCRAPER_API_URL}/config", timeout=2)
-            if resp.status_code == 200:
-                active_proxies = resp.json().get("proxies", [])
-        except:
+        scraper_config = await scraper_client.get_config(timeout=2)
+        if scraper_config is not None:
+            active_proxies = scraper_config.get("proxies", [])
+        else:
             active_proxies = ["fr", "de", "nl", "it", "es", "uk", "ch", "se"] # Fallback
 
         url = "https://raw.githubusercontent.com/qdm12/gluetun/master/internal/storage/servers.json"
-        resp = requests.get(url, timeout=10)
+        # Own client: the shared one's connections are for the scraper service only
+        async with httpx.AsyncClient(timeout=10) as client:
+            resp = await client.get(url)
         if resp.status_code != 200:
             raise HTTPException(status_code=503, detail="Failed to fetch upstream server list")
         
@@ -2302,19 +2348,16 @@ def get_vpn_servers():
         }
     }
 )
-def get_system_config():
+async def get_system_config():
     """
     Get system configuration including available scrapers and proxies.
     
     Fetches configuration from the scraper service or returns
     fallback configuration if service is unavailable.
     """
-    try:
-        response = requests.get(f"{SCRAPER_API_URL}/config", timeout=5)
-        if response.status_code == 200:
-            return response.json()
-    except:
-        pass
+    scraper_config = await scraper_client.get_config(timeout=5)
+    if scraper_config is not None:
+        return scraper_config
         
     return {
         "scrapers": ["google_ai", "perplexity", "brightdata", "chatgpt"],
@@ -2484,14 +2527,14 @@ class JobRequest(BaseModel):
         }
     }
 )
-async def create_scrape_job(job: JobRequest, background_tasks: BackgroundTasks):
+async def create_scrape_job(job: JobRequest):
     """
     Trigger a scraping job via the internal scraper service.
     
     Creates a job record and either executes immediately (one-time)
     or schedules for future execution (recurring).
     
-    For one-time jobs, waits for completion and returns prompt_id.
+    For one-time jobs, queues the scrape on the scrape pool and returns the job_id.
     For scheduled jobs, returns immediately with next_run_at timestamp.
     """
     
@@ -2499,7 +2542,7 @@ async def create_scrape_job(job: JobRequest, background_tasks: BackgroundTasks):
     config_snapshot = job.model_dump_json()
 
     # Determine status and schedule
-    status = "running"
+    status = "pending"
     next_run_at = None
     
     if job.frequency:
@@ -2518,25 +2561,58 @@ async def create_scrape_job(job: JobRequest, background_tasks: BackgroundTasks):
         next_run_at=next_run_at,
         schedule_type="recurring" if job.frequency else "once"
     )
+    if not job.frequency:
+        # Queued here; another worker takes it over if this one dies first
+        scrape_job.lease_owner = job_scheduler.worker_id
+        scrape_job.lease_expires_at = lease_expiry()
     
-    with Session(engine) as session:
+    async with async_session() as session:
         session.add(scrape_job)
-        session.commit()
-        session.refresh(scrape_job)
+        await session.commit()
         job_id = scrape_job.id
 
     # If scheduled/recurring, return early (scheduler handles it)
     if job.frequency:
+        job_scheduler.notify(job_id, next_run_at)
         return {"job_id": job_id, "status": "scheduled", "next_run_at": next_run_at}
 
-    # Execute immediately in background task to avoid timeout
-    background_tasks.add_task(run_scrape_logic_background, job_id, job.model_dump())
+    # Execute in the background on the scrape pool; someone is waiting, so ahead of scheduled runs
+    config = job.model_dump()
+    scrape_pool.submit(
+        job_id,
+        partial(run_scrape_logic, job_id, config),
+        country=job.country,
+        layer2=resolve_layer2_mode(config),
+        priority=1,
+    )
     
-    return {"job_id": job_id, "status": "pending", "message": "Job started in background"}
+    return {"job_id": job_id, "status": "pending", "message": "Job queued in background"}
 
-async def run_scrape_logic_background(job_id: int, config: dict):
-    """Wrapper for background execution."""
-    await run_scrape_logic(job_id, config)
+@app.post(
+    "/api/jobs/{job_id}/cancel",
+    tags=["jobs"],
+    summary="Cancel a scrape job",
+    description="""
+    Cancel a one-off scrape or scheduled run that is queued or in flight in
+    this worker. A running scrape's request to the scraper service is
+    aborted. The job is marked `failed` with error `Cancelled`.
+    """,
+)
+async def cancel_scrape_job(job_id: int):
+    """Cancel a queued or running scrape job."""
+    cancelled = await scrape_pool.cancel(job_id)
+    if cancelled is None:
+        raise HTTPException(status_code=409, detail=f"Job {job_id} is not queued or running in this worker")
+    
+    async with async_session() as session:
+        job = await session.get(ScrapeJob, job_id)
+        status = job.status if job else None
+    # Queued jobs never ran, and a scrape cancelled before it started could not record it
+    if status not in ("completed", "failed"):
+        await fail_scrape_job(job_id, "Cancelled")
+        status = "failed"
+    
+    return {"job_id": job_id, "cancelled": cancelled, "status": status}
 
 @app.get(
     "/api/jobs/{job_id}",
@@ -2547,7 +2623,7 @@ async def run_scrape_logic_background(job_id: int, config: dict):
 def get_job(job_id: int):
     """Get details for a specific scrape job."""
     with Session(engine) as session:
-        job = session.get(ScrapeJob, job_id)
+        job = session.get(ScrapeJob, job_id, options=[undefer_group("payload")])
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
         return {
@@ -2562,7 +2638,7 @@ def get_job(job_id: int):
             "proxy_used": job.proxy_used,
             "profile_data": json.loads(job.profile_data) if job.profile_data else None,
             "config_snapshot": json.loads(job.config_snapshot) if job.config_snapshot else None,
-            "html_snapshot_size": len(job.html_snapshot) if job.html_snapshot else 0,
+            "html_snapshot_size": job.html_size_bytes or 0,
             "prompt_id": job.prompt_id,
             "schedule_type": job.schedule_type,
             "frequency": job.frequency,
@@ -2575,18 +2651,51 @@ def get_job(job_id: int):
     "/api/jobs/{job_id}/html",
     tags=["jobs"],
     summary="Get job HTML snapshot",
-    description="Get the raw HTML snapshot captured during scraping. Returns HTML content directly.",
+    description="Get the raw HTML snapshot captured during scraping. The content is streamed from the blob store.",
 )
 def get_job_html(job_id: int):
     """Get HTML snapshot for a scrape job."""
-    from fastapi.responses import HTMLResponse
     with Session(engine) as session:
         job = session.get(ScrapeJob, job_id)
         if not job:
             raise HTTPException(status_code=404, detail="Job not found")
-        if not job.html_snapshot:
-            raise HTTPException(status_code=404, detail="No HTML snapshot available for this job")
-        return HTMLResponse(content=job.html_snapshot, media_type="text/html")
+        return html_snapshot_response(job)
+
+
+def html_snapshot_response(job: ScrapeJob) -> StreamingResponse:
+    """Stream a job's HTML snapshot, decompressing it from the blob store as it is sent."""
+    store = get_blob_store()
+    if not job.html_blob_key or not store.exists(job.html_blob_key):
+        raise HTTPException(status_code=404, detail="No HTML snapshot available for this job")
+    headers = {"Content-Length": str(job.html_size_bytes)} if job.html_size_bytes else None
+    return StreamingResponse(store.stream(job.html_blob_key), media_type="text/html; charset=utf-8", headers=headers)
+
+
+# ScrapeJob columns read by the job lists. Selecting just these keeps the JSON
+# payload columns (profile_data, config_snapshot, logs) out of list queries;
+# rows expose them as attributes, like ScrapeJob instances.
+JOB_SUMMARY_COLUMNS = (
+    ScrapeJob.id,
+    ScrapeJob.query,
+    ScrapeJob.country,
+    ScrapeJob.scraper_type,
+    ScrapeJob.status,
+    ScrapeJob.created_at,
+    ScrapeJob.completed_at,
+    ScrapeJob.error,
+    ScrapeJob.screenshot_path,
+    ScrapeJob.frequency,
+    ScrapeJob.next_run_at,
+    ScrapeJob.is_active,
+    ScrapeJob.parent_job_id,
+    ScrapeJob.duration_seconds,
+    ScrapeJob.response_size_kb,
+    ScrapeJob.layer2_mode,
+    ScrapeJob.estimated_cost_usd,
+    ScrapeJob.origin_ip,
+    ScrapeJob.origin_country,
+    ScrapeJob.origin_verified,
+)
 
 
 @app.get(
@@ -2605,6 +2714,8 @@ def get_job_html(job_id: int):
     
     **Query Parameters:**
     - `status`: Filter jobs by status (optional)
+    - `limit`: Page size (default 200)
+    - `cursor`: Value of the previous page's `X-Next-Cursor` header
     
     Returns list of jobs with:
     - Job ID, query, status, country
@@ -2634,18 +2745,30 @@ def get_job_html(job_id: int):
         }
     }
 )
-def list_jobs(status: str | None = None, limit: int = 200):
+def list_jobs(
+    response: Response,
+    status: str | None = None,
+    limit: int = Query(default=200, ge=1, le=1000),
+    cursor: str | None = None,
+):
     """
     List all scrape jobs.
     
-    Optionally filter by status. Results are ordered by creation time descending.
+    Optionally filter by status. Results are ordered by creation time descending,
+    keyset-paginated on (created_at, id).
     """
     with Session(engine) as session:
-        query = select(ScrapeJob).order_by(ScrapeJob.created_at.desc()).limit(limit)
+        query = select(*JOB_SUMMARY_COLUMNS).order_by(ScrapeJob.created_at.desc(), ScrapeJob.id.desc()).limit(limit + 1)
         if status:
             query = query.where(ScrapeJob.status == status)
+        if cursor:
+            query = query.where(after_cursor(
+                [ScrapeJob.created_at, ScrapeJob.id], decode_cursor(cursor, datetime, int), descending=True
+            ))
         
-        jobs = session.exec(query).all()
+        jobs, next_cursor = paginate(session.exec(query).all(), limit, key=lambda j: (j.created_at, j.id))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
         return [
             {
                 "id": job.id,
@@ -2689,7 +2812,7 @@ def list_scheduled_jobs():
     """List all active scheduled jobs."""
     with Session(engine) as session:
         jobs = session.exec(
-            select(ScrapeJob).where(
+            select(*JOB_SUMMARY_COLUMNS).where(
                 ScrapeJob.is_active == True,
                 ScrapeJob.frequency != None
             ).order_by(ScrapeJob.next_run_at)
@@ -2724,7 +2847,12 @@ def list_scheduled_jobs():
     "/api/scheduler-status",
     tags=["system"],
     summary="Get scheduler status",
-    description="Check if the background scheduler is running and view upcoming jobs.",
+    description="""
+    Check if the background scheduler is running and view upcoming jobs.
+    
+    `dispatch` reports this worker's timer heap (`timers`, `next_due_at`) and
+    dispatch lag: how long after its `next_run_at` each recurring run started.
+    """,
 )
 def get_scheduler_status():
     """Get scheduler status and upcoming jobs."""
@@ -2733,7 +2861,7 @@ def get_scheduler_status():
         
         # Get jobs due in the next hour
         upcoming = session.exec(
-            select(ScrapeJob).where(
+            select(*JOB_SUMMARY_COLUMNS).where(
                 ScrapeJob.is_active == True,
                 ScrapeJob.frequency != None,
                 ScrapeJob.next_run_at <= now + timedelta(hours=1)
@@ -2750,14 +2878,14 @@ def get_scheduler_status():
         
         # Get jobs that ran in the last hour
         recent = session.exec(
-            select(ScrapeJob).where(
+            select(*JOB_SUMMARY_COLUMNS).where(
                 ScrapeJob.completed_at >= now - timedelta(hours=1),
                 ScrapeJob.parent_job_id != None  # Only scheduled runs
             ).order_by(ScrapeJob.completed_at.desc())
         ).all()
         
         return {
-            "status": "running",
+            "status": "running" if job_scheduler.stats()["running"] else "stopped",
             "current_time": now.isoformat(),
             "total_scheduled_jobs": total_active,
             "jobs_due_next_hour": [
@@ -2779,7 +2907,8 @@ def get_scheduler_status():
                 for job in recent[:10]
             ],
             "scheduler_info": {
-                "check_interval": "60 seconds",
+                "mode": "event-driven (wakes at the next due job)",
+                "resync_interval": f"{job_scheduler.resync_interval:g} seconds",
                 "supported_frequencies": [
                     {"name": "hourly", "interval": "1 hour"},
                     {"name": "2_per_day", "interval": "12 hours"},
@@ -2790,6 +2919,7 @@ def get_scheduler_status():
                     {"name": "monthly", "interval": "30 days"},
                 ],
             },
+            "dispatch": job_scheduler.stats(),
         }
 
 
@@ -2811,6 +2941,7 @@ def pause_scheduled_job(job_id: int):
         job.is_active = False
         session.add(job)
         session.commit()
+        job_scheduler.notify(job_id, None)
         
         return {
             "id": job_id,
@@ -2842,6 +2973,7 @@ def resume_scheduled_job(job_id: int):
         
         session.add(job)
         session.commit()
+        job_scheduler.notify(job_id, job.next_run_at)
         
         return {
             "id": job_id,
@@ -2868,6 +3000,7 @@ def delete_scheduled_job(job_id: int):
         query_preview = job.query[:50]
         session.delete(job)
         session.commit()
+        job_scheduler.notify(job_id, None)
         
         return {
             "id": job_id,
@@ -2891,7 +3024,7 @@ def get_scheduled_job(job_id: int):
         
         # Get child jobs (executions)
         child_jobs = session.exec(
-            select(ScrapeJob).where(ScrapeJob.parent_job_id == job_id).order_by(ScrapeJob.created_at.desc()).limit(10)
+            select(*JOB_SUMMARY_COLUMNS).where(ScrapeJob.parent_job_id == job_id).order_by(ScrapeJob.created_at.desc()).limit(10)
         ).all()
         
         return {
@@ -2924,74 +3057,6 @@ def get_scheduled_job(job_id: int):
 # DAILY STATISTICS & MONITORING
 # =============================================================================
 
-def get_or_create_daily_stats(session: Session, date_str: str = None) -> DailyStats:
-    """Get or create daily stats for a given date."""
-    if not date_str:
-        date_str = datetime.utcnow().strftime("%Y-%m-%d")
-    
-    stats = session.exec(
-        select(DailyStats).where(DailyStats.date == date_str)
-    ).first()
-    
-    if not stats:
-        stats = DailyStats(date=date_str)
-        session.add(stats)
-        session.commit()
-        session.refresh(stats)
-    
-    return stats
-
-
-def update_daily_stats_from_job(session: Session, job: ScrapeJob):
-    """Update daily stats when a job completes."""
-    date_str = job.completed_at.strftime("%Y-%m-%d") if job.completed_at else datetime.utcnow().strftime("%Y-%m-%d")
-    stats = get_or_create_daily_stats(session, date_str)
-    
-    if job.status == "completed":
-        stats.prompts_completed += 1
-        
-        # Update by scraper type
-        if job.scraper_type == "google_ai":
-            stats.jobs_google_ai += 1
-        elif job.scraper_type == "chatgpt":
-            stats.jobs_chatgpt += 1
-        elif job.scraper_type == "perplexity":
-            stats.jobs_perplexity += 1
-        
-        # Update cost by layer
-        if job.layer2_mode:
-            cost = job.estimated_cost_usd or 0
-            if job.layer2_mode == "direct":
-                stats.cost_vpn_direct += cost
-            elif job.layer2_mode == "residential":
-                stats.cost_residential += cost
-            elif job.layer2_mode == "unlocker":
-                stats.cost_unlocker += cost
-            elif job.layer2_mode == "browser":
-                stats.cost_browser += cost
-            stats.total_cost_usd += cost
-        
-        # Update performance
-        if job.duration_seconds:
-            # Running average
-            total_jobs = stats.prompts_completed
-            stats.avg_duration_seconds = (
-                (stats.avg_duration_seconds * (total_jobs - 1) + job.duration_seconds) / total_jobs
-            )
-        
-        if job.response_size_kb:
-            stats.total_data_kb += job.response_size_kb
-            
-    elif job.status == "failed":
-        stats.prompts_failed += 1
-    
-    stats.quota_remaining = max(0, stats.daily_quota - stats.prompts_completed - stats.prompts_scheduled)
-    stats.updated_at = datetime.utcnow()
-    
-    session.add(stats)
-    session.commit()
-
-
 @app.get(
     "/api/daily-stats",
     tags=["analytics"],
@@ -3005,85 +3070,94 @@ def update_daily_stats_from_job(session: Session, job: ScrapeJob):
     - Cost breakdown by proxy layer
     - Performance metrics
     - Quota status
+    
+    With `days=N` (N > 1), returns the N days ending at `date` in one call:
+    `daily` has one entry per day (oldest first, same fields as a single-day
+    response without `active_sessions`), and `active_sessions` is listed once.
     """,
 )
-def get_daily_stats(date: str = None):
+def get_daily_stats(date: str = None, days: int = Query(default=1, ge=1, le=90)):
     """Get daily statistics for monitoring."""
     with Session(engine) as session:
         if not date:
             date = datetime.utcnow().strftime("%Y-%m-%d")
         
-        stats = get_or_create_daily_stats(session, date)
-        
-        # Also get real-time counts from jobs
-        today_start = datetime.strptime(date, "%Y-%m-%d")
-        today_end = today_start + timedelta(days=1)
+        # Job counts come from the jobs themselves, grouped by day in the database
+        range_end = datetime.strptime(date, "%Y-%m-%d") + timedelta(days=1)
+        range_start = range_end - timedelta(days=days)
+        dates = [(range_start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(days)]
+        job_counts = daily_job_counts(session, range_start, range_end)
         
-        # Count actual jobs for today
-        jobs_today = session.exec(
-            select(ScrapeJob).where(
-                ScrapeJob.created_at >= today_start,
-                ScrapeJob.created_at < today_end
-            )
-        ).all()
+        # Costs and performance from DailyStats; days without a row report the defaults
+        stored = {
+            row.date: row
+            for row in session.exec(select(DailyStats).where(DailyStats.date.in_(dates))).all()
+        }
         
-        completed = sum(1 for j in jobs_today if j.status == "completed")
-        failed = sum(1 for j in jobs_today if j.status == "failed")
-        running = sum(1 for j in jobs_today if j.status == "running")
-        pending = sum(1 for j in jobs_today if j.status in ("pending", "scheduled"))
+        def day_stats(day: str) -> dict:
+            stats = stored.get(day) or DailyStats(date=day)
+            counts = job_counts.get(day, {"total": 0, "by_status": {}, "by_scraper": {}, "by_country": {}})
+            by_status = counts["by_status"]
+            completed = by_status.get("completed", 0)
+            failed = by_status.get("failed", 0)
+            running = by_status.get("running", 0)
+            pending = by_status.get("pending", 0) + by_status.get("scheduled", 0)
+            return {
+                "date": day,
+                "summary": {
+                    "total_jobs": counts["total"],
+                    "completed": completed,
+                    "failed": failed,
+                    "running": running,
+                    "pending": pending,
+                    "success_rate": round(completed / counts["total"] * 100, 1) if counts["total"] else 0,
+                },
+                "quota": {
+                    "daily_limit": stats.daily_quota,
+                    "used": completed + running + pending,
+                    "remaining": max(0, stats.daily_quota - completed - running - pending),
+                    "percentage_used": round((completed + running + pending) / stats.daily_quota * 100, 1),
+                },
+                "by_scraper": {"google_ai": 0, "chatgpt": 0, "perplexity": 0, **counts["by_scraper"]},
+                "by_country": counts["by_country"],
+                "costs": {
+                    "vpn_direct": stats.cost_vpn_direct,
+                    "residential": stats.cost_residential,
+                    "unlocker": stats.cost_unlocker,
+                    "browser": stats.cost_browser,
+                    "total_usd": stats.total_cost_usd,
+                },
+                "performance": {
+                    "avg_duration_seconds": round(average_duration(stats), 2),
+                    "total_data_kb": round(stats.total_data_kb, 2),
+                },
+            }
         
-        # Get active sessions (running jobs)
+        # Get active sessions (running jobs), just the fields listed
         active_sessions = session.exec(
-            select(ScrapeJob).where(ScrapeJob.status == "running")
+            select(ScrapeJob.id, ScrapeJob.query, ScrapeJob.country, ScrapeJob.scraper_type, ScrapeJob.created_at)
+            .where(ScrapeJob.status == "running")
         ).all()
+        now = datetime.utcnow()
+        active = [
+            {
+                "id": j.id,
+                "query": j.query[:50],
+                "country": j.country,
+                "scraper_type": j.scraper_type,
+                "started_at": j.created_at.isoformat(),
+                "running_for_seconds": (now - j.created_at).total_seconds(),
+            }
+            for j in active_sessions
+        ]
         
+        if days == 1:
+            return {**day_stats(date), "active_sessions": active}
         return {
-            "date": date,
-            "summary": {
-                "total_jobs": len(jobs_today),
-                "completed": completed,
-                "failed": failed,
-                "running": running,
-                "pending": pending,
-                "success_rate": round(completed / len(jobs_today) * 100, 1) if jobs_today else 0,
-            },
-            "quota": {
-                "daily_limit": stats.daily_quota,
-                "used": completed + running + pending,
-                "remaining": max(0, stats.daily_quota - completed - running - pending),
-                "percentage_used": round((completed + running + pending) / stats.daily_quota * 100, 1),
-            },
-            "by_scraper": {
-                "google_ai": sum(1 for j in jobs_today if j.scraper_type == "google_ai"),
-                "chatgpt": sum(1 for j in jobs_today if j.scraper_type == "chatgpt"),
-                "perplexity": sum(1 for j in jobs_today if j.scraper_type == "perplexity"),
-            },
-            "by_country": {
-                country: sum(1 for j in jobs_today if j.country == country)
-                for country in set(j.country for j in jobs_today)
-            },
-            "costs": {
-                "vpn_direct": stats.cost_vpn_direct,
-                "residential": stats.cost_residential,
-                "unlocker": stats.cost_unlocker,
-                "browser": stats.cost_browser,
-                "total_usd": stats.total_cost_usd,
-            },
-            "performance": {
-                "avg_duration_seconds": round(stats.avg_duration_seconds, 2),
-                "total_data_kb": round(stats.total_data_kb, 2),
-            },
-            "active_sessions": [
-                {
-                    "id": j.id,
-                    "query": j.query[:50],
-                    "country": j.country,
-                    "scraper_type": j.scraper_type,
-                    "started_at": j.created_at.isoformat(),
-                    "running_for_seconds": (datetime.utcnow() - j.created_at).total_seconds(),
-                }
-                for j in active_sessions
-            ],
+            "start_date": dates[0],
+            "end_date": date,
+            "daily": [day_stats(day) for day in dates],
+            "active_sessions": active,
         }
 
 
@@ -3097,7 +3171,7 @@ def get_active_sessions():
     """Get all active scraping sessions."""
     with Session(engine) as session:
         active = session.exec(
-            select(ScrapeJob).where(ScrapeJob.status == "running")
+            select(*JOB_SUMMARY_COLUMNS).where(ScrapeJob.status == "running")
         ).all()
         
         return {
@@ -3122,18 +3196,23 @@ def get_active_sessions():
     "/api/job-history",
     tags=["analytics"],
     summary="Get job execution history",
-    description="Get recent job history with timing and performance data.",
+    description="Get recent job history with timing and performance data. Pass `next_cursor` from the response as `cursor` to fetch older jobs.",
 )
 def get_job_history(
-    limit: int = 50,
+    limit: int = Query(default=50, ge=1, le=500),
     status: str = None,
     scraper_type: str = None,
     country: str = None,
+    cursor: str | None = None,
 ):
-    """Get job execution history with filters."""
+    """Get job execution history with filters, newest first."""
     with Session(engine) as session:
-        query = select(ScrapeJob).order_by(ScrapeJob.created_at.desc())
+        query = select(*JOB_SUMMARY_COLUMNS).order_by(ScrapeJob.created_at.desc(), ScrapeJob.id.desc())
         
+        if cursor:
+            query = query.where(after_cursor(
+                [ScrapeJob.created_at, ScrapeJob.id], decode_cursor(cursor, datetime, int), descending=True
+            ))
         if status:
             query = query.where(ScrapeJob.status == status)
         if scraper_type:
@@ -3141,11 +3220,12 @@ def get_job_history(
         if country:
             query = query.where(ScrapeJob.country == country)
         
-        query = query.limit(limit)
-        jobs = session.exec(query).all()
+        query = query.limit(limit + 1)
+        jobs, next_cursor = paginate(session.exec(query).all(), limit, key=lambda j: (j.created_at, j.id))
         
         return {
             "count": len(jobs),
+            "next_cursor": next_cursor,
             "jobs": [
                 {
                     "id": j.id,
@@ -3758,10 +3838,10 @@ def schedule_batch(request: BatchScheduleRequest):
             })
         
         # Update stats
-        stats.prompts_scheduled += len(jobs_created)
-        stats.quota_remaining = stats.daily_quota - stats.prompts_scheduled - stats.prompts_completed
-        session.add(stats)
+        increment_daily_stats(session, today, prompts_scheduled=len(jobs_created))
         session.commit()
+        session.refresh(stats)
+        job_scheduler.request_resync()
         
         return {
             "scheduled": len(jobs_created),
@@ -3876,11 +3956,9 @@ def update_daily_quota(quota: int = 100):
     """Update daily quota."""
     with Session(engine) as session:
         today = datetime.utcnow().strftime("%Y-%m-%d")
-        stats = get_or_create_daily_stats(session, today)
-        stats.daily_quota = quota
-        stats.quota_remaining = quota - stats.prompts_completed - stats.prompts_scheduled
-        session.add(stats)
+        set_daily_quota(session, today, quota)
         session.commit()
+        stats = get_or_create_daily_stats(session, today)
         
         return {
             "daily_quota": quota,
@@ -4302,148 +4380,24 @@ async def get_all_vpn_status():
     "/api/stats/database",
     tags=["system"],
     summary="Get database statistics",
-    description="Get comprehensive statistics about jobs, prompts, and sources in the database.",
+    description="""
+    Get comprehensive statistics about jobs, prompts, and sources in the database.
+    
+    Job figures come from a single grouped query; countries and scraper types
+    are whatever the jobs contain. Pass `approximate=true` on large PostgreSQL
+    databases to read table totals from planner statistics instead of
+    counting rows (`approximate` in the response says whether any total is an
+    estimate). Responses are cached for `MONITORING_CACHE_TTL` seconds.
+    """,
 )
-async def get_database_stats():
+async def get_database_stats(approximate: bool = False):
     """
     Get database statistics for the admin dashboard.
     
     Returns counts, success rates, and recent activity.
     """
-    from datetime import timedelta
-    
-    with Session(engine) as session:
-        now = datetime.utcnow()
-        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        yesterday_start = today_start - timedelta(days=1)
-        week_start = today_start - timedelta(days=7)
-        
-        # Total counts
-        total_jobs = session.exec(select(func.count(ScrapeJob.id))).one()
-        total_prompts = session.exec(select(func.count(Prompt.id))).one()
-        total_sources = session.exec(select(func.count(Source.id))).one()
-        total_templates = session.exec(select(func.count(PromptTemplate.id))).one()
-        total_brands = session.exec(select(func.count(Brand.id))).one()
-        
-        # Jobs by status
-        jobs_by_status = {}
-        for status in ["completed", "failed", "running", "pending", "scheduled"]:
-            count = session.exec(
-                select(func.count(ScrapeJob.id)).where(ScrapeJob.status == status)
-            ).one()
-            jobs_by_status[status] = count
-        
-        # Today's jobs
-        today_jobs = session.exec(
-            select(func.count(ScrapeJob.id)).where(ScrapeJob.created_at >= today_start)
-        ).one()
-        today_completed = session.exec(
-            select(func.count(ScrapeJob.id)).where(
-                ScrapeJob.created_at >= today_start,
-                ScrapeJob.status == "completed"
-            )
-        ).one()
-        today_failed = session.exec(
-            select(func.count(ScrapeJob.id)).where(
-                ScrapeJob.created_at >= today_start,
-                ScrapeJob.status == "failed"
-            )
-        ).one()
-        
-        # Week stats
-        week_jobs = session.exec(
-            select(func.count(ScrapeJob.id)).where(ScrapeJob.created_at >= week_start)
-        ).one()
-        week_completed = session.exec(
-            select(func.count(ScrapeJob.id)).where(
-                ScrapeJob.created_at >= week_start,
-                ScrapeJob.status == "completed"
-            )
-        ).one()
-        
-        # Average duration
-        avg_duration = session.exec(
-            select(func.avg(ScrapeJob.duration_seconds)).where(
-                ScrapeJob.duration_seconds != None,
-                ScrapeJob.status == "completed"
-            )
-        ).one() or 0
-        
-        # Total cost (estimated)
-        total_cost = session.exec(
-            select(func.sum(ScrapeJob.estimated_cost_usd)).where(
-                ScrapeJob.estimated_cost_usd != None
-            )
-        ).one() or 0
-        today_cost = session.exec(
-            select(func.sum(ScrapeJob.estimated_cost_usd)).where(
-                ScrapeJob.created_at >= today_start,
-                ScrapeJob.estimated_cost_usd != None
-            )
-        ).one() or 0
-        
-        # Jobs by country
-        jobs_by_country = {}
-        for country in ["it", "fr", "de", "uk", "es", "nl", "ch", "se"]:
-            count = session.exec(
-                select(func.count(ScrapeJob.id)).where(ScrapeJob.country == country)
-            ).one()
-            if count > 0:
-                jobs_by_country[country] = count
-        
-        # Jobs by scraper type
-        jobs_by_scraper = {}
-        for scraper in ["google_ai", "chatgpt", "perplexity"]:
-            count = session.exec(
-                select(func.count(ScrapeJob.id)).where(ScrapeJob.scraper_type == scraper)
-            ).one()
-            if count > 0:
-                jobs_by_scraper[scraper] = count
-        
-        # Recent failed jobs (last 5)
-        recent_failed = session.exec(
-            select(ScrapeJob).where(ScrapeJob.status == "failed")
-            .order_by(ScrapeJob.created_at.desc()).limit(5)
-        ).all()
-        
-        return {
-            "totals": {
-                "jobs": total_jobs,
-                "prompts": total_prompts,
-                "sources": total_sources,
-                "templates": total_templates,
-                "brands": total_brands,
-            },
-            "jobs_by_status": jobs_by_status,
-            "today": {
-                "total": today_jobs,
-                "completed": today_completed,
-                "failed": today_failed,
-                "success_rate": round(today_completed / today_jobs * 100, 1) if today_jobs > 0 else 100,
-                "cost_usd": round(today_cost, 4),
-            },
-            "week": {
-                "total": week_jobs,
-                "completed": week_completed,
-                "success_rate": round(week_completed / week_jobs * 100, 1) if week_jobs > 0 else 100,
-            },
-            "performance": {
-                "avg_duration_seconds": round(avg_duration, 2),
-                "total_cost_usd": round(total_cost, 4),
-            },
-            "jobs_by_country": jobs_by_country,
-            "jobs_by_scraper": jobs_by_scraper,
-            "recent_failures": [
-                {
-                    "id": j.id,
-                    "query": j.query[:50] if j.query else "",
-                    "error": j.error[:100] if j.error else "Unknown",
-                    "created_at": j.created_at.isoformat() if j.created_at else None,
-                }
-                for j in recent_failed
-            ],
-            "generated_at": now.isoformat(),
-        }
+    async with async_session() as session:
+        return await session.run_sync(database_stats, approximate)
 
 
 # ==============================================================================
@@ -4500,21 +4454,26 @@ async def get_screenshot(filename: str):
     summary="List all screenshots",
     description="List all available screenshots with metadata.",
 )
-async def list_screenshots(job_id: int = None, limit: int = 50):
+def list_screenshots(
+    job_id: int = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str | None = None,
+):
     """
-    List available screenshots.
+    List available screenshots, newest first.
     
     Args:
         job_id: Filter by job ID (optional)
         limit: Maximum number of results (default 50)
+        cursor: `next_cursor` from the previous page (optional)
     
     Returns:
-        List of screenshot files with metadata
+        List of screenshot files with metadata, and a cursor for the next page
     """
     from pathlib import Path
+    import heapq
     import os
     
-    screenshots = []
     possible_dirs = [
         Path(SCREENSHOTS_DIR),
         Path("/app/data/screenshots"),
@@ -4528,43 +4487,83 @@ async def list_screenshots(job_id: int = None, limit: int = 50):
             break
     
     if not screenshots_dir:
-        return {"screenshots": [], "count": 0, "directory": None}
+        return {"screenshots": [], "count": 0, "directory": None, "next_cursor": None}
     
-    for f in sorted(screenshots_dir.glob("*.png"), key=lambda x: x.stat().st_mtime, reverse=True):
+    # Keyset on (mtime, filename), newest first
+    after = decode_cursor(cursor, float, str) if cursor else None
+    
+    def parse_job_id(name: str) -> int | None:
         # Parse filename to extract job_id if present
-        name = f.stem
-        file_job_id = None
         if name.startswith("job_"):
             parts = name.split("_")
             if len(parts) >= 2:
                 try:
-                    file_job_id = int(parts[1])
-                except:
+                    return int(parts[1])
+                except ValueError:
                     pass
-        
-        # Filter by job_id if specified
-        if job_id is not None and file_job_id != job_id:
-            continue
-        
-        stat = f.stat()
-        screenshots.append({
-            "filename": f.name,
-            "job_id": file_job_id,
-            "size_kb": round(stat.st_size / 1024, 2),
-            "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
-            "url": f"/api/screenshots/{f.name}",
-        })
-        
-        if len(screenshots) >= limit:
-            break
+        return None
+    
+    def candidates():
+        with os.scandir(screenshots_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".png") or not entry.is_file():
+                    continue
+                # Filter by job_id if specified
+                if job_id is not None and parse_job_id(entry.name[:-4]) != job_id:
+                    continue
+                stat = entry.stat()
+                key = (stat.st_mtime, entry.name)
+                if after is not None and key >= tuple(after):
+                    continue
+                yield key, stat.st_size
+    
+    # Only limit + 1 entries are kept in memory, however many files there are
+    newest = heapq.nlargest(limit + 1, candidates())
+    page, next_cursor = paginate(newest, limit, key=lambda item: item[0])
+    
+    screenshots = [
+        {
+            "filename": name,
+            "job_id": parse_job_id(name[:-4]),
+            "size_kb": round(size / 1024, 2),
+            "created_at": datetime.fromtimestamp(mtime).isoformat(),
+            "url": f"/api/screenshots/{name}",
+        }
+        for (mtime, name), size in page
+    ]
     
     return {
         "screenshots": screenshots,
         "count": len(screenshots),
         "directory": str(screenshots_dir),
+        "next_cursor": next_cursor,
     }
 
 
+def find_job_screenshots(job_id: int) -> list[dict]:
+    """Screenshots saved for a job (job_<id>_*.png, plus error screenshots naming the id)."""
+    screenshots = []
+    from pathlib import Path
+    for d in [Path(SCREENSHOTS_DIR), Path("/app/data/screenshots"), Path("data/screenshots")]:
+        if d.exists():
+            for f in d.glob(f"job_{job_id}_*.png"):
+                screenshots.append({
+                    "filename": f.name,
+                    "url": f"/api/screenshots/{f.name}",
+                    "size_kb": round(f.stat().st_size / 1024, 2),
+                })
+            # Also check for error screenshots without job_id prefix
+            for f in d.glob(f"*error*{job_id}*.png"):
+                if f.name not in [s["filename"] for s in screenshots]:
+                    screenshots.append({
+                        "filename": f.name,
+                        "url": f"/api/screenshots/{f.name}",
+                        "size_kb": round(f.stat().st_size / 1024, 2),
+                    })
+            break
+    return screenshots
+
+
 @app.get(
     "/api/jobs/{job_id}/details",
     tags=["jobs"],
@@ -4585,8 +4584,8 @@ async def get_job_details(job_id: int):
         - Network chain info
         - Cost and duration
     """
-    with Session(engine) as session:
-        job = session.get(ScrapeJob, job_id)
+    async with async_session() as session:
+        job = await session.get(ScrapeJob, job_id, options=[undefer_group("payload")])
         if not job:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
         
@@ -4604,26 +4603,8 @@ async def get_job_details(job_id: int):
         except:
             pass
         
-        # Find screenshots for this job
-        screenshots = []
-        from pathlib import Path
-        for d in [Path(SCREENSHOTS_DIR), Path("/app/data/screenshots"), Path("data/screenshots")]:
-            if d.exists():
-                for f in d.glob(f"job_{job_id}_*.png"):
-                    screenshots.append({
-                        "filename": f.name,
-                        "url": f"/api/screenshots/{f.name}",
-                        "size_kb": round(f.stat().st_size / 1024, 2),
-                    })
-                # Also check for error screenshots without job_id prefix
-                for f in d.glob(f"*error*{job_id}*.png"):
-                    if f.name not in [s["filename"] for s in screenshots]:
-                        screenshots.append({
-                            "filename": f.name,
-                            "url": f"/api/screenshots/{f.name}",
-                            "size_kb": round(f.stat().st_size / 1024, 2),
-                        })
-                break
+        # Directory scan on a worker thread
+        screenshots = await asyncio.to_thread(find_job_screenshots, job_id)
         
         return {
             "id": job.id,
@@ -4660,14 +4641,14 @@ async def get_job_details(job_id: int):
             "screenshot_count": len(screenshots),
             
             "html_snapshot": {
-                "available": bool(job.html_snapshot),
-                "size_kb": round(len(job.html_snapshot) / 1024, 2) if job.html_snapshot else 0,
-                "url": f"/api/jobs/{job_id}/html" if job.html_snapshot else None,
+                "available": bool(job.html_blob_key),
+                "size_kb": round(job.html_size_bytes / 1024, 2) if job.html_size_bytes else 0,
+                "url": f"/api/jobs/{job_id}/html" if job.html_blob_key else None,
             },
             
             "links": {
                 "sqladmin": f"/admin/scrape-job/details/{job_id}",
-                "html_snapshot": f"/api/jobs/{job_id}/html" if job.html_snapshot else None,
+                "html_snapshot": f"/api/jobs/{job_id}/html" if job.html_blob_key else None,
                 "screenshots": screenshots,
             },
         }
@@ -4681,17 +4662,13 @@ async def get_job_details(job_id: int):
 )
 async def get_job_html(job_id: int):
     """Get the HTML snapshot from a job."""
-    from fastapi.responses import HTMLResponse
-    
-    with Session(engine) as session:
-        job = session.get(ScrapeJob, job_id)
+    async with async_session() as session:
+        job = await session.get(ScrapeJob, job_id)
         if not job:
             raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
         
-        if not job.html_snapshot:
-            raise HTTPException(status_code=404, detail="No HTML snapshot available for this job")
-        
-        return HTMLResponse(content=job.html_snapshot)
+        # The blob store lookup may be a network call (S3)
+        return await asyncio.to_thread(html_snapshot_response, job)
 
 
 @app.get(
@@ -0,0 +1,208 @@
+"""
+Schema migrations for existing databases (SQLite and PostgreSQL).
+
+SQLModel.metadata.create_all() builds a fresh database from the models, but
+never changes a table that already exists. Changes to existing tables, new
+columns included, are written as revisions in this package and applied in
+order at startup by create_db_and_tables(), or by hand with
+scripts/migrate.py.
+
+A revision is a module named rNNNN_<slug>.py defining:
+
+    revision = "0002"            # unique id, sorts in apply order
+    down_revision = "0001"       # previous revision (None for the first)
+    description = "..."
+    transactional = True         # False to run outside a transaction
+    def upgrade(conn): ...
+    def downgrade(conn): ...
+
+Revisions must be idempotent (IF [NOT] EXISTS, add_column() / drop_column()),
+because on a fresh database create_all() has usually done the same work
+already. Applied revisions are
+recorded in the schema_migrations table.
+
+Non-transactional revisions run on an autocommit connection, which is what
+PostgreSQL needs for CREATE INDEX CONCURRENTLY (no write lock on the table
+while the index builds).
+"""
+
+import importlib
+import pkgutil
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+VERSION_TABLE = "schema_migrations"
+
+# Held while migrating so concurrent workers starting up do not race (PostgreSQL only)
+ADVISORY_LOCK_ID = 0x41495345  # "AISE"
+
+
+@dataclass
+class Revision:
+    revision: str
+    down_revision: str | None
+    description: str
+    transactional: bool
+    module: ModuleType
+
+
+def load_revisions() -> list[Revision]:
+    """All revisions in this package, in apply order."""
+    revisions = []
+    for info in pkgutil.iter_modules(__path__):
+        if not info.name.startswith("r"):
+            continue
+        module = importlib.import_module(f"{__name__}.{info.name}")
+        revisions.append(Revision(
+            revision=module.revision,
+            down_revision=module.down_revision,
+            description=module.description,
+            transactional=getattr(module, "transactional", True),
+            module=module,
+        ))
+    revisions.sort(key=lambda r: r.revision)
+
+    previous = None
+    for rev in revisions:
+        if rev.down_revision != previous:
+            raise RuntimeError(
+                f"Migration {rev.revision} follows {rev.down_revision}, expected {previous}"
+            )
+        previous = rev.revision
+    return revisions
+
+
+# --- Operations used by revisions ---
+
+def _concurrently(conn: Connection) -> str:
+    autocommit = conn.get_execution_options().get("isolation_level") == "AUTOCOMMIT"
+    return "CONCURRENTLY " if autocommit and conn.dialect.name == "postgresql" else ""
+
+
+def create_index(conn: Connection, name: str, table: str, columns: list[str], unique: bool = False) -> None:
+    """CREATE INDEX IF NOT EXISTS; concurrently on PostgreSQL in non-transactional revisions."""
+    column_list = ", ".join(f'"{column}"' for column in columns)
+    conn.execute(text(
+        f'CREATE {"UNIQUE " if unique else ""}INDEX {_concurrently(conn)}IF NOT EXISTS "{name}" '
+        f'ON "{table}" ({column_list})'
+    ))
+
+
+def drop_index(conn: Connection, name: str) -> None:
+    """DROP INDEX IF EXISTS; concurrently on PostgreSQL in non-transactional revisions."""
+    conn.execute(text(f'DROP INDEX {_concurrently(conn)}IF EXISTS "{name}"'))
+
+
+def _columns(conn: Connection, table: str) -> set[str] | None:
+    inspector = inspect(conn)
+    if not inspector.has_table(table):
+        return None
+    return {c["name"] for c in inspector.get_columns(table)}
+
+
+def add_column(conn: Connection, table: str, name: str, type_sql: str) -> None:
+    """ALTER TABLE ... ADD COLUMN, unless the column exists or the table does not (create_all() makes it)."""
+    columns = _columns(conn, table)
+    if columns is not None and name not in columns:
+        conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN "{name}" {type_sql}'))
+
+
+def drop_column(conn: Connection, table: str, name: str) -> None:
+    """ALTER TABLE ... DROP COLUMN if it exists (drop its indexes first)."""
+    columns = _columns(conn, table)
+    if columns is not None and name in columns:
+        conn.execute(text(f'ALTER TABLE "{table}" DROP COLUMN "{name}"'))
+
+
+# --- Runner ---
+
+def _ensure_version_table(engine: Engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} "
+            "(version VARCHAR(32) PRIMARY KEY, applied_at TIMESTAMP NOT NULL)"
+        ))
+
+
+def applied_revisions(engine: Engine) -> set[str]:
+    _ensure_version_table(engine)
+    with engine.connect() as conn:
+        return {row[0] for row in conn.execute(text(f"SELECT version FROM {VERSION_TABLE}"))}
+
+
+def _run(engine: Engine, rev: Revision, direction: str) -> None:
+    step = rev.module.upgrade if direction == "upgrade" else rev.module.downgrade
+    if direction == "upgrade":
+        record = text(f"INSERT INTO {VERSION_TABLE} (version, applied_at) VALUES (:v, :t)")
+        params = {"v": rev.revision, "t": datetime.utcnow()}
+    else:
+        record = text(f"DELETE FROM {VERSION_TABLE} WHERE version = :v")
+        params = {"v": rev.revision}
+
+    if rev.transactional:
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(record, params)
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            step(conn)
+            conn.execute(record, params)
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    """Serialize migrations across processes sharing a PostgreSQL database."""
+    if engine.dialect.name != "postgresql":
+        yield
+        return
+    with engine.connect() as conn:
+        conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+        conn.commit()
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+            conn.commit()
+
+
+def upgrade(engine: Engine, target: str | None = None) -> list[str]:
+    """Apply pending revisions up to target (default: all). Returns the revisions applied."""
+    revisions = load_revisions()
+    done = []
+    with _migration_lock(engine):
+        applied = applied_revisions(engine)
+        for rev in revisions:
+            if rev.revision not in applied:
+                print(f"[migrate] upgrade {rev.revision}: {rev.description}")
+                _run(engine, rev, "upgrade")
+                done.append(rev.revision)
+            if rev.revision == target:
+                break
+    return done
+
+
+def downgrade(engine: Engine, target: str | None) -> list[str]:
+    """Revert applied revisions newer than target (None reverts everything). Returns the revisions reverted."""
+    revisions = load_revisions()
+    done = []
+    with _migration_lock(engine):
+        applied = applied_revisions(engine)
+        for rev in reversed(revisions):
+            if target is not None and rev.revision <= target:
+                break
+            if rev.revision in applied:
+                print(f"[migrate] downgrade {rev.revision}: {rev.description}")
+                _run(engine, rev, "downgrade")
+                done.append(rev.revision)
+    return done
+
+
+def current(engine: Engine) -> str | None:
+    """Newest applied revision, or None."""
+    applied = applied_revisions(engine)
+    return max(applied) if applied else None
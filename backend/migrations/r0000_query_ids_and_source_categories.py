@@ -0,0 +1,30 @@
+"""
+Add Prompt.query_id and Source.category.
+
+Prompt.query_id links each run to its SearchQuery (queries.py backfills it
+on startup); Source.category stores the classification from
+source_categories.py. Both are nullable. Revision 0001 indexes them, so this
+one sorts before it.
+"""
+
+from migrations import add_column, drop_column
+
+revision = "0000"
+down_revision = None
+description = "Add prompt.query_id and source.category"
+
+COLUMNS = [
+    ("prompt", "query_id", "INTEGER"),
+    ("source", "category", "VARCHAR"),
+]
+
+
+def upgrade(conn):
+    for table, name, type_sql in COLUMNS:
+        add_column(conn, table, name, type_sql)
+
+
+def downgrade(conn):
+    # Revision 0001's downgrade has dropped the indexes on them
+    for table, name, _ in reversed(COLUMNS):
+        drop_column(conn, table, name)
@@ -0,0 +1,49 @@
+"""
+Indexes for the hot query paths.
+
+- promptbrandmention (prompt_id, brand_id, mentioned): mentions of a batch of
+  runs (get_runs_data), first-mention lookups and the visibility rollup
+- promptbrandmention (brand_id, mentioned): per-brand mention counts
+- promptsource (prompt_id) / (source_id): citations of a run, runs citing a source
+- prompt (scraped_at) / (query) / (query_id): time windows, per-query runs
+- source (category): source analytics and suggestions
+- scrapejob (status, created_at): job lists filtered by status
+- scrapejob (is_active, next_run_at): the scheduler's due-job scan
+- scrapejob (created_at, id): keyset pagination of the job lists
+
+Several of these are also declared on the models, so databases created from
+scratch already have them; this revision adds them to older databases.
+"""
+
+from migrations import create_index, drop_index
+
+revision = "0001"
+down_revision = "0000"
+description = "Indexes for hot query paths"
+
+# CREATE INDEX CONCURRENTLY on PostgreSQL, so live tables stay writable
+transactional = False
+
+INDEXES = [
+    ("ix_promptbrandmention_prompt_id_brand_id_mentioned", "promptbrandmention", ["prompt_id", "brand_id", "mentioned"]),
+    ("ix_promptbrandmention_brand_id_mentioned", "promptbrandmention", ["brand_id", "mentioned"]),
+    ("ix_promptsource_prompt_id", "promptsource", ["prompt_id"]),
+    ("ix_promptsource_source_id", "promptsource", ["source_id"]),
+    ("ix_prompt_scraped_at", "prompt", ["scraped_at"]),
+    ("ix_prompt_query", "prompt", ["query"]),
+    ("ix_prompt_query_id", "prompt", ["query_id"]),
+    ("ix_source_category", "source", ["category"]),
+    ("ix_scrapejob_status_created_at", "scrapejob", ["status", "created_at"]),
+    ("ix_scrapejob_is_active_next_run_at", "scrapejob", ["is_active", "next_run_at"]),
+    ("ix_scrapejob_created_at_id", "scrapejob", ["created_at", "id"]),
+]
+
+
+def upgrade(conn):
+    for name, table, columns in INDEXES:
+        create_index(conn, name, table, columns)
+
+
+def downgrade(conn):
+    for name, _, _ in reversed(INDEXES):
+        drop_index(conn, name)
@@ -0,0 +1,53 @@
+"""
+Move ScrapeJob.html_snapshot out of the database into the blob store.
+
+Schema only: adds the nullable html_blob_key / html_size_bytes columns, and
+leaves the emptied html_snapshot column in place (it is no longer on the
+model). Copying the snapshots themselves can take long on a
+big table, so it does not run here, inside startup; see
+snapshot_migration.py, which runs it in the background after startup and
+from `python scripts/migrate.py snapshots`.
+
+Downgrade copies the content back into html_snapshot.
+"""
+
+from sqlalchemy import text
+
+from blob_store import get_blob_store
+from migrations import add_column, drop_column
+from snapshot_migration import has_snapshot_column
+
+revision = "0002"
+down_revision = "0001"
+description = "Move HTML snapshots to the blob store"
+
+# Downgrade commits per row: the blob store is not transactional anyway
+transactional = False
+
+
+COLUMNS = [
+    ("html_blob_key", "VARCHAR"),
+    ("html_size_bytes", "INTEGER"),
+]
+
+
+def upgrade(conn):
+    # The data is moved by snapshot_migration.move_html_snapshots()
+    for name, type_sql in COLUMNS:
+        add_column(conn, "scrapejob", name, type_sql)
+
+
+def downgrade(conn):
+    if not has_snapshot_column(conn):
+        conn.execute(text("ALTER TABLE scrapejob ADD COLUMN html_snapshot TEXT"))
+
+    store = get_blob_store()
+    rows = conn.execute(text(
+        "SELECT id, html_blob_key FROM scrapejob WHERE html_blob_key IS NOT NULL ORDER BY id"
+    )).all()
+    for job_id, key in rows:
+        conn.execute(text(
+            "UPDATE scrapejob SET html_snapshot = :html, html_blob_key = NULL, html_size_bytes = NULL WHERE id = :id"
+        ), {"html": store.get(key).decode("utf-8"), "id": job_id})
+    for name, _ in reversed(COLUMNS):
+        drop_column(conn, "scrapejob", name)
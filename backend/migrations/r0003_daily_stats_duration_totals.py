@@ -0,0 +1,49 @@
+"""
+Add DailyStats.duration_total_seconds / duration_samples.
+
+The average job duration is now derived from a stored sum and count, which
+atomic upserts can increment (see daily_stats.py), instead of a running
+average that needs a read-modify-write. Existing rows are backfilled from
+avg_duration_seconds * prompts_completed.
+"""
+
+from sqlalchemy import inspect, text
+
+revision = "0003"
+down_revision = "0002"
+description = "Add duration sum/count to daily stats"
+
+COLUMNS = {
+    "duration_total_seconds": "FLOAT",
+    "duration_samples": "INTEGER",
+}
+
+
+def _existing_columns(conn) -> set[str]:
+    inspector = inspect(conn)
+    if not inspector.has_table("dailystats"):
+        return set()
+    return {c["name"] for c in inspector.get_columns("dailystats")}
+
+
+def upgrade(conn):
+    existing = _existing_columns(conn)
+    if not existing:
+        return  # Table not created yet; create_all() will include the columns
+    missing = [name for name in COLUMNS if name not in existing]
+    if not missing:
+        return  # Fresh database, created with the columns
+
+    for name in missing:
+        conn.execute(text(f"ALTER TABLE dailystats ADD COLUMN {name} {COLUMNS[name]} NOT NULL DEFAULT 0"))
+    conn.execute(text(
+        "UPDATE dailystats SET duration_total_seconds = avg_duration_seconds * prompts_completed, "
+        "duration_samples = prompts_completed WHERE avg_duration_seconds > 0"
+    ))
+
+
+def downgrade(conn):
+    existing = _existing_columns(conn)
+    for name in COLUMNS:
+        if name in existing:
+            conn.execute(text(f"ALTER TABLE dailystats DROP COLUMN {name}"))
@@ -0,0 +1,28 @@
+"""
+Add ScrapeJob.lease_owner / lease_expires_at.
+
+Workers lease due scheduled jobs and the runs waiting in their scrape pool
+queue through these columns (see job_claims.py). Both are nullable: no
+lease.
+"""
+
+from migrations import add_column, drop_column
+
+revision = "0004"
+down_revision = "0003"
+description = "Add lease columns to scrape jobs"
+
+COLUMNS = [
+    ("lease_owner", "VARCHAR"),
+    ("lease_expires_at", "TIMESTAMP"),
+]
+
+
+def upgrade(conn):
+    for name, type_sql in COLUMNS:
+        add_column(conn, "scrapejob", name, type_sql)
+
+
+def downgrade(conn):
+    for name, _ in reversed(COLUMNS):
+        drop_column(conn, "scrapejob", name)
@@ -0,0 +1,32 @@
+"""
+Fail pending ScrapeJobs that were never leased.
+
+Before 0004 a run waited in its worker's in-memory scrape pool queue with no
+record in the database of who held it, and a restart lost the queue. Rows
+still pending without a lease are left over from those restarts, possibly
+long ago, so they are failed here rather than taken over and scraped now
+(claim_orphaned_runs() only takes over leases that lapsed, see job_claims.py).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+
+revision = "0005"
+down_revision = "0004"
+description = "Fail pending scrape jobs that were never leased"
+
+ERROR = "Abandoned in the queue before runs were leased; start it again"
+
+
+def upgrade(conn):
+    if not inspect(conn).has_table("scrapejob"):
+        return  # Fresh database, nothing queued yet
+    conn.execute(text(
+        "UPDATE scrapejob SET status = 'failed', error = :error, completed_at = :now "
+        "WHERE status = 'pending' AND lease_expires_at IS NULL"
+    ), {"error": ERROR, "now": datetime.utcnow()})
+
+
+def downgrade(conn):
+    pass  # The failed runs are not queued again
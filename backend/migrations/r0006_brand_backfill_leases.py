@@ -0,0 +1,29 @@
+"""
+Add BrandBackfill.lease_owner / lease_expires_at.
+
+A backfill is leased to the worker running it and the lease is renewed with
+every chunk, so a backfill left pending or running by a worker that restarted
+is resumed by another one (see brand_backfill.py). Backfills without a lease
+predate this revision and are resumed too.
+"""
+
+from migrations import add_column, drop_column
+
+revision = "0006"
+down_revision = "0005"
+description = "Add lease columns to brand backfills"
+
+COLUMNS = [
+    ("lease_owner", "VARCHAR"),
+    ("lease_expires_at", "TIMESTAMP"),
+]
+
+
+def upgrade(conn):
+    for name, type_sql in COLUMNS:
+        add_column(conn, "brandbackfill", name, type_sql)
+
+
+def downgrade(conn):
+    for name, _ in reversed(COLUMNS):
+        drop_column(conn, "brandbackfill", name)
@@ -1,8 +1,26 @@
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, AutoString, select
+from sqlalchemy import Column, Index, UniqueConstraint, event, orm
+from sqlalchemy.dialects import postgresql, sqlite
 from typing import Optional
 from datetime import datetime
 
 
+# Large text columns are deferred: list and analytics queries never load them,
+# and single-row reads ask for them with undefer() / undefer_group(). Accessing
+# one on an instance still attached to its session loads it with an extra query;
+# on a detached instance it raises DetachedInstanceError.
+def deferred_text_column(name: str) -> Column:
+    return Column(name, AutoString, nullable=True)
+
+
+_prompt_response_text = deferred_text_column("response_text")
+
+# ScrapeJob columns in the "payload" group (undefer_group("payload"))
+_job_profile_data = deferred_text_column("profile_data")
+_job_config_snapshot = deferred_text_column("config_snapshot")
+_job_logs = deferred_text_column("logs")
+
+
 class Brand(SQLModel, table=True):
     """Brand being tracked (e.g., Shopify, WooCommerce)"""
     id: str = Field(primary_key=True)  # e.g., 'shopify'
@@ -15,21 +33,72 @@ class Brand(SQLModel, table=True):
     mentions: list["PromptBrandMention"] = Relationship(back_populates="brand")
 
 
+class SearchQuery(SQLModel, table=True):
+    """Canonical query text; its id is the stable `query-N` identifier used by the API"""
+    id: int | None = Field(default=None, primary_key=True)
+    text: str = Field(unique=True, index=True)
+
+    # Relationships
+    prompts: list["Prompt"] = Relationship(back_populates="search_query")
+
+
 class Prompt(SQLModel, table=True):
     """A single scrape/run of a query to Google AI Mode"""
+    __mapper_args__ = {"properties": {"response_text": orm.deferred(_prompt_response_text)}}
+
     id: int | None = Field(default=None, primary_key=True)
-    query: str  # Not unique - multiple runs of same query allowed
+    query: str = Field(index=True)  # Not unique - multiple runs of same query allowed
+    query_id: int | None = Field(default=None, foreign_key="searchquery.id", index=True)  # Set on flush, see below
     run_number: int = 1  # Which run/pass this is (1, 2, 3, etc.)
-    response_text: str | None = None
-    scraped_at: datetime = Field(default_factory=datetime.utcnow)
+    response_text: str | None = Field(default=None, sa_column=_prompt_response_text)  # Deferred
+    scraped_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
     # Relationships
+    search_query: Optional[SearchQuery] = Relationship(back_populates="prompts")
     brand_mentions: list["PromptBrandMention"] = Relationship(back_populates="prompt")
     sources: list["PromptSource"] = Relationship(back_populates="prompt")
 
 
+@event.listens_for(orm.Session, "before_flush")
+def _link_prompts_to_search_queries(session, flush_context, instances):
+    """Attach new prompts to their SearchQuery, creating it on first use.
+
+    Runs for every writer (API, scripts, admin), so Prompt.query_id is always set.
+    """
+    pending: dict[str, SearchQuery] = {
+        obj.text: obj for obj in session.new if isinstance(obj, SearchQuery)
+    }
+    for obj in list(session.new):
+        if not isinstance(obj, Prompt) or obj.query_id is not None or obj.search_query is not None:
+            continue
+        search_query = pending.get(obj.query)
+        if search_query is None:
+            with session.no_autoflush:
+                search_query = _find_search_query(session, obj.query)
+                if search_query is None:
+                    # Another writer may be creating the same query: insert it
+                    # unless it exists by now, then load whichever row won
+                    insert = postgresql.insert if session.get_bind().dialect.name == "postgresql" else sqlite.insert
+                    session.execute(
+                        insert(SearchQuery).values(text=obj.query).on_conflict_do_nothing(index_elements=["text"])
+                    )
+                    search_query = _find_search_query(session, obj.query)
+            pending[obj.query] = search_query
+        obj.search_query = search_query
+
+
+def _find_search_query(session, text: str) -> SearchQuery | None:
+    return session.execute(select(SearchQuery).where(SearchQuery.text == text)).scalars().first()
+
+
 class PromptBrandMention(SQLModel, table=True):
     """Records which brands are mentioned in which prompts"""
+    # Mentions of a batch of runs / per-brand mention counts (see migrations/r0001)
+    __table_args__ = (
+        Index("ix_promptbrandmention_prompt_id_brand_id_mentioned", "prompt_id", "brand_id", "mentioned"),
+        Index("ix_promptbrandmention_brand_id_mentioned", "brand_id", "mentioned"),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
     prompt_id: int = Field(foreign_key="prompt.id")
     brand_id: str = Field(foreign_key="brand.id")
@@ -43,6 +112,40 @@ class PromptBrandMention(SQLModel, table=True):
     brand: Brand = Relationship(back_populates="mentions")
 
 
+class BrandVisibilityRollup(SQLModel, table=True):
+    """Per-brand, per-month, per-query visibility, maintained at ingest time.
+
+    One row exists for every brand and every query scraped in a period, so the
+    number of distinct queries in a period can be read from this table too.
+    """
+    __table_args__ = (UniqueConstraint("brand_id", "period", "query"),)
+
+    id: int | None = Field(default=None, primary_key=True)
+    brand_id: str = Field(foreign_key="brand.id", index=True)
+    period: str = Field(index=True)  # YYYY-MM
+    query: str
+    mentioned: bool = False  # Mentioned in at least one run of the query this period
+    best_position: int | None = None  # Best (lowest) position across those runs
+
+
+class BrandBackfill(SQLModel, table=True):
+    """Background job creating a new brand's mention records for existing prompts"""
+    id: int | None = Field(default=None, primary_key=True)
+    brand_id: str = Field(index=True)  # Not a foreign key: the brand may be deleted while the job runs
+    status: str = "pending"  # pending, running, completed, failed
+    total_prompts: int = 0  # Prompts with response text when the job was created
+    max_prompt_id: int = 0  # Newest prompt at creation; later prompts get mentions at ingest
+    processed_prompts: int = 0
+    mentioned_prompts: int = 0
+    last_prompt_id: int = 0  # Highest Prompt.id processed so far (chunks are committed in id order)
+    lease_owner: str | None = None  # Worker running this backfill (see brand_backfill.py)
+    lease_expires_at: datetime | None = None  # Renewed per chunk; a lapsed lease means the worker is gone
+    error: str | None = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    started_at: datetime | None = None
+    completed_at: datetime | None = None
+
+
 class Source(SQLModel, table=True):
     """A source website cited by Google AI Mode"""
     id: int | None = Field(default=None, primary_key=True)
@@ -51,6 +154,7 @@ class Source(SQLModel, table=True):
     title: str | None = None
     description: str | None = None  # Snippet from Google
     published_date: str | None = None  # e.g., "24 Oct 2025"
+    category: str | None = Field(default=None, index=True)  # blog/brand/community/news/review/other, see source_categories.py
 
     # Relationships
     prompt_links: list["PromptSource"] = Relationship(back_populates="source")
@@ -59,8 +163,8 @@ class Source(SQLModel, table=True):
 class PromptSource(SQLModel, table=True):
     """Links prompts to their cited sources"""
     id: int | None = Field(default=None, primary_key=True)
-    prompt_id: int = Field(foreign_key="prompt.id")
-    source_id: int = Field(foreign_key="source.id")
+    prompt_id: int = Field(foreign_key="prompt.id", index=True)
+    source_id: int = Field(foreign_key="source.id", index=True)
     citation_order: int  # Order of appearance in sources list
 
     # Relationships
@@ -70,6 +174,22 @@ class PromptSource(SQLModel, table=True):
 
 class ScrapeJob(SQLModel, table=True):
     """Tracks asynchronous scraping jobs"""
+    __table_args__ = (
+        # Sort key of the job lists (newest first, id as tie-breaker) for keyset pagination
+        Index("ix_scrapejob_created_at_id", "created_at", "id"),
+        # Job lists filtered by status
+        Index("ix_scrapejob_status_created_at", "status", "created_at"),
+        # Scheduler scan for due recurring jobs
+        Index("ix_scrapejob_is_active_next_run_at", "is_active", "next_run_at"),
+    )
+    __mapper_args__ = {
+        "properties": {
+            "profile_data": orm.deferred(_job_profile_data, group="payload"),
+            "config_snapshot": orm.deferred(_job_config_snapshot, group="payload"),
+            "logs": orm.deferred(_job_logs, group="payload"),
+        }
+    }
+
     id: int | None = Field(default=None, primary_key=True)
     query: str
     country: str
@@ -79,11 +199,12 @@ class ScrapeJob(SQLModel, table=True):
     completed_at: datetime | None = None
     error: str | None = None
     proxy_used: str | None = None
-    profile_data: str | None = None  # JSON string of profile metadata
-    config_snapshot: str | None = None # JSON string of request config
-    html_snapshot: str | None = None # Full HTML content of the page
+    profile_data: str | None = Field(default=None, sa_column=_job_profile_data)  # JSON string of profile metadata
+    config_snapshot: str | None = Field(default=None, sa_column=_job_config_snapshot)  # JSON string of request config
+    html_blob_key: str | None = None  # Blob store key of the page HTML, see blob_store.py
+    html_size_bytes: int | None = None  # Uncompressed size of that HTML
     screenshot_path: str | None = None  # Path to screenshot file (relative to screenshots folder)
-    logs: str | None = None  # JSON string of log entries during job execution
+    logs: str | None = Field(default=None, sa_column=_job_logs)  # JSON string of log entries during job execution
     prompt_id: int | None = Field(default=None, foreign_key="prompt.id")
     
     # Scheduling fields
@@ -92,6 +213,8 @@ class ScrapeJob(SQLModel, table=True):
     next_run_at: datetime | None = None
     is_active: bool = True
     parent_job_id: int | None = Field(default=None, foreign_key="scrapejob.id")
+    lease_owner: str | None = None  # Worker dispatching this job, or whose queue holds this run (see job_claims.py)
+    lease_expires_at: datetime | None = None  # Lease lapses after this unless renewed, e.g. if the worker died
     
     # Performance tracking
     duration_seconds: float | None = None  # Time to complete
@@ -129,8 +252,10 @@ class DailyStats(SQLModel, table=True):
     cost_browser: float = 0.0  # ~$0.01-0.03/req
     total_cost_usd: float = 0.0
     
-    # Performance
+    # Performance (avg_duration_seconds = duration_total_seconds / duration_samples)
     avg_duration_seconds: float = 0.0
+    duration_total_seconds: float = Field(default=0.0, sa_column_kwargs={"server_default": "0"})
+    duration_samples: int = Field(default=0, sa_column_kwargs={"server_default": "0"})
     total_data_kb: float = 0.0
     
     # Quota
@@ -0,0 +1,63 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A cursor is an opaque, URL-safe encoding of the sort key of the last row on
+the previous page. The next page is selected with a row-value comparison on
+those columns (`WHERE (created_at, id) < (:created_at, :id)`), which an index
+on the same columns answers directly, so every page costs the same no matter
+how deep the client pages - unlike OFFSET.
+
+Endpoints fetch `limit + 1` rows; the extra row only tells whether another
+page exists.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+
+
+# Response header carrying the next cursor for endpoints whose body is a bare list
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Page size for endpoints that return everything unless a limit or cursor is passed
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode sort key values into an opaque cursor string."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> list:
+    """Decode a cursor produced by encode_cursor, converting values to `types`."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor has the wrong shape")
+        return [datetime.fromisoformat(v) if t is datetime else t(v) for v, t in zip(values, types)]
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def after_cursor(columns: Sequence, values: Sequence, descending: bool = False):
+    """Predicate selecting rows strictly after the cursor in (columns) order."""
+    if descending:
+        return tuple_(*columns) < tuple(values)
+    return tuple_(*columns) > tuple(values)
+
+
+def paginate(rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> tuple[list, str | None]:
+    """Trim a `limit + 1` fetch to one page and build the cursor for the next one."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, encode_cursor(*key(rows[-1]))
@@ -0,0 +1,104 @@
+"""
+Connection pool instrumentation.
+
+InstrumentedQueuePool is SQLAlchemy's QueuePool plus timing of every
+checkout: how long callers waited for a connection (near zero while the
+pool has idle connections, up to pool_timeout when it is exhausted) and
+how many gave up with a timeout. stats() adds the pool's current
+utilisation; /api/db/pool serves it.
+
+Counters are per worker process. InstrumentedAsyncQueuePool is the same for
+the async engine.
+"""
+
+import threading
+import time
+from collections import deque
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+# Recent checkout waits kept for percentiles
+WAIT_SAMPLES = 1000
+
+
+class PoolMetrics:
+    """Checkout wait-time counters, shared by a pool and its recreated copies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+                self._waits.append(wait)
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def wait_stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.checkouts + self.timeouts
+
+            def percentile(p: float) -> float:
+                return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0
+
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / attempts * 1000, 2) if attempts else 0,
+                "p50_wait_ms": percentile(0.50),
+                "p95_wait_ms": percentile(0.95),
+                "p99_wait_ms": percentile(0.99),
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def __init__(self, *args, metrics: PoolMetrics | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics or PoolMetrics()
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep counting into the same metrics
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def stats(self) -> dict:
+        capacity = self.size() + max(self._max_overflow, 0)
+        checked_out = self.checkedout()
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": checked_out,
+            "idle": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "utilisation": round(checked_out / capacity * 100, 1) if capacity > 0 else None,
+            **self.metrics.wait_stats(),
+        }
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """InstrumentedQueuePool for async engines (waits on an asyncio-aware queue)."""
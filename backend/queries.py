@@ -0,0 +1,59 @@
+"""
+Stable query identifiers.
+
+Every distinct query text has one SearchQuery row; its primary key is exposed
+as `query-N` by the prompts endpoints. Unlike the old positional index, the id
+never changes when new queries are added, and resolving it is a primary-key
+lookup followed by an indexed Prompt.query_id scan of that query's runs only.
+"""
+
+from fastapi import HTTPException
+from sqlalchemy import exists, insert, update
+from sqlmodel import Session, select
+
+from models import Prompt, SearchQuery
+
+
+def format_query_id(search_query_id: int) -> str:
+    return f"query-{search_query_id}"
+
+
+def parse_query_id(query_id: str) -> int:
+    """Accept `query-N` (or a bare `N`, as sent by the frontend) and return N."""
+    try:
+        return int(query_id.replace("query-", "").replace("prompt-", ""))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid query ID format")
+
+
+def backfill_query_ids(session: Session) -> int:
+    """
+    Link prompts that predate SearchQuery (query_id IS NULL) to their query.
+
+    Missing SearchQuery rows are inserted in alphabetical order, so on an
+    existing database the new ids match the positional `query-N` ids the API
+    handed out before. Returns the number of prompts linked. Caller commits.
+    """
+    has_unlinked = session.exec(select(Prompt.id).where(Prompt.query_id == None).limit(1)).first()
+    if not has_unlinked:
+        return 0
+
+    session.exec(
+        insert(SearchQuery).from_select(
+            ["text"],
+            select(Prompt.query)
+            .where(Prompt.query_id == None, ~exists().where(SearchQuery.text == Prompt.query))
+            .distinct()
+            .order_by(Prompt.query),
+        )
+    )
+    result = session.exec(
+        update(Prompt)
+        .where(Prompt.query_id == None)
+        .values(
+            query_id=select(SearchQuery.id)
+            .where(SearchQuery.text == Prompt.query)
+            .scalar_subquery()
+        )
+    )
+    return result.rowcount
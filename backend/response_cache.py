@@ -0,0 +1,122 @@
+"""
+In-process response cache for the read-only analytics endpoints.
+
+Entries are keyed by endpoint path + query parameters + the global data
+version. Anything that changes analytics data (a completed scrape, brand
+create/delete/set-primary) calls bump_data_version(), which makes every
+existing entry unreachable; they then age out of the LRU.
+
+The cache is bounded in size (LRU eviction) and in age (TTL). The TTL also
+bounds staleness for writes the counter cannot see, such as scripts or the
+admin UI writing to the database directly, or another worker process.
+
+monitoring_cache holds the job/database monitoring endpoints the admin
+dashboard polls. Job counters change with every job, without a data
+version bump, so its entries just expire after a short TTL.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+
+# Maximum number of cached responses
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+
+# Seconds a cached response stays valid, even if the data version is unchanged
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+# Seconds a cached monitoring response (e.g. /api/stats/database) stays valid
+MONITORING_CACHE_TTL = float(os.getenv("MONITORING_CACHE_TTL", "5"))
+
+
+@dataclass
+class CachedResponse:
+    """A captured response body plus what is needed to replay it."""
+    body: bytes
+    status_code: int
+    media_type: str | None
+    headers: dict[str, str]
+    expires_at: float
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        """Invalidate all cached responses by advancing the data version."""
+        with self._lock:
+            self._version += 1
+            # Old entries can never be hit again; drop them now rather than
+            # letting them occupy LRU slots until evicted.
+            self._entries.clear()
+            return self._version
+
+    def make_key(self, path: str, params: list[tuple[str, str]]) -> tuple:
+        return (path, tuple(sorted(params)), self._version)
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(
+        self, key: tuple, body: bytes, status_code: int, media_type: str | None, headers: dict[str, str] | None = None
+    ) -> None:
+        with self._lock:
+            # Skip responses computed against a version that has since been bumped
+            if key[-1] != self._version:
+                return
+            self._entries[key] = CachedResponse(
+                body, status_code, media_type, headers or {}, time.monotonic() + self.ttl
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "data_version": self._version,
+                "entries": len(self._entries),
+                "max_entries": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups * 100, 1) if lookups else 0,
+            }
+
+
+response_cache = ResponseCache()
+monitoring_cache = ResponseCache(maxsize=32, ttl=MONITORING_CACHE_TTL)
+
+
+def bump_data_version() -> int:
+    """Call after committing any change that affects analytics responses."""
+    return response_cache.bump_version()
@@ -0,0 +1,206 @@
+"""
+Brand × period visibility rollup.
+
+BrandVisibilityRollup holds one row per (brand, YYYY-MM period, query) with
+whether the brand was mentioned in any run of that query during the period
+and its best position. Chart endpoints read these rows instead of rescanning
+the whole Prompt/PromptBrandMention history on every request.
+
+The rollup is maintained incrementally at ingest time (refresh_visibility_rollup)
+and can be rebuilt from scratch (rebuild_visibility_rollup, see
+scripts/rebuild_visibility_rollup.py).
+
+Rows are written with INSERT ... SELECT ... ON CONFLICT (brand_id, period,
+query) DO UPDATE, so runs of the same query finishing at the same time (or a
+brand backfill rebuilding its rows) overwrite each other's rows instead of
+failing on the unique constraint. On PostgreSQL refreshes of the same
+(period, query) also take a transaction-scoped advisory lock, so the second
+one waits for the first to commit and then reads both runs.
+"""
+
+from sqlalchemy import and_, case, delete, literal, true
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select, func
+
+from aggregations import brand_mentioned_queries_by_bucket, count_queries_by_bucket
+from models import Brand, BrandVisibilityRollup, Prompt, PromptBrandMention
+from timewindow import TimeWindow, bucket_expr, in_period, period_for
+
+
+def _rollup_select(session: Session, *criteria, brand_ids: list[str] | None = None):
+    """
+    SELECT producing rollup rows for every brand × (period, query) pair.
+
+    `criteria` restricts which prompts are considered, so the same statement
+    serves both the full rebuild and the per-query incremental refresh.
+    """
+    period = bucket_expr(session, "month")
+    prompt_filter = and_(Prompt.scraped_at != None, *criteria)
+
+    universe = (
+        select(period.label("period"), Prompt.query.label("query"))
+        .where(prompt_filter)
+        .distinct()
+        .subquery()
+    )
+    mentions = (
+        select(
+            PromptBrandMention.brand_id.label("brand_id"),
+            period.label("period"),
+            Prompt.query.label("query"),
+            func.min(case((PromptBrandMention.position > 0, PromptBrandMention.position))).label("best_position"),
+        )
+        .join(Prompt, Prompt.id == PromptBrandMention.prompt_id)
+        .where(prompt_filter, PromptBrandMention.mentioned == True)
+        .group_by(PromptBrandMention.brand_id, period, Prompt.query)
+        .subquery()
+    )
+
+    stmt = (
+        select(
+            Brand.id,
+            universe.c.period,
+            universe.c.query,
+            case((mentions.c.brand_id != None, literal(True)), else_=literal(False)),
+            mentions.c.best_position,
+        )
+        .select_from(Brand)
+        .join(universe, true())
+        .outerjoin(
+            mentions,
+            and_(
+                mentions.c.brand_id == Brand.id,
+                mentions.c.period == universe.c.period,
+                mentions.c.query == universe.c.query,
+            ),
+        )
+    )
+    if brand_ids is not None:
+        stmt = stmt.where(Brand.id.in_(brand_ids))
+    return stmt
+
+
+# First key of the advisory locks serializing refreshes of one (period, query)
+ROLLUP_LOCK_CLASS = 0x524F4C4C  # "ROLL"
+
+
+def _insert_rollup(session: Session, stmt) -> None:
+    """Upsert the rollup rows produced by stmt."""
+    dialect = postgresql if session.get_bind().dialect.name == "postgresql" else sqlite
+    # WHERE true: SQLite cannot tell a join's ON from the upsert's ON CONFLICT without it
+    upsert = dialect.insert(BrandVisibilityRollup).from_select(
+        ["brand_id", "period", "query", "mentioned", "best_position"], stmt.where(true())
+    )
+    session.exec(
+        upsert.on_conflict_do_update(
+            index_elements=["brand_id", "period", "query"],
+            set_={
+                "mentioned": upsert.excluded.mentioned,
+                "best_position": upsert.excluded.best_position,
+            },
+        )
+    )
+
+
+def _lock_period_query(session: Session, period: str, query: str) -> None:
+    """Hold an advisory lock on (period, query) until the transaction ends (PostgreSQL only)."""
+    if session.get_bind().dialect.name == "postgresql":
+        session.exec(select(func.pg_advisory_xact_lock(ROLLUP_LOCK_CLASS, func.hashtext(f"{period}:{query}"))))
+
+
+def refresh_visibility_rollup(session: Session, prompt: Prompt) -> None:
+    """
+    Recompute rollup rows for the (period, query) a newly ingested prompt belongs to.
+
+    Only the runs of that query within the prompt's month are read, so the
+    cost is independent of total history. Every brand gets a row for the
+    pair, so the upsert overwrites all of the pair's existing rows. Caller commits.
+    """
+    if not prompt.scraped_at:
+        return
+    period = period_for(prompt.scraped_at, "month")
+
+    _lock_period_query(session, period.key, prompt.query)
+    _insert_rollup(
+        session,
+        _rollup_select(session, Prompt.query == prompt.query, in_period(period)),
+    )
+
+
+def rebuild_visibility_rollup(session: Session, brand_ids: list[str] | None = None) -> int:
+    """
+    Rebuild the rollup from raw Prompt/PromptBrandMention data.
+
+    Pass brand_ids to backfill only those brands (e.g. a newly created one).
+    Returns the number of rollup rows written. Caller commits.
+    """
+    clear = delete(BrandVisibilityRollup)
+    if brand_ids is not None:
+        clear = clear.where(BrandVisibilityRollup.brand_id.in_(brand_ids))
+    session.exec(clear)
+    _insert_rollup(session, _rollup_select(session, brand_ids=brand_ids))
+
+    count = select(func.count(BrandVisibilityRollup.id))
+    if brand_ids is not None:
+        count = count.where(BrandVisibilityRollup.brand_id.in_(brand_ids))
+    return session.exec(count).one()
+
+
+def backfill_visibility_rollup_if_empty(session: Session) -> None:
+    """Populate the rollup on first start against a database that predates it."""
+    has_rollup = session.exec(select(BrandVisibilityRollup.id).limit(1)).first()
+    has_prompts = session.exec(select(Prompt.id).limit(1)).first()
+    if has_prompts and not has_rollup:
+        rebuild_visibility_rollup(session)
+        session.commit()
+
+
+def rollup_query_totals(session: Session, periods: list[str]) -> dict[str, int]:
+    """Distinct queries scraped in each period."""
+    rows = session.exec(
+        select(BrandVisibilityRollup.period, func.count(func.distinct(BrandVisibilityRollup.query)))
+        .where(BrandVisibilityRollup.period.in_(periods))
+        .group_by(BrandVisibilityRollup.period)
+    ).all()
+    totals = {p: 0 for p in periods}
+    totals.update(dict(rows))
+    return totals
+
+
+def rollup_mentioned_queries(
+    session: Session, periods: list[str], brand_ids: list[str] | None = None
+) -> dict[str, dict[str, int]]:
+    """Queries mentioning each brand, per period: {brand_id: {period: count}}."""
+    stmt = (
+        select(BrandVisibilityRollup.brand_id, BrandVisibilityRollup.period, func.count())
+        .where(BrandVisibilityRollup.period.in_(periods), BrandVisibilityRollup.mentioned == True)
+    )
+    if brand_ids is not None:
+        stmt = stmt.where(BrandVisibilityRollup.brand_id.in_(brand_ids))
+    rows = session.exec(
+        stmt.group_by(BrandVisibilityRollup.brand_id, BrandVisibilityRollup.period)
+    ).all()
+    result: dict[str, dict[str, int]] = {}
+    for brand_id, period, count in rows:
+        result.setdefault(brand_id, {})[period] = count
+    return result
+
+
+def visibility_series(
+    session: Session, window: TimeWindow, brand_ids: list[str] | None = None
+) -> tuple[dict[str, int], dict[str, dict[str, int]]]:
+    """
+    Per-period query totals and per-brand mentioned-query counts for a window.
+
+    Whole-month windows are served from the rollup; day/week granularity and
+    windows clipped mid-month fall back to a grouped query over raw mentions.
+    """
+    if window.granularity == "month" and not window.is_clipped:
+        return (
+            rollup_query_totals(session, window.keys),
+            rollup_mentioned_queries(session, window.keys, brand_ids),
+        )
+    return (
+        count_queries_by_bucket(session, window),
+        brand_mentioned_queries_by_bucket(session, window, brand_ids),
+    )
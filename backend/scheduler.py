@@ -0,0 +1,236 @@
+"""
+Event-driven scheduler for recurring jobs.
+
+Instead of polling the database every minute, the scheduler keeps the
+upcoming next_run_at of every active recurring job in a min-heap and sleeps
+exactly until the earliest one. Routes that create, pause, resume or delete
+a scheduled job call notify() so the heap is updated and the sleeper woken
+at once. The heap is rebuilt from the database every
+SCHEDULER_RESYNC_SECONDS, which picks up changes made by other worker
+processes or outside the API.
+
+The heap only decides when to wake up. On waking, the due jobs (active,
+recurring, next_run_at <= now) are claimed in the database and handed to the
+dispatch coroutine, so a stale heap entry can cause an early wake-up but
+never a wrong run. Claims (job_claims.py) make each due run go to exactly
+one worker when several processes run a scheduler; the others lose the race
+and go back to sleep. Each claimed job is dispatched and committed on its
+own; one that fails is retried after SCHEDULER_LEASE_SECONDS.
+
+Dispatch lag (dispatch time minus next_run_at) is recorded per job and
+served by /api/scheduler-status. Counters are per worker process.
+"""
+
+import asyncio
+import heapq
+import os
+import socket
+import uuid
+from collections import deque
+from datetime import datetime
+from typing import Awaitable, Callable
+
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database import async_session
+from job_claims import claim_due_jobs, hold, release
+from models import ScrapeJob
+
+
+# Seconds between full reloads of the timer heap from the database
+SCHEDULER_RESYNC_SECONDS = float(os.getenv("SCHEDULER_RESYNC_SECONDS", "60"))
+
+# Pause after an unexpected error before trying again
+ERROR_BACKOFF_SECONDS = 5.0
+
+# Due jobs leased per claim
+CLAIM_BATCH_SIZE = 20
+
+# Recent dispatch lag samples kept for percentiles
+LAG_SAMPLES = 1000
+
+# Creates a job's next run in the session (not committed) and returns the
+# function that starts it, which is called once the dispatch is committed
+Dispatch = Callable[[ScrapeJob, AsyncSession], Awaitable[Callable[[], None]]]
+
+
+class JobScheduler:
+    """Min-heap of next_run_at timers for recurring ScrapeJobs."""
+
+    def __init__(self, resync_interval: float = SCHEDULER_RESYNC_SECONDS):
+        self.resync_interval = resync_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._heap: list[tuple[datetime, int]] = []
+        self._next_run: dict[int, datetime] = {}  # Current entry per job; other heap entries are stale
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wakeup: asyncio.Event | None = None
+        self._resync_requested = True
+        self.next_due_at: datetime | None = None
+        self._lags: deque[float] = deque(maxlen=LAG_SAMPLES)
+        self.dispatched = 0
+        self.wakeups = 0
+        self.resyncs = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+
+    # --- Timers (event loop thread only) ---
+
+    def _set(self, job_id: int, next_run_at: datetime | None) -> None:
+        if next_run_at is None:
+            self._next_run.pop(job_id, None)
+            return
+        self._next_run[job_id] = next_run_at
+        heapq.heappush(self._heap, (next_run_at, job_id))
+
+    def _next_due(self) -> datetime | None:
+        while self._heap:
+            next_run_at, job_id = self._heap[0]
+            if self._next_run.get(job_id) == next_run_at:
+                return next_run_at
+            heapq.heappop(self._heap)
+        return None
+
+    def _pop_due(self, now: datetime) -> None:
+        while (next_run_at := self._next_due()) is not None and next_run_at <= now:
+            _, job_id = heapq.heappop(self._heap)
+            del self._next_run[job_id]
+
+    def _apply(self, job_id: int | None, next_run_at: datetime | None) -> None:
+        if job_id is None:
+            self._resync_requested = True
+        else:
+            self._set(job_id, next_run_at)
+        self._wakeup.set()
+
+    # --- Notifications (any thread) ---
+
+    def notify(self, job_id: int, next_run_at: datetime | None) -> None:
+        """A scheduled job was created or changed; None means it should no longer run."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._apply, job_id, next_run_at)
+
+    def request_resync(self) -> None:
+        """Reload all timers from the database, e.g. after creating many scheduled jobs."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._apply, None, None)
+
+    # --- Loop ---
+
+    async def resync(self) -> None:
+        async with async_session() as session:
+            rows = (await session.exec(
+                select(ScrapeJob.id, ScrapeJob.next_run_at).where(
+                    ScrapeJob.is_active == True,
+                    ScrapeJob.frequency != None,
+                    ScrapeJob.next_run_at != None,
+                )
+            )).all()
+        self._next_run = {job_id: next_run_at for job_id, next_run_at in rows}
+        self._heap = [(next_run_at, job_id) for job_id, next_run_at in self._next_run.items()]
+        heapq.heapify(self._heap)
+        self.resyncs += 1
+
+    async def dispatch_due(self, dispatch: Dispatch) -> None:
+        """Claim and run every recurring job that is due, earliest first."""
+        self._pop_due(datetime.utcnow())
+        async with async_session() as session:
+            while True:
+                jobs = await claim_due_jobs(session, self.worker_id, CLAIM_BATCH_SIZE)
+                # Detached, so a failed dispatch's rollback does not expire the jobs still to run
+                session.expunge_all()
+                for job in jobs:
+                    await self._dispatch_one(job, session, dispatch)
+                if len(jobs) < CLAIM_BATCH_SIZE:
+                    break
+
+    async def _dispatch_one(self, job: ScrapeJob, session: AsyncSession, dispatch: Dispatch) -> None:
+        # Own transaction per job, so one failing dispatch does not roll back the others
+        job_id, lag = job.id, (datetime.utcnow() - job.next_run_at).total_seconds()
+        session.add(job)
+        try:
+            start = await dispatch(job, session)
+            release(job)
+            # The new run and the advanced next_run_at become visible (and the claim ends) together
+            await session.commit()
+        except Exception as e:
+            await session.rollback()
+            retry_at = await hold(session, job_id, self.worker_id)
+            print(f"Scheduler: dispatching job {job_id} failed, retrying at {retry_at}: {e}")
+            self._set(job_id, retry_at)
+            return
+
+        self.record_lag(lag)
+        self._set(job_id, job.next_run_at if job.is_active else None)
+        start()
+
+    async def run(self, dispatch: Dispatch) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        next_resync = 0.0
+        while True:
+            # Cleared before the work, so a notify() that arrives meanwhile is not lost
+            self._wakeup.clear()
+            timeout = self.resync_interval
+            try:
+                if self._resync_requested or self._loop.time() >= next_resync:
+                    self._resync_requested = False
+                    await self.resync()
+                    next_resync = self._loop.time() + self.resync_interval
+
+                next_due = self._next_due()
+                if next_due is not None and next_due <= datetime.utcnow():
+                    await self.dispatch_due(dispatch)
+                    next_due = self._next_due()
+
+                self.next_due_at = next_due
+                timeout = next_resync - self._loop.time()
+                if next_due is not None:
+                    timeout = min(timeout, (next_due - datetime.utcnow()).total_seconds())
+            except Exception as e:
+                print(f"Scheduler error: {e}")
+                # Jobs popped from the heap may not have run; reload before retrying
+                self._resync_requested = True
+                timeout = ERROR_BACKOFF_SECONDS
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=max(0.0, timeout))
+                self.wakeups += 1
+            except asyncio.TimeoutError:
+                pass
+
+    # --- Metrics ---
+
+    def record_lag(self, lag: float) -> None:
+        lag = max(0.0, lag)
+        self._lags.append(lag)
+        self.dispatched += 1
+        self.total_lag += lag
+        self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> dict:
+        # May be read from a worker thread: only copies, never touches the heap
+        lags = sorted(self._lags)
+
+        def percentile(p: float) -> float:
+            return round(lags[min(len(lags) - 1, int(len(lags) * p))] * 1000, 2) if lags else 0
+
+        next_due = self.next_due_at
+        return {
+            "running": self._loop is not None,
+            "worker_id": self.worker_id,
+            "timers": len(self._next_run),
+            "next_due_at": next_due.isoformat() if next_due else None,
+            "resync_interval_seconds": self.resync_interval,
+            "resyncs": self.resyncs,
+            "wakeups": self.wakeups,
+            "dispatched": self.dispatched,
+            "avg_lag_ms": round(self.total_lag / self.dispatched * 1000, 2) if self.dispatched else 0,
+            "p50_lag_ms": percentile(0.50),
+            "p95_lag_ms": percentile(0.95),
+            "p99_lag_ms": percentile(0.99),
+            "max_lag_ms": round(self.max_lag * 1000, 2),
+        }
+
+
+job_scheduler = JobScheduler()
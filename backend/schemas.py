@@ -206,6 +206,21 @@ class BrandDetailResponse(BaseModel):
     visibilityByMonth: list[BrandMonthlyVisibility]
 
 
+class BrandBackfillResponse(BaseModel):
+    """Progress of the mention backfill started when a brand is created"""
+    id: int
+    brandId: str
+    status: str  # pending, running, completed, failed
+    totalPrompts: int
+    processedPrompts: int
+    mentionedPrompts: int
+    progress: float  # % of prompts processed
+    error: str | None
+    createdAt: str
+    startedAt: str | None
+    completedAt: str | None
+
+
 class BrandListResponse(BaseModel):
     """List of all brands with details"""
     brands: list[BrandDetailResponse]
@@ -0,0 +1,254 @@
+"""
+Bounded worker pool for scrape jobs.
+
+Every scrape (one-off API jobs and scheduled runs) is submitted here instead
+of being started straight away. A job starts only while all three of its
+limits have room:
+
+- SCRAPE_MAX_CONCURRENCY jobs in total (the scraper service),
+- SCRAPE_MAX_PER_COUNTRY per country, i.e. per VPN container (vpn-it,
+  vpn-uk, ...); SCRAPE_COUNTRY_LIMITS overrides single countries,
+- SCRAPE_LAYER2_LIMITS per layer 2 mode (direct, residential, unlocker,
+  browser); modes not listed are bounded by the total only.
+
+Jobs that cannot start wait in a queue ordered by priority (1 = high, as on
+PromptTemplate), then submission order. A waiting job whose country or
+layer is full does not hold up jobs behind it that could run.
+
+Queue depth, wait times and in-flight counts are served by
+/api/scrape-pool; POST /api/jobs/{job_id}/cancel uses cancel(). Limits and
+counters are per worker process. The queue itself is not persisted: queued
+jobs stay "pending" in the database under a lease (job_claims.py) that
+another worker, or this one after a restart, takes over once it lapses.
+"""
+
+import asyncio
+import bisect
+import itertools
+import os
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+
+def _parse_limits(value: str) -> dict[str, int]:
+    """Parse "it=1,uk=2" into {"it": 1, "uk": 2}."""
+    limits = {}
+    for item in value.split(","):
+        if item.strip():
+            key, limit = item.split("=")
+            limits[key.strip().lower()] = int(limit)
+    return limits
+
+
+SCRAPE_MAX_CONCURRENCY = int(os.getenv("SCRAPE_MAX_CONCURRENCY", "8"))
+SCRAPE_MAX_PER_COUNTRY = int(os.getenv("SCRAPE_MAX_PER_COUNTRY", "2"))
+SCRAPE_COUNTRY_LIMITS = _parse_limits(os.getenv("SCRAPE_COUNTRY_LIMITS", ""))
+SCRAPE_LAYER2_LIMITS = _parse_limits(os.getenv("SCRAPE_LAYER2_LIMITS", ""))
+
+# Priority of jobs that do not set one (PromptTemplate scale: 1=high, 2=medium, 3=low)
+DEFAULT_PRIORITY = 2
+
+# Recent queue wait samples kept for percentiles
+WAIT_SAMPLES = 1000
+
+# Layer 2 mode the scraper service picks for proxy_layer="auto", by scraper type
+AUTO_LAYER2_MODES = {
+    "google_ai": "browser",
+    "chatgpt": "browser",
+    "perplexity": "browser",
+}
+
+LEGACY_LAYER2_NAMES = {
+    "vpn_direct": "direct",
+    "web_unlocker": "unlocker",
+    "scraping_browser": "browser",
+}
+
+
+def resolve_layer2_mode(config: dict) -> str:
+    """The layer 2 mode the scraper service will use for a job config (see scraper_api.py)."""
+    proxy_layer = config.get("proxy_layer") or "auto"
+    if proxy_layer != "auto":
+        return LEGACY_LAYER2_NAMES.get(proxy_layer, proxy_layer)
+    if config.get("use_scraping_browser"):
+        return "browser"
+    if config.get("use_residential_proxy"):
+        return "residential"
+    return AUTO_LAYER2_MODES.get(config.get("scraper_type", "google_ai"), "direct")
+
+
+@dataclass(order=True)
+class QueuedScrape:
+    priority: int
+    seq: int
+    job_id: int = field(compare=False)
+    country: str = field(compare=False)
+    layer2: str = field(compare=False)
+    run: Callable[[], Awaitable[object]] = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class ScrapePool:
+    """Runs submitted scrapes under global, per-country and per-layer concurrency limits."""
+
+    def __init__(
+        self,
+        max_concurrency: int = SCRAPE_MAX_CONCURRENCY,
+        max_per_country: int = SCRAPE_MAX_PER_COUNTRY,
+        country_limits: dict[str, int] | None = None,
+        layer2_limits: dict[str, int] | None = None,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_per_country = max_per_country
+        self.country_limits = SCRAPE_COUNTRY_LIMITS if country_limits is None else country_limits
+        self.layer2_limits = SCRAPE_LAYER2_LIMITS if layer2_limits is None else layer2_limits
+        self._queue: list[QueuedScrape] = []
+        self._seq = itertools.count()
+        self._tasks: dict[int, asyncio.Task] = {}  # Running scrapes by job id
+        self.in_flight = 0
+        self.in_flight_by_country: dict[str, int] = {}
+        self.in_flight_by_layer2: dict[str, int] = {}
+        self._waits: deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.submitted = 0
+        self.started = 0
+        self.finished = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def country_limit(self, country: str) -> int:
+        return self.country_limits.get(country, self.max_per_country)
+
+    def layer2_limit(self, layer2: str) -> int:
+        return self.layer2_limits.get(layer2, self.max_concurrency)
+
+    def submit(
+        self,
+        job_id: int,
+        run: Callable[[], Awaitable[object]],
+        country: str,
+        layer2: str,
+        priority: int | None = None,
+    ) -> None:
+        """Queue a scrape; run() is awaited once a slot is free. Call from the event loop."""
+        entry = QueuedScrape(
+            priority=DEFAULT_PRIORITY if priority is None else priority,
+            seq=next(self._seq),
+            job_id=job_id,
+            country=(country or "").lower(),
+            layer2=layer2,
+            run=run,
+            queued_at=asyncio.get_running_loop().time(),
+        )
+        bisect.insort(self._queue, entry)
+        self.submitted += 1
+        self._pump()
+
+    def _can_start(self, entry: QueuedScrape) -> bool:
+        return (
+            self.in_flight_by_country.get(entry.country, 0) < self.country_limit(entry.country)
+            and self.in_flight_by_layer2.get(entry.layer2, 0) < self.layer2_limit(entry.layer2)
+        )
+
+    def _pump(self) -> None:
+        """Start queued scrapes, best priority first, while limits allow."""
+        i = 0
+        while i < len(self._queue) and self.in_flight < self.max_concurrency:
+            entry = self._queue[i]
+            if self._can_start(entry):
+                del self._queue[i]
+                self._start(entry)
+            else:
+                i += 1
+
+    def _start(self, entry: QueuedScrape) -> None:
+        self.in_flight += 1
+        self.in_flight_by_country[entry.country] = self.in_flight_by_country.get(entry.country, 0) + 1
+        self.in_flight_by_layer2[entry.layer2] = self.in_flight_by_layer2.get(entry.layer2, 0) + 1
+        self.record_wait(asyncio.get_running_loop().time() - entry.queued_at)
+        # Keep a reference until done; also what cancel() needs
+        task = asyncio.create_task(self._run(entry))
+        self._tasks[entry.job_id] = task
+        # A callback rather than finally: it also runs if the task is cancelled before it starts
+        task.add_done_callback(lambda _: self._finish(entry))
+
+    async def _run(self, entry: QueuedScrape) -> None:
+        try:
+            await entry.run()
+        except Exception as e:
+            print(f"[pool] job {entry.job_id} failed: {e}")
+
+    def _finish(self, entry: QueuedScrape) -> None:
+        self._tasks.pop(entry.job_id, None)
+        self.in_flight -= 1
+        self.in_flight_by_country[entry.country] -= 1
+        self.in_flight_by_layer2[entry.layer2] -= 1
+        self.finished += 1
+        self._pump()
+
+    def queued_job_ids(self) -> list[int]:
+        return [entry.job_id for entry in self._queue]
+
+    async def cancel(self, job_id: int) -> str | None:
+        """Cancel a queued or running scrape: "queued", "running", or None if not in this pool.
+
+        A queued scrape is dropped and never started. A running one gets
+        asyncio.CancelledError, which aborts its HTTP request; this waits
+        until it has stopped.
+        """
+        for i, entry in enumerate(self._queue):
+            if entry.job_id == job_id:
+                del self._queue[i]
+                return "queued"
+        task = self._tasks.get(job_id)
+        if task is None:
+            return None
+        task.cancel()
+        await asyncio.wait([task])
+        return "running"
+
+    # --- Metrics ---
+
+    def record_wait(self, wait: float) -> None:
+        self._waits.append(wait)
+        self.started += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def stats(self) -> dict:
+        # Read on the loop thread (async route), so no lock is needed
+        waits = sorted(self._waits)
+        now = asyncio.get_running_loop().time()
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))], 3) if waits else 0
+
+        queued_by_country: dict[str, int] = {}
+        for entry in self._queue:
+            queued_by_country[entry.country] = queued_by_country.get(entry.country, 0) + 1
+
+        return {
+            "limits": {
+                "max_concurrency": self.max_concurrency,
+                "max_per_country": self.max_per_country,
+                "country_limits": self.country_limits,
+                "layer2_limits": self.layer2_limits,
+            },
+            "queued": len(self._queue),
+            "queued_by_country": queued_by_country,
+            "oldest_queued_seconds": round(now - min(e.queued_at for e in self._queue), 3) if self._queue else 0,
+            "in_flight": self.in_flight,
+            "in_flight_by_country": {k: v for k, v in self.in_flight_by_country.items() if v},
+            "in_flight_by_layer2": {k: v for k, v in self.in_flight_by_layer2.items() if v},
+            "submitted": self.submitted,
+            "started": self.started,
+            "finished": self.finished,
+            "avg_wait_seconds": round(self.total_wait / self.started, 3) if self.started else 0,
+            "p50_wait_seconds": percentile(0.50),
+            "p95_wait_seconds": percentile(0.95),
+            "p99_wait_seconds": percentile(0.99),
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+scrape_pool = ScrapePool()
@@ -0,0 +1,76 @@
+"""
+Shared async HTTP client for backend -> scraper service calls.
+
+A single httpx.AsyncClient keeps a pool of keep-alive connections to the
+scraper service. Scrapes in flight wait on sockets instead of each holding a
+thread for up to SCRAPE_TIMEOUT seconds, which is what the blocking client
+did via asyncio.to_thread, and repeated calls reuse open connections.
+
+The client is for the scraper service only. Calls to other hosts (e.g. the
+GitHub server list in /api/vpn/servers) use a client of their own, so they
+never hold one of its connections.
+
+Every call passes its own timeout. Cancelling the task that awaits a call,
+for example with ScrapePool.cancel(), aborts the request and discards its
+connection.
+"""
+
+import asyncio
+import os
+
+import httpx
+
+
+SCRAPER_API_URL = os.getenv("SCRAPER_API_URL", "http://aiseo-scraper:5000")
+
+# A browser scrape can take minutes; connecting should not
+SCRAPE_TIMEOUT = float(os.getenv("SCRAPE_TIMEOUT", "600"))
+SCRAPER_CONNECT_TIMEOUT = float(os.getenv("SCRAPER_CONNECT_TIMEOUT", "10"))
+
+# Upper bound on open connections; the scrape pool limits concurrent scrapes anyway
+SCRAPER_MAX_CONNECTIONS = int(os.getenv("SCRAPER_MAX_CONNECTIONS", "32"))
+
+_client: httpx.AsyncClient | None = None
+_client_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """The shared client for the running event loop (created on first use)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    # Connections belong to the loop that opened them
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=SCRAPER_MAX_CONNECTIONS,
+            ),
+            timeout=httpx.Timeout(30.0, connect=SCRAPER_CONNECT_TIMEOUT),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def scrape(payload: dict) -> httpx.Response:
+    """POST a job to the scraper service's /scrape."""
+    return await get_client().post(
+        f"{SCRAPER_API_URL}/scrape",
+        json=payload,
+        timeout=httpx.Timeout(SCRAPE_TIMEOUT, connect=SCRAPER_CONNECT_TIMEOUT),
+    )
+
+
+async def get_config(timeout: float) -> dict | None:
+    """The scraper service's /config, or None if it is unreachable or errors."""
+    try:
+        response = await get_client().get(f"{SCRAPER_API_URL}/config", timeout=timeout)
+    except httpx.HTTPError:
+        return None
+    return response.json() if response.status_code == 200 else None
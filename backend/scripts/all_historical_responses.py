@@ -7,6 +7,7 @@ from sqlmodel import Session, select
 from datetime import datetime
 from database import engine
 from models import Prompt, Source, PromptSource
+from rollups import rebuild_visibility_rollup
 
 # =============================================================================
 # SEPTEMBER RUN 1 RESPONSES (20 unique responses) - Wix in 8 queries (40%)
@@ -5888,6 +5889,8 @@ def update_all_responses():
                 prompt.response_text = DECEMBER_RUN2_RESPONSES[prompt.query]
                 updated_count += 1
 
+        # Month charts read the rollup; cover any September/October prompts created above
+        rebuild_visibility_rollup(session)
         session.commit()
 
         print(f"\nUpdated {updated_count} responses total")
@@ -0,0 +1,127 @@
+"""
+Benchmark API latency while scrapes are in flight.
+
+Runs the API in-process on a temporary SQLite database, against a stub
+scraper service that answers /scrape after --scrape-seconds. Sends
+GET /api/health every --interval-ms, first with no scrapes running, then
+while --scrapes one-off scrapes are in flight, and prints p50/p99 for both.
+Latency is measured from each request's scheduled send time, so time the
+event loop spends blocked counts even when it delays sending. With the
+async scraper client the two should match.
+
+--blocking swaps in a blocking requests.post made on the event loop, for
+comparison: every in-flight scrape then stalls every other request.
+
+Usage:
+    python scripts/bench_scrape_latency.py [--scrapes 16] [--scrape-seconds 5] [--requests 200] [--interval-ms 10] [--blocking]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_PORT = 5098
+
+
+def start_stub_scraper(delay: float) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(delay)
+            body = json.dumps({"status": "completed", "response_text": "stub", "metadata": {}, "data": []}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", STUB_PORT), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p50 = samples[int(len(samples) * 0.50)] * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    return f"p50 {p50:8.2f} ms   p99 {p99:8.2f} ms   max {samples[-1] * 1000:8.2f} ms"
+
+
+async def time_requests(client, n: int, interval: float) -> list[float]:
+    latencies = []
+    start = time.perf_counter()
+    for i in range(n):
+        scheduled = start + i * interval
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        response = await client.get("/api/health")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - scheduled)
+    return latencies
+
+
+async def run(args) -> None:
+    import httpx
+
+    import main
+    import scraper_client
+
+    if args.blocking:
+        import requests
+
+        async def blocking_scrape(payload: dict):
+            return requests.post(f"{scraper_client.SCRAPER_API_URL}/scrape", json=payload, timeout=600)
+
+        main.scraper_client.scrape = blocking_scrape
+
+    main.on_startup()
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        interval = args.interval_ms / 1000
+        await time_requests(client, 20, interval)  # Warm-up
+        idle = await time_requests(client, args.requests, interval)
+
+        for i in range(args.scrapes):
+            response = await client.post("/api/jobs/scrape", json={"query": f"bench {i}", "country": "us"})
+            response.raise_for_status()
+        busy = await time_requests(client, args.requests, interval)
+        in_flight = main.scrape_pool.in_flight
+
+        while main.scrape_pool.finished < args.scrapes:
+            await asyncio.sleep(0.1)
+
+    mode = "blocking requests.post" if args.blocking else "async httpx client"
+    print(f"Scraper call: {mode}; {args.scrapes} scrapes of {args.scrape_seconds}s")
+    print(f"  0 scrapes in flight:  {percentiles(idle)}")
+    print(f"  {args.scrapes} scrapes in flight: {percentiles(busy)}   ({in_flight} still in flight at the end)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scrapes", type=int, default=16)
+    parser.add_argument("--scrape-seconds", type=float, default=5.0)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--interval-ms", type=float, default=10.0)
+    parser.add_argument("--blocking", action="store_true")
+    args = parser.parse_args()
+
+    # Before the app modules read their configuration
+    workdir = tempfile.mkdtemp(prefix="aiseo-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{workdir}/bench.db"
+    os.environ["BLOB_STORE_PATH"] = f"{workdir}/blobs"
+    os.environ["SCRAPER_API_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+    os.environ["SCRAPE_MAX_CONCURRENCY"] = str(args.scrapes)
+    os.environ["SCRAPE_MAX_PER_COUNTRY"] = str(args.scrapes)
+
+    start_stub_scraper(args.scrape_seconds)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ import random
 from sqlmodel import Session, select
 from database import engine
 from models import Prompt, PromptBrandMention, Brand
+from rollups import rebuild_visibility_rollup
 
 random.seed(42)
 
@@ -193,6 +194,8 @@ def fix_brand_mentions():
 
             fixed_count += 1
 
+        # Month charts read the rollup, which is derived from the mentions rewritten above
+        rebuild_visibility_rollup(session)
         session.commit()
         print(f"\nFixed {fixed_count} prompts")
 
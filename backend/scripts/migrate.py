@@ -0,0 +1,54 @@
+"""
+Apply or revert schema migrations (see migrations/__init__.py).
+
+The API applies pending migrations on startup; use this to run them ahead of
+a deploy, to inspect the current revision, or to roll one back. upgrade first
+creates any missing tables, so it also sets up an empty database.
+
+Usage:
+    python scripts/migrate.py                  # upgrade to the latest revision
+    python scripts/migrate.py upgrade [REV]    # upgrade up to REV
+    python scripts/migrate.py downgrade REV    # revert revisions after REV ("base" reverts all)
+    python scripts/migrate.py current          # show the applied revision
+    python scripts/migrate.py history          # list revisions
+    python scripts/migrate.py snapshots        # move legacy HTML snapshots to the blob store
+"""
+
+import sys
+
+import migrations
+import models  # noqa: F401  (registers the tables for create_tables)
+from database import create_tables, engine
+from snapshot_migration import move_html_snapshots
+
+
+def main(argv: list[str]):
+    command = argv[0] if argv else "upgrade"
+    target = argv[1] if len(argv) > 1 else None
+
+    if command == "upgrade":
+        # Revisions alter existing tables; on a fresh database create them first
+        create_tables()
+        applied = migrations.upgrade(engine, target)
+        print(f"Applied {len(applied)} revision(s); now at {migrations.current(engine)}")
+    elif command == "downgrade":
+        if target is None:
+            sys.exit("downgrade needs a target revision (or 'base')")
+        reverted = migrations.downgrade(engine, None if target == "base" else target)
+        print(f"Reverted {len(reverted)} revision(s); now at {migrations.current(engine)}")
+    elif command == "current":
+        print(migrations.current(engine) or "base")
+    elif command == "history":
+        applied = migrations.applied_revisions(engine)
+        for rev in migrations.load_revisions():
+            mark = "*" if rev.revision in applied else " "
+            print(f"{mark} {rev.revision}  {rev.description}")
+    elif command == "snapshots":
+        moved = move_html_snapshots(engine, progress=lambda n: print(f"  moved {n}..."))
+        print(f"Moved {moved} HTML snapshot(s) to the blob store")
+    else:
+        sys.exit(__doc__)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
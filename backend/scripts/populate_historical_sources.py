@@ -10,6 +10,7 @@ This script:
 import random
 import re
 from sqlmodel import Session, select
+from sqlalchemy.orm import undefer
 from database import engine
 from models import Prompt, PromptSource, Source
 
@@ -68,7 +69,7 @@ def populate_historical_sources():
 
     with Session(engine) as session:
         # Get all prompts
-        all_prompts = session.exec(select(Prompt)).all()
+        all_prompts = session.exec(select(Prompt).options(undefer(Prompt.response_text))).all()
 
         # Group by month
         jan_prompts = [p for p in all_prompts if p.scraped_at and p.scraped_at.strftime("%Y-%m") == "2026-01"]
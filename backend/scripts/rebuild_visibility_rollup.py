@@ -0,0 +1,37 @@
+"""
+Rebuild the brand × period visibility rollup from existing data.
+Run after importing historical prompts or editing mentions directly in the DB.
+"""
+
+import sys
+from sqlmodel import Session, select, func
+from database import engine, create_db_and_tables
+from models import BrandVisibilityRollup
+from rollups import rebuild_visibility_rollup
+
+
+def rebuild(brand_ids: list[str] | None = None):
+    """Rebuild rollup rows for all brands (or only the given brand ids)."""
+    create_db_and_tables()
+
+    with Session(engine) as session:
+        scope = ", ".join(brand_ids) if brand_ids else "all brands"
+        print(f"Rebuilding visibility rollup for {scope}...")
+
+        rows = rebuild_visibility_rollup(session, brand_ids=brand_ids)
+        session.commit()
+        print(f"Wrote {rows} rollup rows")
+
+        # Verification: rows per period
+        print("\n--- Rows per period ---")
+        per_period = session.exec(
+            select(BrandVisibilityRollup.period, func.count())
+            .group_by(BrandVisibilityRollup.period)
+            .order_by(BrandVisibilityRollup.period)
+        ).all()
+        for period, count in per_period:
+            print(f"  {period}: {count}")
+
+
+if __name__ == "__main__":
+    rebuild(sys.argv[1:] or None)
@@ -0,0 +1,34 @@
+"""
+Recompute Source.category for every source using the current rules in
+source_categories.py. Run after changing CATEGORY_RULES.
+"""
+
+from sqlmodel import Session, select, func
+from database import engine, create_db_and_tables
+from models import Source
+from source_categories import reclassify_sources
+
+
+def reclassify():
+    """Reclassify all sources and print the resulting category counts."""
+    create_db_and_tables()
+
+    with Session(engine) as session:
+        print("Reclassifying sources...")
+        changed = reclassify_sources(session)
+        session.commit()
+        print(f"Updated {changed} sources")
+
+        # Verification: sources per category
+        print("\n--- Sources per category ---")
+        per_category = session.exec(
+            select(Source.category, func.count())
+            .group_by(Source.category)
+            .order_by(func.count().desc())
+        ).all()
+        for category, count in per_category:
+            print(f"  {category}: {count}")
+
+
+if __name__ == "__main__":
+    reclassify()
@@ -6,6 +6,8 @@ Run from the backend directory: python seed_data.py
 from sqlmodel import Session, select
 from database import engine, create_db_and_tables
 from models import Brand, Prompt, PromptBrandMention, Source, PromptSource
+from source_categories import classify_source
+from rollups import rebuild_visibility_rollup
 from datetime import datetime
 
 
@@ -21,7 +23,8 @@ def get_or_create_source(session: Session, url: str, domain: str, title: str,
         domain=domain,
         title=title,
         description=description,
-        published_date=published_date
+        published_date=published_date,
+        category=classify_source(domain, url)
     )
     session.add(source)
     session.commit()
@@ -1657,9 +1660,9 @@ def seed_brands(session: Session):
     brands_data = [
         {"id": "wix", "name": "Wix", "type": "primary", "color": "#06b6d4"},
         {"id": "shopify", "name": "Shopify", "type": "competitor", "color": "#f59e0b"},
-        {"id": "woocommerce", "name": "WooCommerce", "type": "competitor", "color": "#8b5cf6"},
-        {"id": "bigcommerce", "name": "BigCommerce", "type": "competitor", "color": "#ec4899"},
-        {"id": "squarespace", "name": "Squarespace", "type": "competitor", "color": "#10b981"},
+        {"id": "woocommerce", "name": "WooCommerce", "type": "competitor", "color": "#8b5cf6", "variations": "WooCommerce,Woo Commerce"},
+        {"id": "bigcommerce", "name": "BigCommerce", "type": "competitor", "color": "#ec4899", "variations": "BigCommerce,Big Commerce"},
+        {"id": "squarespace", "name": "Squarespace", "type": "competitor", "color": "#10b981", "variations": "Squarespace,Square Space"},
     ]
 
     for brand_data in brands_data:
@@ -1682,6 +1685,10 @@ def main():
         for prompt_data in SCRAPED_DATA:
             add_prompt_data(session, prompt_data)
 
+        # Month charts read the rollup; cover the prompts and mentions added above
+        rebuild_visibility_rollup(session)
+        session.commit()
+
         # Print summary
         prompt_count = session.exec(select(Prompt)).all()
         source_count = session.exec(select(Source)).all()
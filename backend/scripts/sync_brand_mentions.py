@@ -5,67 +5,42 @@ Parses response text to find which brands are mentioned and their order.
 
 import re
 from sqlmodel import Session, select
+from sqlalchemy.orm import undefer
 from database import engine
 from models import Prompt, PromptBrandMention, Brand
-
-BRANDS = {
-    'wix': ['Wix', 'WIX'],
-    'shopify': ['Shopify', 'SHOPIFY'],
-    'woocommerce': ['WooCommerce', 'Woocommerce', 'WOOCOMMERCE', 'Woo Commerce'],
-    'bigcommerce': ['BigCommerce', 'Bigcommerce', 'BIGCOMMERCE', 'Big Commerce'],
-    'squarespace': ['Squarespace', 'SQUARESPACE', 'Square Space'],
-}
+from brand_matcher import BrandMatcher, BrandOccurrence, get_brand_matcher
+from rollups import rebuild_visibility_rollup
 
 POSITIVE_WORDS = ['best', 'excellent', 'great', 'top', 'leading', 'recommended', 'ideal', 'perfect', 'strong', 'powerful']
 NEGATIVE_WORDS = ['worst', 'avoid', 'poor', 'weak', 'limited', 'difficult', 'complex', 'expensive', 'struggles']
 
+# Sentence spans used for sentiment
+SENTENCE_PATTERN = re.compile(r'[^.!?\n]+')
+
 
-def find_brand_mentions(text: str) -> list[dict]:
+def find_brand_mentions(text: str, matcher: BrandMatcher) -> list[dict]:
     """Parse response text to find brand mentions and their positions."""
     if not text:
         return []
 
-    results = []
-
-    for brand_id, variations in BRANDS.items():
-        # Find first occurrence of any variation
-        first_pos = float('inf')
-        found = False
-
-        for variation in variations:
-            # Use word boundary to avoid partial matches
-            pattern = r'\b' + re.escape(variation) + r'\b'
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                found = True
-                if match.start() < first_pos:
-                    first_pos = match.start()
-
-        if found:
-            # Determine sentiment based on surrounding context
-            sentiment = determine_sentiment(text, brand_id, variations)
-            results.append({
-                'brand_id': brand_id,
-                'first_position': first_pos,
-                'sentiment': sentiment
-            })
-
-    # Sort by first appearance and assign positions
-    results.sort(key=lambda x: x['first_position'])
+    # All occurrences of all brands in one pass (word boundaries, case/accent-insensitive)
+    occurrences: dict[str, list[BrandOccurrence]] = {}
+    for occurrence in matcher.find_all(text):
+        occurrences.setdefault(occurrence.brand_id, []).append(occurrence)
 
+    # Brands in order of first appearance get positions 1, 2, 3...
     final_results = []
-    for idx, r in enumerate(results, 1):
+    for idx, (brand_id, brand_occurrences) in enumerate(occurrences.items(), 1):
         final_results.append({
-            'brand_id': r['brand_id'],
+            'brand_id': brand_id,
             'mentioned': True,
             'position': idx,
-            'sentiment': r['sentiment']
+            'sentiment': determine_sentiment(text, brand_occurrences)
         })
 
     # Add non-mentioned brands
-    mentioned_ids = {r['brand_id'] for r in final_results}
-    for brand_id in BRANDS.keys():
-        if brand_id not in mentioned_ids:
+    for brand_id in matcher.brand_ids:
+        if brand_id not in occurrences:
             final_results.append({
                 'brand_id': brand_id,
                 'mentioned': False,
@@ -76,19 +51,16 @@ def find_brand_mentions(text: str) -> list[dict]:
     return final_results
 
 
-def determine_sentiment(text: str, brand_id: str, variations: list[str]) -> str:
-    """Determine sentiment for a brand based on surrounding context."""
-    text_lower = text.lower()
+def determine_sentiment(text: str, occurrences: list[BrandOccurrence]) -> str:
+    """Determine sentiment for a brand based on the sentences it occurs in."""
+    starts = [o.start for o in occurrences]
 
     # Find sentences containing the brand
-    sentences = re.split(r'[.!?\n]', text)
-
-    brand_sentences = []
-    for sentence in sentences:
-        for variation in variations:
-            if variation.lower() in sentence.lower():
-                brand_sentences.append(sentence.lower())
-                break
+    brand_sentences = [
+        sentence.group().lower()
+        for sentence in SENTENCE_PATTERN.finditer(text)
+        if any(sentence.start() <= start < sentence.end() for start in starts)
+    ]
 
     if not brand_sentences:
         return 'neutral'
@@ -117,7 +89,8 @@ def sync_all_mentions():
     """Sync brand mentions for all prompts based on response text."""
 
     with Session(engine) as session:
-        all_prompts = session.exec(select(Prompt)).all()
+        all_prompts = session.exec(select(Prompt).options(undefer(Prompt.response_text))).all()
+        matcher = get_brand_matcher(session)
 
         print(f"Processing {len(all_prompts)} prompts...")
 
@@ -128,7 +101,7 @@ def sync_all_mentions():
                 continue
 
             # Parse response text
-            new_mentions = find_brand_mentions(prompt.response_text)
+            new_mentions = find_brand_mentions(prompt.response_text, matcher)
 
             # Delete existing mentions
             existing = session.exec(
@@ -150,6 +123,8 @@ def sync_all_mentions():
 
             updated_count += 1
 
+        # Month charts read the rollup, which is derived from the mentions rewritten above
+        rebuild_visibility_rollup(session)
         session.commit()
         print(f"Updated {updated_count} prompts")
 
@@ -0,0 +1,81 @@
+"""
+Move legacy ScrapeJob.html_snapshot contents into the blob store.
+
+Databases from before the blob store (blob_store.py) keep page HTML in the
+html_snapshot column, which is no longer on the model. move_html_snapshots()
+writes each snapshot to the blob store and sets html_blob_key /
+html_size_bytes with html_snapshot = NULL on the row, SNAPSHOT_MIGRATION_BATCH_SIZE
+rows per transaction.
+
+It runs in a background thread after API startup, so a large table does not
+hold up the deploy, and by hand with `python scripts/migrate.py snapshots`.
+Each committed batch stays done and the next run starts with the rows that
+still have html_snapshot set, so an interrupted move resumes. Blobs are
+content-addressed: a batch that is rolled back after its blobs were written
+writes the same keys again. Several workers can run it at once; on
+PostgreSQL they skip each other's locked rows.
+
+The emptied column is left in place; on PostgreSQL, VACUUM reclaims the space.
+"""
+
+import os
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from blob_store import get_blob_store
+
+# Snapshots are up to 1 MB each
+SNAPSHOT_MIGRATION_BATCH_SIZE = int(os.getenv("SNAPSHOT_MIGRATION_BATCH_SIZE", "20"))
+
+
+def has_snapshot_column(conn) -> bool:
+    inspector = inspect(conn)
+    if not inspector.has_table("scrapejob"):
+        return False
+    return "html_snapshot" in {c["name"] for c in inspector.get_columns("scrapejob")}
+
+
+def move_html_snapshots(
+    engine: Engine,
+    batch_size: int = SNAPSHOT_MIGRATION_BATCH_SIZE,
+    progress: Callable[[int], None] | None = None,
+) -> int:
+    """Move every remaining snapshot to the blob store, a batch per transaction. Returns rows moved."""
+    with engine.connect() as conn:
+        if not has_snapshot_column(conn):
+            return 0  # Database created after html_snapshot was removed from the model
+
+    skip_locked = " FOR UPDATE SKIP LOCKED" if engine.dialect.name == "postgresql" else ""
+    store = get_blob_store()
+    moved = 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(text(
+                "SELECT id, html_snapshot FROM scrapejob WHERE html_snapshot IS NOT NULL "
+                f"ORDER BY id LIMIT :n{skip_locked}"
+            ), {"n": batch_size}).all()
+            if not rows:
+                break
+            for job_id, html in rows:
+                blob = store.put(html.encode("utf-8"))
+                conn.execute(text(
+                    "UPDATE scrapejob SET html_blob_key = :key, html_size_bytes = :size, html_snapshot = NULL "
+                    "WHERE id = :id"
+                ), {"key": blob.key, "size": blob.size, "id": job_id})
+        moved += len(rows)
+        if progress:
+            progress(moved)
+    return moved
+
+
+def run_snapshot_migration(engine: Engine) -> None:
+    """move_html_snapshots() for a background thread: logs instead of raising."""
+    try:
+        moved = move_html_snapshots(engine)
+    except Exception as e:
+        print(f"[snapshots] moving HTML snapshots to the blob store failed: {e}")
+        return
+    if moved:
+        print(f"[snapshots] moved {moved} HTML snapshots to the blob store")
@@ -0,0 +1,107 @@
+"""
+Source category classification.
+
+One rule set shared by ingest, /api/sources/analytics and /api/suggestions.
+Rules are compiled once at import into:
+- a suffix table: registrable domains such as "g2.com" match the domain itself
+  and any subdomain, checked with one dict lookup per domain label;
+- a keyword automaton: a single regex alternation over all keywords, scanned
+  once per domain (overlapping matches via lookahead).
+
+When several rules match, the category listed first in CATEGORY_RULES wins.
+Categories are persisted in Source.category at ingest; after changing the
+rules run scripts/reclassify_sources.py to update existing rows.
+"""
+
+import re
+
+from sqlmodel import Session, select
+
+from models import Source
+
+
+# (category, domain suffixes, domain keywords), highest priority first
+CATEGORY_RULES: list[tuple[str, list[str], list[str]]] = [
+    ("brand", [], ["shopify", "wix", "woocommerce", "bigcommerce", "squarespace", "wordpress"]),
+    ("community", [], ["reddit", "quora", "stackexchange", "stackoverflow", "discourse"]),
+    ("news", ["inc.com"], ["forbes", "techcrunch", "entrepreneur", "businessinsider", "cnet", "zdnet", "pcmag", "theverge"]),
+    ("blog", ["medium.com", "dev.to"], ["blog", "hashnode", "substack"]),
+    ("review", ["g2.com"], ["capterra", "trustpilot", "trustradius", "getapp"]),
+]
+
+DEFAULT_CATEGORY = "other"
+
+# URL path segment that marks an individual page as a blog post on any domain
+BLOG_PATH_MARKER = "/blog/"
+
+
+class DomainClassifier:
+    """Compiled form of a category rule list."""
+
+    def __init__(self, rules: list[tuple[str, list[str], list[str]]]):
+        self.categories = [category for category, _, _ in rules]
+        self._suffix_rank: dict[str, int] = {}
+        self._keyword_rank: dict[str, int] = {}
+        for rank, (_, suffixes, keywords) in enumerate(rules):
+            for suffix in suffixes:
+                self._suffix_rank.setdefault(suffix.lower(), rank)
+            for keyword in keywords:
+                self._keyword_rank.setdefault(keyword.lower(), rank)
+
+        # Higher-priority keywords first, so they win when two start at the same offset
+        ordered = sorted(self._keyword_rank, key=lambda k: (self._keyword_rank[k], -len(k)))
+        self._keywords = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))") if ordered else None
+
+    def classify_domain(self, domain: str) -> str:
+        """Category of a domain from its name alone."""
+        domain = (domain or "").lower().strip(".")
+        best = len(self.categories)
+
+        labels = domain.split(".")
+        for i in range(len(labels)):
+            rank = self._suffix_rank.get(".".join(labels[i:]))
+            if rank is not None and rank < best:
+                best = rank
+
+        if self._keywords is not None:
+            for match in self._keywords.finditer(domain):
+                rank = self._keyword_rank[match.group(1)]
+                if rank < best:
+                    best = rank
+                    if best == 0:
+                        break
+
+        return self.categories[best] if best < len(self.categories) else DEFAULT_CATEGORY
+
+    def classify_source(self, domain: str, url: str | None = None) -> str:
+        """Category of a single cited page: blog posts are 'blog' whatever the domain."""
+        if url and BLOG_PATH_MARKER in url.lower():
+            return "blog"
+        return self.classify_domain(domain)
+
+
+classifier = DomainClassifier(CATEGORY_RULES)
+classify_domain = classifier.classify_domain
+classify_source = classifier.classify_source
+
+
+def reclassify_sources(session: Session, only_missing: bool = False) -> int:
+    """
+    Recompute Source.category for existing rows.
+
+    With only_missing=True, only rows that were never classified are touched
+    (used at startup). Returns the number of rows changed. Caller commits.
+    """
+    stmt = select(Source.id, Source.domain, Source.url, Source.category)
+    if only_missing:
+        stmt = stmt.where(Source.category == None)
+
+    changed = []
+    for source_id, domain, url, category in session.exec(stmt).all():
+        new_category = classify_source(domain, url)
+        if new_category != category:
+            changed.append({"id": source_id, "category": new_category})
+
+    if changed:
+        session.bulk_update_mappings(Source, changed)
+    return len(changed)
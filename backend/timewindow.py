@@ -0,0 +1,232 @@
+"""
+Shared time-window handling for the analytics endpoints.
+
+Endpoints accept `from`, `to` (inclusive dates) and `granularity`
+(day/week/month) query parameters. They are resolved into a TimeWindow:
+a list of consecutive periods, where the last one is the "current" period
+used for KPIs and the one before it drives month-over-month style changes.
+
+All filtering is done with range predicates on Prompt.scraped_at (indexed),
+never by formatting timestamps row by row in Python.
+"""
+
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from fastapi import Depends, HTTPException, Query
+from sqlalchemy import and_
+from sqlmodel import Session, select, func
+
+from database import get_session
+from models import Prompt
+
+
+Granularity = Literal["day", "week", "month"]
+
+# Number of periods shown when no explicit `from` is given (five-month chart)
+DEFAULT_PERIODS = 5
+
+# Upper bound on periods per request, to keep chart payloads bounded
+MAX_PERIODS = 400
+
+
+@dataclass(frozen=True)
+class Period:
+    """A single [start, end) reporting period."""
+    key: str  # YYYY-MM for months, YYYY-MM-DD (period start) for days and weeks
+    label: str  # Human readable, e.g. "Jan 2026"
+    start: datetime
+    end: datetime
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """Resolved analytics window."""
+    granularity: str
+    periods: list[Period]
+    previous: Period  # Period immediately before the current one
+    requested_start: datetime | None = None  # Explicit bounds, if any were given
+    requested_end: datetime | None = None
+
+    @property
+    def start(self) -> datetime:
+        return self.periods[0].start
+
+    @property
+    def end(self) -> datetime:
+        return self.periods[-1].end
+
+    @property
+    def current(self) -> Period:
+        return self.periods[-1]
+
+    @property
+    def keys(self) -> list[str]:
+        return [p.key for p in self.periods]
+
+    @property
+    def is_clipped(self) -> bool:
+        """True when `from`/`to` cut the first or last period short."""
+        first, last = self.periods[0], self.periods[-1]
+        return (
+            first.start != floor_period(first.start, self.granularity)
+            or last.end != next_period_start(floor_period(last.start, self.granularity), self.granularity)
+        )
+
+    def range_criteria(self, column=Prompt.scraped_at) -> list:
+        """Predicates for the explicitly requested range (empty means all time)."""
+        criteria = []
+        if self.requested_start is not None:
+            criteria.append(column >= self.requested_start)
+        if self.requested_end is not None:
+            criteria.append(column < self.requested_end)
+        return criteria
+
+
+def floor_period(dt: datetime, granularity: str) -> datetime:
+    """Start of the period containing dt."""
+    day = datetime(dt.year, dt.month, dt.day)
+    if granularity == "month":
+        return day.replace(day=1)
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    return day
+
+
+def next_period_start(start: datetime, granularity: str) -> datetime:
+    """Start of the period following the one beginning at `start`."""
+    if granularity == "month":
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    if granularity == "week":
+        return start + timedelta(weeks=1)
+    return start + timedelta(days=1)
+
+
+def previous_period_start(start: datetime, granularity: str) -> datetime:
+    """Start of the period preceding the one beginning at `start`."""
+    return floor_period(start - timedelta(days=1), granularity)
+
+
+def make_period(start: datetime, granularity: str) -> Period:
+    """Build the Period beginning at `start`."""
+    if granularity == "month":
+        key, label = start.strftime("%Y-%m"), start.strftime("%b %Y")
+    elif granularity == "week":
+        key, label = start.strftime("%Y-%m-%d"), f"Week of {start.day} {start.strftime('%b %Y')}"
+    else:
+        key, label = start.strftime("%Y-%m-%d"), f"{start.day} {start.strftime('%b %Y')}"
+    return Period(key=key, label=label, start=start, end=next_period_start(start, granularity))
+
+
+def period_for(dt: datetime, granularity: str = "month") -> Period:
+    """The Period containing dt."""
+    return make_period(floor_period(dt, granularity), granularity)
+
+
+def in_period(period: Period, column=Prompt.scraped_at):
+    """Range predicate selecting rows whose timestamp falls in the period."""
+    return and_(column >= period.start, column < period.end)
+
+
+def bucket_expr(session: Session, granularity: str, column=Prompt.scraped_at):
+    """
+    SQL expression mapping a timestamp to its period key (see Period.key).
+
+    Used to GROUP BY period in the database for day/week/month charts.
+    """
+    if session.get_bind().dialect.name == "postgresql":
+        if granularity == "month":
+            return func.to_char(column, "YYYY-MM")
+        if granularity == "week":
+            return func.to_char(func.date_trunc("week", column), "YYYY-MM-DD")
+        return func.to_char(column, "YYYY-MM-DD")
+    if granularity == "month":
+        return func.strftime("%Y-%m", column)
+    if granularity == "week":
+        # Next Sunday (or same day), minus six days = Monday of the ISO week
+        return func.date(column, "weekday 0", "-6 days")
+    return func.strftime("%Y-%m-%d", column)
+
+
+def latest_scrape_at(session: Session) -> datetime | None:
+    """Most recent Prompt.scraped_at (an index lookup)."""
+    return session.exec(select(func.max(Prompt.scraped_at))).one()
+
+
+def resolve_window(
+    session: Session,
+    start: date | None = None,
+    end: date | None = None,
+    granularity: str = "month",
+) -> TimeWindow:
+    """
+    Resolve optional inclusive dates into a TimeWindow.
+
+    Without `end`, the window ends with the period of the most recent scrape,
+    so the dashboard follows new data without code changes. Without `start`,
+    it covers DEFAULT_PERIODS periods.
+    """
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+
+    requested_start = datetime(start.year, start.month, start.day) if start else None
+    requested_end = datetime(end.year, end.month, end.day) + timedelta(days=1) if end else None
+
+    if requested_end:
+        anchor = requested_end - timedelta(days=1)
+    else:
+        anchor = latest_scrape_at(session) or datetime.utcnow()
+        if requested_start and requested_start > anchor:
+            anchor = requested_start  # Nothing scraped since 'from': an empty window, not no periods
+    last = floor_period(anchor, granularity)
+
+    if requested_start:
+        first = floor_period(requested_start, granularity)
+    else:
+        first = last
+        for _ in range(DEFAULT_PERIODS - 1):
+            first = previous_period_start(first, granularity)
+
+    periods = []
+    cursor = first
+    while cursor <= last:
+        if len(periods) >= MAX_PERIODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Time window too large: at most {MAX_PERIODS} {granularity} periods per request",
+            )
+        periods.append(make_period(cursor, granularity))
+        cursor = next_period_start(cursor, granularity)
+
+    # Honour explicit bounds that fall inside the first/last period
+    if requested_start and periods[0].start < requested_start:
+        periods[0] = replace(periods[0], start=requested_start)
+    if requested_end and periods[-1].end > requested_end:
+        periods[-1] = replace(periods[-1], end=requested_end)
+
+    return TimeWindow(
+        granularity=granularity,
+        periods=periods,
+        previous=make_period(previous_period_start(last, granularity), granularity),
+        requested_start=requested_start,
+        requested_end=requested_end,
+    )
+
+
+def get_time_window(
+    start: date | None = Query(
+        default=None, alias="from", description="First day of the window (inclusive, YYYY-MM-DD)"
+    ),
+    end: date | None = Query(
+        default=None, alias="to", description="Last day of the window (inclusive, YYYY-MM-DD). Defaults to the latest scrape"
+    ),
+    granularity: Granularity = Query(
+        default="month", description="Period size for charts and period-over-period changes: day, week or month"
+    ),
+    session: Session = Depends(get_session),
+) -> TimeWindow:
+    """FastAPI dependency resolving from/to/granularity query parameters."""
+    return resolve_window(session, start, end, granularity)
@@ -227,11 +227,26 @@ export interface BrandCreateRequest {
   variations: string[];
 }
 
+// Mention backfill started by createBrand; poll /brands/backfills/{id} for progress
+export interface BrandBackfillResponse {
+  id: number;
+  brandId: string;
+  status: string; // pending, running, completed, failed
+  totalPrompts: number;
+  processedPrompts: number;
+  mentionedPrompts: number;
+  progress: number; // % of prompts processed
+  error: string | null;
+  createdAt: string;
+  startedAt: string | null;
+  completedAt: string | null;
+}
+
 export async function fetchBrandsDetails(): Promise<BrandsListResponse> {
   return fetchJson<BrandsListResponse>('/brands/details');
 }
 
-export async function createBrand(brand: BrandCreateRequest): Promise<BrandDetailResponse> {
+export async function createBrand(brand: BrandCreateRequest): Promise<BrandBackfillResponse> {
   const response = await fetch(`${API_BASE}/brands`, {
     method: 'POST',
     headers: {
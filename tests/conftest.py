@@ -0,0 +1,65 @@
+"""
+Fixtures for the backend API tests.
+
+The backend modules read their configuration when imported, so the
+environment points them at a throwaway SQLite database and blob store
+before anything from backend/ is imported.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+WORKDIR = Path(tempfile.mkdtemp(prefix="aiseo-tests-"))
+
+os.environ["DATABASE_URL"] = f"sqlite:///{WORKDIR}/test.db"
+os.environ["BLOB_STORE_PATH"] = str(WORKDIR / "blobs")
+os.environ["SCRAPER_API_URL"] = "http://127.0.0.1:9"  # Nothing listens: scrapes fail fast
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+@pytest.fixture(scope="session")
+def app():
+    import main
+    from database import create_db_and_tables
+
+    create_db_and_tables()
+    return main.app
+
+
+@pytest.fixture
+def session(app):
+    """Session on an emptied database."""
+    from database import engine
+    from response_cache import bump_data_version
+    from sqlmodel import Session, SQLModel
+
+    with engine.begin() as conn:
+        for table in reversed(SQLModel.metadata.sorted_tables):
+            conn.execute(table.delete())
+    bump_data_version()
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def client(app, session):
+    """API client. Startup events (scheduler, seeding) do not run."""
+    from fastapi.testclient import TestClient
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def async_engine(session):
+    """Fresh async engine: aiosqlite connections belong to the event loop that opened them."""
+    import database
+
+    database.async_engine = database.make_async_engine(database.DATABASE_URL)
+    yield database.async_engine
+    asyncio.run(database.async_engine.dispose())
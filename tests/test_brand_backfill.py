@@ -0,0 +1,72 @@
+"""Resuming brand mention backfills left unfinished by a worker that is gone."""
+
+from datetime import datetime, timedelta
+
+import brand_backfill
+from models import Brand, BrandBackfill, Prompt, PromptBrandMention
+from sqlmodel import func, select
+
+
+def add_prompts(session, texts):
+    prompts = [Prompt(query=f"query {i}", response_text=text) for i, text in enumerate(texts)]
+    session.add_all(prompts)
+    session.commit()
+    return [p.id for p in prompts]
+
+
+def add_backfill(session, prompt_ids, lease_owner, lease_seconds, **progress):
+    session.add(Brand(id="acme", name="Acme", type="competitor", color="#f97316", variations="Acme"))
+    backfill = BrandBackfill(
+        brand_id="acme", status="running", total_prompts=len(prompt_ids), max_prompt_id=prompt_ids[-1],
+        lease_owner=lease_owner, lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds),
+        **progress,
+    )
+    session.add(backfill)
+    session.commit()
+    return backfill.id
+
+
+def test_interrupted_backfill_is_resumed_after_the_last_chunk(session, monkeypatch):
+    monkeypatch.setattr(brand_backfill, "BRAND_BACKFILL_CHUNK_SIZE", 2)
+    prompt_ids = add_prompts(session, ["Acme is great", "nothing here", "try Acme", "Acme again", "no"])
+    # The dead worker committed the first chunk (two prompts) before it went away
+    backfill_id = add_backfill(
+        session, prompt_ids, lease_owner="dead:1", lease_seconds=-5,
+        processed_prompts=2, mentioned_prompts=1, last_prompt_id=prompt_ids[1],
+    )
+    session.add_all([
+        PromptBrandMention(prompt_id=prompt_ids[0], brand_id="acme", mentioned=True, position=1),
+        PromptBrandMention(prompt_id=prompt_ids[1], brand_id="acme", mentioned=False),
+    ])
+    session.commit()
+
+    claimed = brand_backfill.claim_orphaned_backfills("me:2")
+    assert claimed == [backfill_id]
+    brand_backfill.run_brand_backfill(backfill_id, "me:2")
+
+    session.expire_all()
+    backfill = session.get(BrandBackfill, backfill_id)
+    assert backfill.status == "completed"
+    assert backfill.processed_prompts == 5
+    assert backfill.mentioned_prompts == 3
+    assert backfill.lease_owner is None
+    counts = dict(session.exec(
+        select(PromptBrandMention.prompt_id, func.count())
+        .where(PromptBrandMention.brand_id == "acme")
+        .group_by(PromptBrandMention.prompt_id)
+    ).all())
+    assert counts == {prompt_id: 1 for prompt_id in prompt_ids}
+
+
+def test_backfill_under_a_live_lease_is_not_taken_over(session):
+    prompt_ids = add_prompts(session, ["Acme"])
+    backfill_id = add_backfill(session, prompt_ids, lease_owner="other:2", lease_seconds=60)
+
+    assert brand_backfill.claim_orphaned_backfills("me:2") == []
+    brand_backfill.run_brand_backfill(backfill_id, "me:2")
+
+    session.expire_all()
+    backfill = session.get(BrandBackfill, backfill_id)
+    assert backfill.status == "running"
+    assert backfill.lease_owner == "other:2"
+    assert backfill.processed_prompts == 0
@@ -0,0 +1,30 @@
+"""Atomic DailyStats counters."""
+
+from daily_stats import increment_daily_stats, set_daily_quota
+from models import DailyStats
+from sqlmodel import select
+
+DAY = "2026-03-10"
+
+
+def stats(session):
+    session.expire_all()
+    return session.exec(select(DailyStats).where(DailyStats.date == DAY)).one()
+
+
+def test_quota_remaining_tracks_usage(session):
+    set_daily_quota(session, DAY, 10)
+    increment_daily_stats(session, DAY, prompts_completed=3, prompts_scheduled=2)
+    session.commit()
+
+    assert stats(session).quota_remaining == 5
+
+
+def test_quota_lowered_below_usage_leaves_nothing_remaining(session):
+    increment_daily_stats(session, DAY, prompts_completed=8)
+    set_daily_quota(session, DAY, 5)
+    session.commit()
+
+    row = stats(session)
+    assert row.daily_quota == 5
+    assert row.quota_remaining == 0
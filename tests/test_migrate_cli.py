@@ -0,0 +1,42 @@
+"""scripts/migrate.py against a database file of its own."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+
+def run_migrate(db_path, *args):
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path}", "PYTHONPATH": str(BACKEND_DIR)}
+    return subprocess.run(
+        [sys.executable, "scripts/migrate.py", *args],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+
+
+def test_upgrade_on_a_fresh_database(tmp_path):
+    db_path = tmp_path / "fresh.db"
+
+    result = run_migrate(db_path, "upgrade")
+
+    assert result.returncode == 0, result.stderr
+    with sqlite3.connect(db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        versions = {row[0] for row in conn.execute("SELECT version FROM schema_migrations")}
+    assert {"scrapejob", "prompt", "promptbrandmention", "schema_migrations"} <= tables
+    assert "ix_scrapejob_is_active_next_run_at" in indexes
+    assert "0001" in versions
+
+
+def test_upgrade_twice_is_a_no_op(tmp_path):
+    db_path = tmp_path / "fresh.db"
+    run_migrate(db_path, "upgrade")
+
+    result = run_migrate(db_path, "upgrade")
+
+    assert result.returncode == 0, result.stderr
+    assert "Applied 0 revision(s)" in result.stdout
@@ -0,0 +1,57 @@
+"""Schema revisions (migrations/) on a database from before the new columns."""
+
+import migrations
+import models  # noqa: F401  (registers the tables)
+import pytest
+from database import make_engine
+from sqlalchemy import Column, MetaData, Table, inspect
+from sqlmodel import SQLModel
+
+# Columns the revisions add to tables that already exist
+ADDED_COLUMNS = {
+    "prompt": {"query_id"},
+    "source": {"category"},
+    "scrapejob": {"html_blob_key", "html_size_bytes", "lease_owner", "lease_expires_at"},
+    "brandbackfill": {"lease_owner", "lease_expires_at"},
+}
+
+
+def columns(engine, table):
+    return {c["name"] for c in inspect(engine).get_columns(table)}
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    """The current tables without the columns added by revisions, none applied."""
+    old = MetaData()
+    for table in SQLModel.metadata.sorted_tables:
+        dropped = ADDED_COLUMNS.get(table.name, set())
+        Table(table.name, old, *[
+            Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable)
+            for c in table.columns if c.name not in dropped
+        ])
+    engine = make_engine(f"sqlite:///{tmp_path}/old.db")
+    old.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def test_upgrade_adds_the_columns_through_revisions(old_engine):
+    applied = migrations.upgrade(old_engine)
+
+    assert applied == [rev.revision for rev in migrations.load_revisions()]
+    for table, names in ADDED_COLUMNS.items():
+        assert names <= columns(old_engine, table)
+    assert "ix_prompt_query_id" in {i["name"] for i in inspect(old_engine).get_indexes("prompt")}
+
+
+def test_downgrade_to_base_removes_the_added_columns(old_engine):
+    migrations.upgrade(old_engine)
+
+    migrations.downgrade(old_engine, None)
+
+    assert not ADDED_COLUMNS["prompt"] & columns(old_engine, "prompt")
+    assert not ADDED_COLUMNS["source"] & columns(old_engine, "source")
+    assert not ADDED_COLUMNS["scrapejob"] & columns(old_engine, "scrapejob")
+    assert not ADDED_COLUMNS["brandbackfill"] & columns(old_engine, "brandbackfill")
+    assert migrations.current(old_engine) is None
@@ -0,0 +1,64 @@
+"""Unpaginated and cursor-paginated calls to the list endpoints."""
+
+from models import Prompt, PromptSource, Source
+
+
+def add_prompts(session, count):
+    for i in range(count):
+        prompt = Prompt(query=f"query {i:03d}", response_text="...")
+        source = Source(domain=f"site{i:03d}.com", url=f"https://site{i:03d}.com/")
+        session.add(prompt)
+        session.add(source)
+        session.flush()
+        session.add(PromptSource(prompt_id=prompt.id, source_id=source.id, citation_order=1))
+    session.commit()
+
+
+def follow_cursor(client, path, limit):
+    items, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = client.get(path, params=params)
+        assert response.status_code == 200
+        items += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return items
+
+
+def test_prompts_without_limit_returns_every_query(client, session):
+    add_prompts(session, 130)
+
+    response = client.get("/api/prompts")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 130
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_sources_without_limit_returns_every_domain(client, session):
+    add_prompts(session, 130)
+
+    response = client.get("/api/sources")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 130
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_pages_add_up_to_the_unpaginated_list(client, session):
+    add_prompts(session, 130)
+
+    for path, key in (("/api/prompts", "query"), ("/api/sources", "domain")):
+        everything = [item[key] for item in client.get(path).json()]
+        paged = [item[key] for item in follow_cursor(client, path, limit=40)]
+        assert paged == everything
+
+
+def test_cursor_without_limit_uses_default_page_size(client, session):
+    add_prompts(session, 130)
+    first = client.get("/api/prompts", params={"limit": 10})
+
+    response = client.get("/api/prompts", params={"cursor": first.headers["X-Next-Cursor"]})
+
+    assert len(response.json()) == 100
@@ -0,0 +1,118 @@
+"""Taking over pending jobs from scrape pool queues of workers that are gone."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import main
+import pytest
+from database import engine
+from migrations import r0005_fail_unleased_pending_jobs
+from models import ScrapeJob
+
+pytestmark = pytest.mark.usefixtures("async_engine")
+
+
+@pytest.fixture
+def submitted(monkeypatch):
+    """Job ids submitted to the scrape pool (nothing is started)."""
+    job_ids = []
+    monkeypatch.setattr(main.scrape_pool, "submit", lambda job_id, *args, **kwargs: job_ids.append(job_id))
+    return job_ids
+
+
+def add_pending_job(session, lease_owner=None, lease_seconds=None, config_snapshot=None):
+    job = ScrapeJob(
+        query="pending", country="it", status="pending", schedule_type="once",
+        config_snapshot=config_snapshot or json.dumps({"query": "pending", "country": "it"}),
+        lease_owner=lease_owner,
+        lease_expires_at=datetime.utcnow() + timedelta(seconds=lease_seconds) if lease_seconds is not None else None,
+    )
+    session.add(job)
+    session.commit()
+    return job.id
+
+
+def test_pending_jobs_of_a_gone_worker_are_queued_again(session, submitted):
+    lapsed = add_pending_job(session, lease_owner="dead:1", lease_seconds=-5)
+    live = add_pending_job(session, lease_owner="other:2", lease_seconds=60)
+
+    asyncio.run(main.recover_pending_jobs())
+
+    assert submitted == [lapsed]
+    session.expire_all()
+    job = session.get(ScrapeJob, lapsed)
+    assert job.lease_owner == main.job_scheduler.worker_id
+    assert job.lease_expires_at > datetime.utcnow()
+    assert session.get(ScrapeJob, live).lease_owner == "other:2"
+
+
+def test_pending_job_that_was_never_leased_is_not_queued_again(session, submitted):
+    job_id = add_pending_job(session)
+
+    asyncio.run(main.recover_pending_jobs())
+
+    assert submitted == []
+    session.expire_all()
+    job = session.get(ScrapeJob, job_id)
+    assert job.status == "pending"
+    assert job.lease_owner is None
+
+
+def test_migration_fails_pending_jobs_that_were_never_leased(session):
+    never_leased = add_pending_job(session)
+    leased = add_pending_job(session, lease_owner="other:2", lease_seconds=-5)
+
+    with engine.begin() as conn:
+        r0005_fail_unleased_pending_jobs.upgrade(conn)
+
+    session.expire_all()
+    job = session.get(ScrapeJob, never_leased)
+    assert job.status == "failed"
+    assert job.error == r0005_fail_unleased_pending_jobs.ERROR
+    assert job.completed_at is not None
+    assert session.get(ScrapeJob, leased).status == "pending"
+
+
+def test_each_pending_job_is_taken_over_once(session, submitted):
+    add_pending_job(session, lease_owner="dead:1", lease_seconds=-5)
+
+    asyncio.run(main.recover_pending_jobs())
+    asyncio.run(main.recover_pending_jobs())
+
+    assert len(submitted) == 1
+
+
+def test_leases_of_jobs_queued_here_are_renewed(session, submitted, monkeypatch):
+    job_id = add_pending_job(session, lease_owner=main.job_scheduler.worker_id, lease_seconds=1)
+    monkeypatch.setattr(main.scrape_pool, "queued_job_ids", lambda: [job_id])
+
+    asyncio.run(main.recover_pending_jobs())
+
+    session.expire_all()
+    assert session.get(ScrapeJob, job_id).lease_expires_at > datetime.utcnow() + timedelta(seconds=30)
+    assert submitted == []
+
+
+def test_malformed_pending_job_is_failed_not_retried(session, submitted):
+    job_id = add_pending_job(session, lease_owner="dead:1", lease_seconds=-5, config_snapshot="{not json")
+
+    asyncio.run(main.recover_pending_jobs())
+
+    session.expire_all()
+    job = session.get(ScrapeJob, job_id)
+    assert job.status == "failed"
+    assert job.error.startswith("Invalid config snapshot")
+    assert submitted == []
+
+
+def test_run_taken_over_elsewhere_is_not_started_twice(session):
+    job_id = add_pending_job(session)
+    job = session.get(ScrapeJob, job_id)
+    job.status = "running"
+    session.commit()
+
+    asyncio.run(main.run_scrape_logic(job_id, {"query": "pending", "country": "it"}))
+
+    session.expire_all()
+    assert session.get(ScrapeJob, job_id).status == "running"
@@ -0,0 +1,77 @@
+"""Incremental brand visibility rollup refresh at ingest time."""
+
+import threading
+from datetime import datetime
+
+from database import engine
+from models import Brand, BrandVisibilityRollup, Prompt, PromptBrandMention
+from rollups import refresh_visibility_rollup
+from sqlmodel import Session, select
+
+SCRAPED_AT = datetime(2026, 3, 10)
+
+
+def add_brands(session):
+    session.add_all([
+        Brand(id="acme", name="Acme", type="primary", color="#06b6d4"),
+        Brand(id="other", name="Other", type="competitor", color="#f59e0b"),
+    ])
+    session.commit()
+
+
+def ingest(mentioned_brand: str, position: int, barrier: threading.Barrier | None = None):
+    """Save one run of the query with a mention and refresh the rollup, in its own session."""
+    if barrier is not None:
+        barrier.wait()
+    with Session(engine) as session:
+        prompt = Prompt(query="best shop builder", response_text="...", scraped_at=SCRAPED_AT)
+        session.add(prompt)
+        session.flush()
+        session.add(PromptBrandMention(prompt_id=prompt.id, brand_id=mentioned_brand, mentioned=True, position=position))
+        session.flush()
+        refresh_visibility_rollup(session, prompt)
+        session.commit()
+
+
+def rollup_rows(session):
+    session.expire_all()
+    return {
+        row.brand_id: (row.period, row.mentioned, row.best_position)
+        for row in session.exec(select(BrandVisibilityRollup)).all()
+    }
+
+
+def test_refresh_overwrites_the_rows_of_the_period_and_query(session):
+    add_brands(session)
+
+    ingest("acme", 3)
+    ingest("acme", 1)
+
+    assert rollup_rows(session) == {
+        "acme": ("2026-03", True, 1),
+        "other": ("2026-03", False, None),
+    }
+
+
+def test_concurrent_refreshes_of_the_same_query_both_succeed(session):
+    add_brands(session)
+    barrier = threading.Barrier(2)
+    errors = []
+
+    def run(brand_id):
+        try:
+            ingest(brand_id, 2, barrier)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(brand_id,)) for brand_id in ("acme", "other")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert rollup_rows(session) == {
+        "acme": ("2026-03", True, 2),
+        "other": ("2026-03", True, 2),
+    }
@@ -0,0 +1,103 @@
+"""Claiming and dispatching due recurring jobs (scheduler.py, job_claims.py)."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import main
+import pytest
+from models import ScrapeJob
+from scheduler import JobScheduler
+from sqlmodel import select
+
+pytestmark = pytest.mark.usefixtures("async_engine")
+
+
+async def dispatch(job, session):
+    """main.dispatch_scheduled_job without starting the scrape."""
+    await main.dispatch_scheduled_job(job, session)
+    return lambda: None
+
+
+def add_due_jobs(session, count, config_snapshot="{}"):
+    due = datetime.utcnow() - timedelta(seconds=1)
+    jobs = [
+        ScrapeJob(query=f"scheduled {i}", country="it", status="scheduled", frequency="daily",
+                  schedule_type="recurring", next_run_at=due, config_snapshot=config_snapshot)
+        for i in range(count)
+    ]
+    session.add_all(jobs)
+    session.commit()
+    return [job.id for job in jobs]
+
+
+def runs_by_parent(session):
+    runs = session.exec(select(ScrapeJob).where(ScrapeJob.parent_job_id.is_not(None))).all()
+    counts = {}
+    for run in runs:
+        counts[run.parent_job_id] = counts.get(run.parent_job_id, 0) + 1
+    return counts
+
+
+def test_failing_dispatch_does_not_hold_up_other_jobs(session):
+    good = add_due_jobs(session, 5)
+    [bad] = add_due_jobs(session, 1, config_snapshot="{not json")
+    good += add_due_jobs(session, 5)
+    scheduler = JobScheduler()
+
+    asyncio.run(scheduler.dispatch_due(dispatch))
+
+    session.expire_all()
+    assert runs_by_parent(session) == {job_id: 1 for job_id in good}
+    for job_id in good:
+        job = session.get(ScrapeJob, job_id)
+        assert job.next_run_at > datetime.utcnow()
+        assert job.lease_owner is None and job.lease_expires_at is None
+    bad_job = session.get(ScrapeJob, bad)
+    assert bad_job.next_run_at < datetime.utcnow()
+    assert bad_job.lease_owner == scheduler.worker_id
+    assert bad_job.lease_expires_at > datetime.utcnow()
+
+
+def test_failed_job_is_retried_once_its_hold_lapses(session):
+    [job_id] = add_due_jobs(session, 1, config_snapshot="{not json")
+    scheduler = JobScheduler()
+    asyncio.run(scheduler.dispatch_due(dispatch))
+
+    # Still held: neither this worker nor another one claims it again
+    asyncio.run(JobScheduler().dispatch_due(dispatch))
+    session.expire_all()
+    assert runs_by_parent(session) == {}
+
+    session.get(ScrapeJob, job_id).config_snapshot = json.dumps({})
+    session.get(ScrapeJob, job_id).lease_expires_at = datetime.utcnow() - timedelta(seconds=1)
+    session.commit()
+    asyncio.run(JobScheduler().dispatch_due(dispatch))
+
+    session.expire_all()
+    assert runs_by_parent(session) == {job_id: 1}
+
+
+def test_each_due_job_runs_once_across_workers(session, monkeypatch):
+    monkeypatch.setattr("scheduler.CLAIM_BATCH_SIZE", 3)
+    parents = add_due_jobs(session, 25)
+    workers = [JobScheduler() for _ in range(3)]
+
+    async def run_all():
+        await asyncio.gather(*(worker.dispatch_due(dispatch) for worker in workers))
+
+    asyncio.run(run_all())
+
+    session.expire_all()
+    assert runs_by_parent(session) == {job_id: 1 for job_id in parents}
+    assert sum(worker.dispatched for worker in workers) == 25
+
+
+def test_missed_runs_are_skipped_in_one_step(capsys):
+    due = datetime(2026, 3, 1, 9, 0)
+    job = ScrapeJob(query="hourly", country="it", frequency="hourly", next_run_at=due)
+
+    main.update_next_run(job, after=due + timedelta(days=7, minutes=30))
+
+    assert job.next_run_at == due + timedelta(days=7, hours=1)
+    assert capsys.readouterr().out.count("next run") == 1
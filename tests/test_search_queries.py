@@ -0,0 +1,39 @@
+"""Linking new prompts to their SearchQuery on flush."""
+
+import models
+from database import engine
+from models import Prompt, SearchQuery
+from sqlmodel import Session, select
+
+
+def test_prompts_of_the_same_new_query_share_one_search_query(session):
+    session.add(Prompt(query="best ecommerce platform"))
+    session.add(Prompt(query="best ecommerce platform", run_number=2))
+    session.commit()
+
+    queries = session.exec(select(SearchQuery)).all()
+    assert [q.text for q in queries] == ["best ecommerce platform"]
+    assert {p.query_id for p in session.exec(select(Prompt)).all()} == {queries[0].id}
+
+
+def test_query_created_by_another_writer_meanwhile_is_reused(session, monkeypatch):
+    find = models._find_search_query
+    calls = []
+
+    def find_after_other_writer(s, text):
+        # The first lookup misses; another writer then commits the same query
+        calls.append(text)
+        if len(calls) == 1:
+            with Session(engine) as other:
+                other.add(Prompt(query=text))
+                other.commit()
+            return None
+        return find(s, text)
+
+    monkeypatch.setattr(models, "_find_search_query", find_after_other_writer)
+    session.add(Prompt(query="wix vs shopify"))
+    session.commit()
+
+    queries = session.exec(select(SearchQuery)).all()
+    assert len(queries) == 1
+    assert {p.query_id for p in session.exec(select(Prompt)).all()} == {queries[0].id}
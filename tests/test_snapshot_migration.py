@@ -0,0 +1,75 @@
+"""Moving legacy html_snapshot contents to the blob store (snapshot_migration.py)."""
+
+import migrations
+import pytest
+from blob_store import get_blob_store
+from database import make_engine
+from models import ScrapeJob
+from snapshot_migration import move_html_snapshots
+from sqlalchemy import text
+from sqlmodel import Session, SQLModel
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A database from before the blob store, with 7 jobs holding HTML in html_snapshot."""
+    engine = make_engine(f"sqlite:///{tmp_path}/legacy.db")
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add_all(ScrapeJob(query=f"query {i}", country="it", status="completed") for i in range(7))
+        session.commit()
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE scrapejob ADD COLUMN html_snapshot TEXT"))
+        conn.execute(text("UPDATE scrapejob SET html_snapshot = '<html>page ' || (id - 1) || '</html>'"))
+    yield engine
+    engine.dispose()
+
+
+def snapshot_rows(engine):
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT id, html_snapshot, html_blob_key, html_size_bytes FROM scrapejob ORDER BY id"
+        )).all()
+
+
+def test_migrations_leave_the_data_move_to_the_background(legacy_engine):
+    migrations.upgrade(legacy_engine)
+
+    assert all(html is not None and key is None for _, html, key, _ in snapshot_rows(legacy_engine))
+
+
+def test_moves_every_snapshot_in_batches(legacy_engine):
+    progress = []
+
+    moved = move_html_snapshots(legacy_engine, batch_size=3, progress=progress.append)
+
+    assert moved == 7
+    assert progress == [3, 6, 7]
+    store = get_blob_store()
+    for i, (_, html, key, size) in enumerate(snapshot_rows(legacy_engine)):
+        assert html is None
+        assert store.get(key) == f"<html>page {i}</html>".encode()
+        assert size == len(f"<html>page {i}</html>")
+
+
+def test_interrupted_move_resumes_after_the_last_committed_batch(legacy_engine, monkeypatch):
+    store = get_blob_store()
+    put = store.put
+    calls = []
+
+    def failing_put(data):
+        calls.append(data)
+        if len(calls) == 5:
+            raise OSError("disk full")
+        return put(data)
+
+    monkeypatch.setattr(store, "put", failing_put)
+    with pytest.raises(OSError):
+        move_html_snapshots(legacy_engine, batch_size=3)
+
+    # The first batch is committed, the failed one rolled back
+    assert [key is not None for _, _, key, _ in snapshot_rows(legacy_engine)] == [True] * 3 + [False] * 4
+
+    monkeypatch.setattr(store, "put", put)
+    assert move_html_snapshots(legacy_engine, batch_size=3) == 4
+    assert all(html is None and key is not None for _, html, key, _ in snapshot_rows(legacy_engine))
@@ -0,0 +1,67 @@
+"""GET /api/sources/analytics."""
+
+from contextlib import contextmanager
+
+from database import engine
+from models import Prompt, PromptSource, Source
+from sqlalchemy import event
+
+
+def add_sources(session, count, runs_per_source=2, start=0):
+    prompts = [Prompt(query=f"query {i}", response_text="...") for i in range(runs_per_source * 3)]
+    session.add_all(prompts)
+    session.flush()
+    for i in range(start, start + count):
+        source = Source(domain=f"site{i % 4}.com", url=f"https://site{i % 4}.com/{i}")
+        session.add(source)
+        session.flush()
+        # Runs 0..n of the same queries, so each query cites the source more than once
+        for order, prompt in enumerate(prompts[: (i % 3 + 1) * runs_per_source]):
+            session.add(PromptSource(prompt_id=prompt.id, source_id=source.id, citation_order=order))
+    session.commit()
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def listener(*args):
+        statements.append(args[2])
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_statement_count_does_not_grow_with_sources(client, session):
+    add_sources(session, 5)
+    with count_statements() as few:
+        assert client.get("/api/sources/analytics").status_code == 200
+
+    add_sources(session, 60, start=5)
+    with count_statements() as many:
+        assert client.get("/api/sources/analytics", params={"v": 2}).status_code == 200
+
+    assert len(many) == len(few)
+
+
+def test_citation_counts_and_top_sources(client, session):
+    add_sources(session, 6)
+
+    body = client.get("/api/sources/analytics").json()
+
+    # Sources i = 0..5 are cited by 2, 4, 6, 2, 4, 6 runs
+    assert body["summary"] == {
+        "totalSources": 6, "totalDomains": 4, "totalCitations": 24, "avgCitationsPerSource": 4.0,
+    }
+    assert [(d["domain"], d["citations"]) for d in body["domainBreakdown"]] == [
+        ("site1.com", 10), ("site0.com", 6), ("site2.com", 6), ("site3.com", 2),
+    ]
+    top = body["topSources"]
+    assert [(s["id"], s["citations"]) for s in top] == sorted(
+        ((s["id"], s["citations"]) for s in top), key=lambda item: (-item[1], item[0])
+    )
+    assert top[0]["citations"] == 6
+    assert top[0]["prompts"] == [f"query {i}" for i in range(5)]
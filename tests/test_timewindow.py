@@ -0,0 +1,28 @@
+"""from/to/granularity time windows on the analytics endpoints."""
+
+from datetime import datetime
+
+import pytest
+from models import Prompt
+from timewindow import resolve_window
+
+
+@pytest.mark.parametrize("path", ["/api/brands", "/api/metrics", "/api/visibility", "/api/sources"])
+def test_window_after_the_latest_scrape_is_empty(client, session, path):
+    session.add(Prompt(query="best shop builder", response_text="...", scraped_at=datetime(2026, 3, 10)))
+    session.commit()
+
+    response = client.get(path, params={"from": "2030-01-01"})
+
+    assert response.status_code == 200
+
+
+def test_window_after_the_latest_scrape_has_one_empty_period(session):
+    session.add(Prompt(query="best shop builder", response_text="...", scraped_at=datetime(2026, 3, 10)))
+    session.commit()
+
+    window = resolve_window(session, start=datetime(2030, 1, 15).date())
+
+    assert window.keys == ["2030-01"]
+    assert window.start == datetime(2030, 1, 15)
+    assert window.end == datetime(2030, 2, 1)